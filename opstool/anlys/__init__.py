@@ -1,7 +1,12 @@
-from ._smart_analyze import SmartAnalyze
-from ._sec_analysis import MomentCurvature
+from ._smart_analyze import SmartAnalyze, StepController, AdaptiveStepController
+from ._sec_analysis import MomentCurvature, batch_moment_curvature
+from ._parallel_runner import ParallelRunner
 
 __all__ = [
     "SmartAnalyze",
-    "MomentCurvature"
+    "StepController",
+    "AdaptiveStepController",
+    "MomentCurvature",
+    "batch_moment_curvature",
+    "ParallelRunner",
 ]
@@ -0,0 +1,244 @@
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Union
+
+import numpy as np
+import openseespy.opensees as ops
+import xarray as xr
+from rich.progress import BarColumn, Progress, TextColumn
+
+from ..utils import CONSTANTS, HHMMSSMSColumn
+
+# the queue to which a worker reports the index of each case it starts, see _init_worker
+_STARTED = None
+
+
+class ParallelRunner:
+    """Run independent OpenSees analyses, e.g., the ground motions x scale factors of an IDA
+    or the cases of a parametric sweep, in a pool of worker processes.
+
+    Each case runs in a worker process with its own OpenSees domain, which is wiped before and after the case,
+    so the model of a case is built by ``func`` in the worker, together with its ``SmartAnalyze`` and ``CreateODB``.
+    A case that raises an exception fails alone,
+    and a case that crashes its worker, e.g., by a segmentation fault in OpenSees,
+    is identified by running the cases that were in progress one at a time in new workers,
+    while the other cases go on.
+
+    Parameters
+    -----------
+    func: Callable
+        A function ``func(case, odb_tag)`` that builds the model of ``case``, runs the analysis,
+        and returns a picklable result, or None.
+        Use ``odb_tag`` for ``CreateODB`` so that each case writes its own output database.
+        As the workers are new processes, ``func`` must be defined at the module level, not in ``__main__``
+        of an interactive session or as a lambda.
+    max_workers: int, default: None
+        The maximum number of cases run concurrently, if None, the number of CPUs.
+    odb_prefix: str, default: "case"
+        The ODB tag of the i-th case is ``f"{odb_prefix}-{i}"``.
+    quiet: bool, default: True
+        If True, the outputs of the workers, including those of OpenSees, are discarded.
+    max_tasks_per_child: int, default: None
+        The number of cases run by a worker before it is replaced by a new one,
+        which bounds the memory leaked by long runs, if None, workers live as long as the pool.
+        Requires Python >= 3.11, a ValueError is raised otherwise.
+
+    Examples
+    ---------
+    >>> # in a module, e.g., ida.py
+    >>> def run_case(case, odb_tag):
+    >>>     gm, scale = case
+    >>>     build_model()
+    >>>     odb = opst.post.CreateODB(odb_tag=odb_tag)
+    >>>     ...
+    >>>     return peak_drift
+    >>> if __name__ == "__main__":
+    >>>     cases = [(gm, scale) for gm in gms for scale in [0.5, 1.0, 1.5]]
+    >>>     runner = opst.anlys.ParallelRunner(run_case, max_workers=64, odb_prefix="ida")
+    >>>     results = runner.run(cases)
+    >>>     print(runner.get_summary())
+    """
+
+    def __init__(
+        self,
+        func: Callable,
+        max_workers: int | None = None,
+        odb_prefix: str = "case",
+        quiet: bool = True,
+        max_tasks_per_child: int | None = None,
+    ):
+        if max_tasks_per_child is not None and sys.version_info < (3, 11):
+            raise ValueError("max_tasks_per_child requires Python >= 3.11!")
+        self.func = func
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+        self.odb_prefix = odb_prefix
+        self.quiet = quiet
+        self.max_tasks_per_child = max_tasks_per_child
+        self.odb_tags = []
+        self.results = []
+        self.errors = {}  # key: case index, value: error message
+        self.elapsed = None
+
+    def run(self, cases: Union[list, tuple], progress: bool = True) -> list:
+        """Run all cases.
+
+        Parameters
+        -----------
+        cases: Union[list, tuple]
+            The picklable cases passed to ``func``.
+        progress: bool, default: True
+            If True, show a progress bar of the finished and failed cases.
+
+        Returns
+        --------
+        results: list
+            The results returned by ``func`` in the order of ``cases``, None for the failed cases,
+            whose error messages are in :attr:`errors`.
+        """
+        cases = list(cases)
+        self.odb_tags = [f"{self.odb_prefix}-{i}" for i in range(len(cases))]
+        self.results = [None] * len(cases)
+        self.errors = {}
+        self.elapsed = np.full(len(cases), np.nan)
+        bar = _CaseProgress(len(cases)) if progress else None
+        ctx = multiprocessing.get_context("spawn")
+        started = ctx.SimpleQueue()
+        pending = set(range(len(cases)))
+        isolated = []  # cases run alone to find the one that crashed a worker
+        while len(pending) > 0:
+            if len(isolated) > 0:
+                batch, max_workers = [isolated.pop()], 1
+            else:
+                batch, max_workers = sorted(pending), self.max_workers
+            finished = self._run_batch(cases, batch, max_workers, ctx, started, bar)
+            pending -= finished
+            crashed = _drain(started) & (set(batch) - finished)
+            if len(crashed) == 0 and len(batch) > len(finished):
+                crashed = set(batch) - finished
+            if len(crashed) == 1 or max_workers == 1:
+                for idx in crashed:
+                    self._set_error(idx, "The worker process crashed, e.g., by a segmentation fault in OpenSees.", bar)
+                    pending.discard(idx)
+            else:
+                isolated.extend(sorted(crashed, reverse=True))
+        if bar is not None:
+            bar.stop()
+        return self.results
+
+    def _run_batch(self, cases, batch, max_workers, ctx, started, bar) -> set:
+        """Run some cases in a new pool, and return the cases finished before the pool broke, if it did."""
+        finished = set()
+        kwargs = {
+            "max_workers": min(max_workers, len(batch)),
+            "mp_context": ctx,
+            "initializer": _init_worker,
+            # the workers are new processes, which write their ODBs as set in this one
+            "initargs": (started, self.quiet, CONSTANTS.get_output_dir(), CONSTANTS.get_odb_format()),
+        }
+        if self.max_tasks_per_child is not None:
+            kwargs["max_tasks_per_child"] = self.max_tasks_per_child
+        with ProcessPoolExecutor(**kwargs) as pool:
+            futures = {pool.submit(_run_case, self.func, idx, cases[idx], self.odb_tags[idx]): idx for idx in batch}
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    result, error, elapsed = future.result()
+                except BrokenProcessPool:
+                    continue
+                finished.add(idx)
+                self.elapsed[idx] = elapsed
+                if error is None:
+                    self.results[idx] = result
+                    if bar is not None:
+                        bar.advance(failed=False)
+                else:
+                    self._set_error(idx, error, bar)
+        return finished
+
+    def _set_error(self, idx, error, bar):
+        self.errors[idx] = error
+        if bar is not None:
+            bar.advance(failed=True)
+
+    def get_summary(self) -> xr.Dataset:
+        """The ODB tag, status, wall time and error message of each case of the last run.
+
+        Returns
+        --------
+        summary: xr.Dataset
+            Data variables "odbTag", "ok", "elapsed" and "error" along the dimension "case".
+        """
+        num_cases = len(self.odb_tags)
+        return xr.Dataset(
+            {
+                "odbTag": (["case"], self.odb_tags),
+                "ok": (["case"], [idx not in self.errors for idx in range(num_cases)]),
+                "elapsed": (["case"], self.elapsed),
+                "error": (["case"], [self.errors.get(idx, "") for idx in range(num_cases)]),
+            },
+            coords={"case": np.arange(num_cases)},
+        )
+
+
+class _CaseProgress:
+    def __init__(self, total: int):
+        self.progress = Progress(
+            TextColumn(":rocket: [bold magenta]ParallelRunner"),
+            BarColumn(
+                bar_width=40,
+                style="#44475a",
+                complete_style="#ff79c6",
+                finished_style="#6fc276",
+            ),
+            TextColumn("{task.completed}/{task.total}", style="bold #6a79f7"),
+            TextColumn("[#f85a40]{task.fields[failed]} failed"),
+            TextColumn(":hourglass:"),
+            HHMMSSMSColumn(),
+        )
+        self.progress.start()
+        self.task = self.progress.add_task("cases", total=total, failed=0)
+        self.failed = 0
+
+    def advance(self, failed: bool = False):
+        self.failed += int(failed)
+        self.progress.update(self.task, advance=1, failed=self.failed)
+
+    def stop(self):
+        self.progress.stop()
+
+
+def _init_worker(started, quiet, odb_dir, odb_format):
+    global _STARTED
+    _STARTED = started
+    CONSTANTS.set_output_dir(odb_dir)
+    CONSTANTS.set_odb_format(odb_format)
+    if quiet:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.dup2(devnull, 2)
+
+
+def _run_case(func, idx, case, odb_tag):
+    _STARTED.put(idx)
+    t0 = time.perf_counter()
+    result, error = None, None
+    try:
+        ops.wipe()
+        result = func(case, odb_tag)
+    except Exception:
+        error = traceback.format_exc()
+    finally:
+        ops.wipe()
+    return result, error, time.perf_counter() - t0
+
+
+def _drain(queue) -> set:
+    output = set()
+    while not queue.empty():
+        output.add(queue.get())
+    return output
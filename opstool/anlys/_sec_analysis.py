@@ -7,6 +7,7 @@ from warnings import warn
 from scipy.integrate import trapezoid
 
 from ._smart_analyze import SmartAnalyze
+from ._parallel_runner import ParallelRunner
 
 
 class MomentCurvature:
@@ -23,7 +24,9 @@ class MomentCurvature:
     def __init__(self, sec_tag: int, axial_force: float = 0) -> None:
         self.P = axial_force
         self.sec_tag = sec_tag
-        self.phi, self.M, self.FiberData = None, None, None
+        self.phi, self.M = None, None
+        # the fiber "yloc", "zloc", "area", "mat", and the "stress", "strain" of each step
+        self.FiberProps, self.FiberResp = None, None
         self.cycle_path = None
         # self.phi_cycle, self.M_cycle, self.FiberDataCycle = None, None, None
 
@@ -61,7 +64,7 @@ class MomentCurvature:
             The termination of the analysis depends on whichever reaches `max_phi` or `post_peak_ratio` first.
 
         """
-        self.phi, self.M, self.FiberData = _analyze(
+        self.phi, self.M, self.FiberProps, self.FiberResp = _analyze(
             sec_tag=self.sec_tag,
             P=self.P,
             axis=axis,
@@ -75,6 +78,20 @@ class MomentCurvature:
         )
         print("MomentCurvature: 🎉 Successfully finished! 🎉")
 
+    @property
+    def FiberData(self):
+        """The fiber data of all steps, with shape (Steps, Fibers, 6),
+        the columns are "yloc", "zloc", "area", "mat", "stress", "strain".
+        All columns of the initial step 0 are zero.
+        """
+        if self.FiberResp is None:
+            return None
+        num_steps, num_fibers = self.FiberResp.shape[:2]
+        props = np.broadcast_to(self.FiberProps, (num_steps, num_fibers, 4))
+        data = np.concatenate([props, self.FiberResp], axis=-1)
+        data[0] = 0.0
+        return data
+
     def set_cycle_path(self, max_phi: float, n_cycle: int = 20, n_hold: int = 1):
         """set a deformation cycle path.
 
@@ -147,14 +164,14 @@ class MomentCurvature:
             If True, return the axes for the plot of matplotlib.
         """
 
-        fiber_data = self.FiberData
-        matTags = np.unique(fiber_data[-1][:, 3])
+        fiber_mats = self.FiberProps[:, 3]
+        matTags = np.unique(fiber_mats)
 
         _, axs = plt.subplots(len(matTags), 1, figsize=(8, 3 * len(matTags)))
         for mat, ax in zip(matTags, axs):
-            idxs = np.argwhere(np.abs(fiber_data[-1][:, 3] - mat) < 1e-6)
-            strain = fiber_data[:, idxs, -1]
-            stress = fiber_data[:, idxs, -2]
+            idxs = np.argwhere(np.abs(fiber_mats - mat) < 1e-6)
+            strain = self.FiberResp[:, idxs, 1]
+            stress = self.FiberResp[:, idxs, 0]
             for i in range(len(idxs)):
                 ax.plot(
                     strain[:, i, :],
@@ -234,8 +251,8 @@ class MomentCurvature:
         data = xr.DataArray(
             self.FiberData,
             coords={
-                "Steps": np.arange(len(self.FiberData)),
-                "Fibers": np.arange(len(self.FiberData[0])),
+                "Steps": np.arange(self.FiberResp.shape[0]),
+                "Fibers": np.arange(self.FiberResp.shape[1]),
                 "Properties": ["yloc", "zloc", "area", "mat", "stress", "strain"],
             },
             dims=("Steps", "Fibers", "Properties"),
@@ -287,7 +304,6 @@ class MomentCurvature:
         """
         phi = self.phi
         M = self.M
-        fiber_data = self.FiberData
         if peak_drop:
             if peak_drop is True:
                 ratio_ = 0.8
@@ -312,15 +328,13 @@ class MomentCurvature:
                 )
             bus = []
             for matTag, threshold in zip(mat_tags, thresholds):
-                matTag = int(matTag)
-                idxu = np.argwhere(np.abs(fiber_data[-1][:, 3] - matTag) < 1e-6)
+                mask = np.abs(self.FiberProps[:, 3] - int(matTag)) < 1e-6
+                strain = self.FiberResp[:, mask, 1]
                 eu = threshold
                 if eu >= 0:
-                    strain = np.array([np.max(data[idxu, -1]) for data in fiber_data])
-                    au = np.argwhere(strain >= eu)
+                    au = np.flatnonzero(np.max(strain, axis=1) >= eu)
                 else:
-                    strain = np.array([np.min(data[idxu, -1]) for data in fiber_data])
-                    au = np.argwhere(strain < eu)
+                    au = np.flatnonzero(np.min(strain, axis=1) < eu)
                 if len(au) == 0:
                     warn(
                         "The ultimate strain is not reached, please increase target ductility ratio! "
@@ -328,7 +342,7 @@ class MomentCurvature:
                     )
                     bu = len(phi) - 1
                 else:
-                    bu = np.min(au)
+                    bu = au[0]
                 bus.append(bu)
             bu = int(np.min(bus))
         Phi_u = phi[bu]
@@ -426,6 +440,152 @@ class MomentCurvature:
         return Phi_eq, M_eq
 
 
+def batch_moment_curvature(
+    sec_builders: Union[list, dict],
+    axial_forces: Union[list, float] = 0.0,
+    axes: Union[list, str] = "y",
+    max_phi: float = 0.5,
+    incr_phi: float = 1e-4,
+    limit_peak_ratio: float = 0.8,
+    smart_analyze: bool = True,
+    limit_states: dict | None = None,
+    bilinear: tuple | None = None,
+    max_workers: int | None = None,
+    progress: bool = True,
+) -> xr.Dataset:
+    """Moment-curvature analyses of all combinations of sections, axial forces and axes,
+    e.g., for P-M interaction tables, run in parallel by :class:`ParallelRunner`.
+
+    Parameters
+    ----------
+    sec_builders : Union[list, dict]
+        Functions without arguments that define a fiber section and its materials and return the section tag,
+        or a dict with the section names as keys and such functions as values.
+        Each combination is analyzed in its own OpenSees domain in a worker process,
+        in which the ``basic`` model with 6 DOFs is created before the function is called,
+        so the functions must be defined at the module level,
+        use ``functools.partial`` to pass the parameters of a section.
+    axial_forces : Union[list, float], optional
+        Axial loads, compression is negative, by default 0.
+    axes : Union[list, str], optional
+        "y", "z" or both, by default "y".
+    max_phi, incr_phi, limit_peak_ratio, smart_analyze :
+        See :meth:`MomentCurvature.analyze`.
+    limit_states : dict, optional
+        key: name of the limit state, value: kwargs of :meth:`MomentCurvature.get_limit_state`,
+        e.g., ``{"yield": dict(matTag=2, threshold=0.002), "ultimate": dict(peak_drop=0.2)}``.
+    bilinear : tuple, optional
+        Names of the yield and ultimate limit states, e.g., ``("yield", "ultimate")``,
+        for the bilinear approximation by :meth:`MomentCurvature.bilinearize`.
+    max_workers : int, optional
+        The maximum number of worker processes, if None, the number of CPUs.
+    progress : bool, optional
+        If True, show the progress of the analyses.
+
+    Returns
+    -------
+    xr.Dataset
+        With the dimensions "section", "axialForce" and "axis":
+
+        * "phi", "M": the moment-curvature curves along the dimension "step",
+          shorter curves are padded with NaN.
+        * "limitPhi", "limitM": the limit states along the dimension "limitState".
+        * "phiEq", "MEq": the equivalent yield point of the bilinear approximation.
+
+        The combinations that failed are NaN, their errors are in ``attrs["errors"]``.
+
+    Examples
+    ---------
+    >>> # in a module
+    >>> def build_column(width, fy):
+    >>>     ...  # materials and fiber section 1
+    >>>     return 1
+    >>> if __name__ == "__main__":
+    >>>     builders = {f"C{w}": partial(build_column, w, 400.0) for w in [0.5, 0.6]}
+    >>>     ds = opst.anlys.batch_moment_curvature(
+    >>>         builders, axial_forces=np.linspace(-8000, 0, 9), axes=["y", "z"],
+    >>>         limit_states={"ultimate": dict(peak_drop=0.2)},
+    >>>     )
+    >>>     ds["limitM"].sel(limitState="ultimate", axis="y")  # P-M interaction
+    """
+    if not isinstance(sec_builders, dict):
+        sec_builders = dict(enumerate(sec_builders))
+    axial_forces = np.atleast_1d(axial_forces).astype(float)
+    axes = [axes] if isinstance(axes, str) else list(axes)
+    limit_states = {} if limit_states is None else dict(limit_states)
+    if bilinear is not None:
+        for name in bilinear:
+            if name not in limit_states:
+                raise ValueError(f"The limit state {name} of bilinear is not in limit_states!")
+    options = {
+        "max_phi": max_phi,
+        "incr_phi": incr_phi,
+        "limit_peak_ratio": limit_peak_ratio,
+        "smart_analyze": smart_analyze,
+    }
+    keys = [(name, p, axis) for name in sec_builders for p in axial_forces for axis in axes]
+    cases = [(sec_builders[name], float(p), axis, options, limit_states, bilinear) for name, p, axis in keys]
+    runner = ParallelRunner(_analyze_batch_case, max_workers=max_workers)
+    results = runner.run(cases, progress=progress)
+    num_steps = max([len(res["phi"]) for res in results if res is not None], default=0)
+    shape = (len(sec_builders), len(axial_forces), len(axes))
+    phi, moment = np.full((*shape, num_steps), np.nan), np.full((*shape, num_steps), np.nan)
+    limit_phi, limit_m = np.full((*shape, len(limit_states)), np.nan), np.full((*shape, len(limit_states)), np.nan)
+    phi_eq, m_eq = np.full(shape, np.nan), np.full(shape, np.nan)
+    for idx, res in enumerate(results):
+        if res is None:
+            continue
+        loc = np.unravel_index(idx, shape)
+        phi[loc][: len(res["phi"])] = res["phi"]
+        moment[loc][: len(res["M"])] = res["M"]
+        limit_phi[loc], limit_m[loc] = res["limitPhi"], res["limitM"]
+        phi_eq[loc], m_eq[loc] = res["bilinear"]
+    dims = ["section", "axialForce", "axis"]
+    ds = xr.Dataset(
+        {
+            "phi": ([*dims, "step"], phi),
+            "M": ([*dims, "step"], moment),
+            "limitPhi": ([*dims, "limitState"], limit_phi),
+            "limitM": ([*dims, "limitState"], limit_m),
+            "phiEq": (dims, phi_eq),
+            "MEq": (dims, m_eq),
+        },
+        coords={
+            "section": list(sec_builders.keys()),
+            "axialForce": axial_forces,
+            "axis": axes,
+            "step": np.arange(num_steps),
+            "limitState": list(limit_states.keys()),
+        },
+    )
+    ds.attrs["errors"] = [f"{keys[idx]}: {error}" for idx, error in sorted(runner.errors.items())]
+    if len(runner.errors) > 0:
+        warn(f"{len(runner.errors)} moment-curvature analyses failed, see attrs['errors'] of the result!", stacklevel=2)
+    return ds
+
+
+def _analyze_batch_case(case, odb_tag):
+    builder, P, axis, options, limit_states, bilinear = case
+    ops.model("basic", "-ndm", 3, "-ndf", 6)
+    sec_tag = builder()
+    mc = MomentCurvature(sec_tag=sec_tag, axial_force=P)
+    mc.analyze(axis=axis, **options)
+    states = [mc.get_limit_state(**kwargs) for kwargs in limit_states.values()]
+    output = {
+        "phi": mc.phi,
+        "M": mc.M,
+        "limitPhi": [state[0] for state in states],
+        "limitM": [state[1] for state in states],
+        "bilinear": (np.nan, np.nan),
+    }
+    if bilinear is not None:
+        names = list(limit_states.keys())
+        phiy, My = states[names.index(bilinear[0])]
+        phiu = states[names.index(bilinear[1])][0]
+        output["bilinear"] = mc.bilinearize(phiy, My, phiu)
+    return output
+
+
 def _create_model(sec_tag):
     ops.model("basic", "-ndm", 3, "-ndf", 6)
     ops.node(1, 0.0, 0.0, 0.0)
@@ -480,7 +640,9 @@ def _analyze(
         max_phi = np.max(np.abs(cycle_path))
     M = [0]
     PHI = [0]
-    FIBER_RESPONSES = [0]
+    fiber_data = _get_fiber_sec_data(ele_tag=1)
+    FIBER_PROPS = fiber_data[:, :4]
+    FIBER_RESPONSES = None  # preallocated (steps, fibers, 2) array of "stress", "strain", the first step is zero
     if smart_analyze:
         if cycle:
             protocol = cycle_path
@@ -499,6 +661,7 @@ def _analyze(
         }
         analysis = SmartAnalyze(analysis_type="Static", **userControl)
         segs = analysis.static_split(protocol, maxStep=incr_phi)
+        FIBER_RESPONSES = np.zeros((len(segs) + 1, len(FIBER_PROPS), 2))
         for seg in segs:
             ok = analysis.StaticAnalyze(2, dof, seg)
             curr_M = ops.getLoadFactor(2)
@@ -510,7 +673,7 @@ def _analyze(
             cond2 = np.abs(curr_Phi) >= max_phi
             PHI.append(curr_Phi)
             M.append(curr_M)
-            FIBER_RESPONSES.append(_get_fiber_sec_data(ele_tag=1))
+            FIBER_RESPONSES[len(PHI) - 1] = _get_fiber_sec_data(ele_tag=1)[:, 4:]
             if cond1 or cond2:
                 analysis.close()
                 break
@@ -530,6 +693,7 @@ def _analyze(
             step = max_phi / n
             protocol = [step for _ in range(n)]
 
+        FIBER_RESPONSES = np.zeros((len(protocol) + 1, len(FIBER_PROPS), 2))
         for step_size in protocol:
             ops.integrator("DisplacementControl", 2, dof, step_size)
             ok = ops.analyze(1)
@@ -542,13 +706,14 @@ def _analyze(
             cond2 = np.abs(curr_Phi) > max_phi
             PHI.append(curr_Phi)
             M.append(curr_M)
-            FIBER_RESPONSES.append(_get_fiber_sec_data(ele_tag=1))
+            FIBER_RESPONSES[len(PHI) - 1] = _get_fiber_sec_data(ele_tag=1)[:, 4:]
             if cond1 or cond2:
                 break
             if ok < 0:
                 raise RuntimeError("Analysis failed!")
-    FIBER_RESPONSES[0] = FIBER_RESPONSES[1] * 0
-    return np.array(PHI), np.array(M), np.array(FIBER_RESPONSES)
+    if len(PHI) < len(FIBER_RESPONSES):
+        FIBER_RESPONSES = FIBER_RESPONSES[: len(PHI)].copy()
+    return np.array(PHI), np.array(M), FIBER_PROPS, FIBER_RESPONSES
 
 
 def _get_fiber_sec_data(ele_tag: int):
@@ -3,18 +3,17 @@ import time
 
 import numpy as np
 import openseespy.opensees as ops
+import xarray as xr
 from typing import Union
 from rich import print
 from rich.progress import (
     Progress,
     TextColumn,
     BarColumn,
-    ProgressColumn,
 )
-from rich.console import RenderableType
 from contextlib import contextmanager
 
-from ..utils import get_random_color
+from ..utils import get_random_color, HHMMSSMSColumn
 
 
 LOG_FILE = '.SmartAnalyze-OpenSees.log'
@@ -27,15 +26,173 @@ def suppress_ops_print(verbose=False):
     yield
 
 
-class HHMMSSMSColumn(ProgressColumn):
-    def render(self, task) -> RenderableType:
-        t = task.elapsed or 0.0
-        total_ms = int(t * 1000)
-        hours = total_ms // (3600 * 1000)
-        minutes = (total_ms // (60 * 1000)) % 60
-        seconds = (total_ms // 1000) % 60
-        millis = total_ms % 1000
-        return f"[#037ef3]{hours:02} h : [#f85a40]{minutes:02} m : [#00c16e]{seconds:02} s : [#7552cc]{millis:03} ms"
+# the fallback stages of SmartAnalyze, the stage of a step is the last one it reached
+STAGES = ("direct", "addTestTimes", "alterAlgoTypes", "relaxStep", "looseTestTol")
+
+
+class _StepLog:
+    """Array-backed log of the steps of :class:`SmartAnalyze`, grown by doubling."""
+
+    FIELDS = (
+        ("time", float),
+        ("wallTime", float),
+        ("stepSize", float),
+        ("numIter", np.int32),
+        ("numTrials", np.int32),
+        ("numSubSteps", np.int32),
+        ("norm", float),
+        ("stage", np.int8),
+        ("algo", np.int16),
+    )
+
+    def __init__(self, capacity: int = 256):
+        self.size = 0
+        self.data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.FIELDS}
+
+    def append(self, **values):
+        if self.size == len(self.data["time"]):
+            for name, arr in self.data.items():
+                self.data[name] = np.concatenate([arr, np.zeros_like(arr)])
+        for name, value in values.items():
+            self.data[name][self.size] = value
+        self.size += 1
+
+    def to_xarray(self) -> xr.Dataset:
+        ds = xr.Dataset(
+            {name: (["step"], arr[: self.size].copy()) for name, arr in self.data.items()},
+            coords={"step": np.arange(1, self.size + 1)},
+        )
+        ds["stage"].attrs["stages"] = ", ".join(f"{i}: {stage}" for i, stage in enumerate(STAGES)) + ", -1: failed"
+        return ds
+
+
+class StepController:
+    """The base class of the step size policies of :class:`SmartAnalyze`, see the ``stepController`` argument.
+
+    A controller remembers a sub-step size across the steps of an analysis.
+    :class:`SmartAnalyze` calls :meth:`reset` at the first step after ``transient_split`` or ``static_split``,
+    i.e., at the start of a new analysis stage, and when the direction of the steps reverses.
+    Each step passed to ``TransientAnalyze`` or ``StaticAnalyze`` is completed by sub-steps
+    whose sizes are given by :meth:`get_step`,
+    and the controller is told the outcome of each sub-step by :meth:`on_success` and :meth:`on_failure`.
+    Subclass it and override these methods to implement another policy.
+    """
+
+    def __init__(self):
+        self.step = None  # the size of the next sub-step, None for the whole step
+
+    def reset(self):
+        """Forget the remembered sub-step size."""
+        self.step = None
+
+    def get_step(self, step: float) -> float:
+        """Return the size of the next sub-step, no larger than the remaining part ``step`` of the step.
+
+        Parameters
+        ----------
+        step: float
+            The size of the remaining part of the step, positive.
+        """
+        if self.step is None:
+            return step
+        return min(self.step, step)
+
+    def on_success(self, step: float, num_iters: int):
+        """Called after a sub-step converged.
+
+        Parameters
+        ----------
+        step: float
+            The size of the sub-step, positive.
+        num_iters: int
+            The number of iterations of the sub-step, i.e., ``ops.testIter()``.
+        """
+        pass
+
+    def on_failure(self, step: float, relaxation: float):
+        """Called after a sub-step failed with all the algorithms and test options of :class:`SmartAnalyze`.
+
+        Parameters
+        ----------
+        step: float
+            The size of the sub-step, positive.
+        relaxation: float
+            The ``relaxation`` argument of :class:`SmartAnalyze`.
+        """
+        self.step = step * relaxation
+
+
+class AdaptiveStepController(StepController):
+    """A step size policy that shrinks the sub-step by ``relaxation`` after a failure,
+    remembers it for the next steps, and grows it back gradually after consecutive successes.
+
+    The growth factor is a PI controller on the number of iterations :math:`n_k` of the sub-step,
+
+    .. math::
+        f = \\left(\\frac{n_{target}}{n_k}\\right)^{k_I} \\left(\\frac{n_{k-1}}{n_k}\\right)^{k_P},
+
+    bounded in [1, ``max_growth``], so the sub-step grows fast where the solver converges easily
+    and stays small where it struggles.
+
+    Parameters
+    ----------
+    target_iters: int, default=4
+        The target number of iterations per sub-step.
+    num_success: int, default=2
+        The number of consecutive successes before the sub-step grows.
+    max_growth: float, default=2.0
+        The maximum growth factor.
+    ki: float, default=0.5
+        The integral gain.
+    kp: float, default=0.2
+        The proportional gain.
+
+    Examples
+    ---------
+    >>> analysis = opst.anlys.SmartAnalyze(
+    >>>     "Static", stepController=opst.anlys.AdaptiveStepController(target_iters=5)
+    >>> )
+    """
+
+    def __init__(
+        self,
+        target_iters: int = 4,
+        num_success: int = 2,
+        max_growth: float = 2.0,
+        ki: float = 0.5,
+        kp: float = 0.2,
+    ):
+        super().__init__()
+        self.target_iters = target_iters
+        self.num_success = num_success
+        self.max_growth = max_growth
+        self.ki = ki
+        self.kp = kp
+        self.streak = 0
+        self.last_iters = None
+
+    def reset(self):
+        super().reset()
+        self.streak = 0
+        self.last_iters = None
+
+    def on_success(self, step: float, num_iters: int):
+        if self.step is None or step < self.step:
+            # the whole step, or its last part shorter than the sub-step, tells nothing about the sub-step
+            return
+        num_iters = max(int(num_iters), 1)
+        last_iters = num_iters if self.last_iters is None else self.last_iters
+        self.last_iters = num_iters
+        self.streak += 1
+        if self.streak < self.num_success:
+            return
+        factor = (self.target_iters / num_iters) ** self.ki * (last_iters / num_iters) ** self.kp
+        self.step = step * min(max(factor, 1.0), self.max_growth)
+
+    def on_failure(self, step: float, relaxation: float):
+        super().on_failure(step, relaxation)
+        self.streak = 0
+        self.last_iters = None
 
 
 class SmartAnalyze:
@@ -104,6 +261,20 @@ class SmartAnalyze:
         and the parameters must be included in the list, for example:
         algoTypes = [10, 20, 100],
         UserAlgoArgs = ["KrylovNewton", "-iterate", "initial", "-maxDim", 20]
+    algoCache: bool, default=False
+        Only useful when tryAlterAlgoTypes is True.
+        If True, the algorithms in `algoTypes` that made failed steps converge are remembered,
+        and the most recently successful one is tried first at the next failure,
+        instead of trying `algoTypes` always in the same order.
+        The algorithm that just failed is not tried again, and the first one is tried last.
+        Only the algorithm flags are cached, not the test or the step size:
+        more test times are still tried before the algorithms at each failure,
+        and the step size is remembered by `stepController`.
+    algoCooldown: int, default=None
+        Only useful when tryAlterAlgoTypes is True.
+        The number of steps for which an algorithm that made a failed step converge is kept,
+        after which the first algorithm in `algoTypes` is set back.
+        If None, it is kept until the next failure.
 
     **Algorithm type flag reference**
 
@@ -206,9 +377,20 @@ class SmartAnalyze:
         The step tolerance when shortening the step length.
         If step length is smaller than minStep, special ways to converge the model will be used
         according to `try-` flags.
+    stepController: Union[bool, StepController], default=None
+        If None, each step starts from its full size, and is divided by `relaxation` only when it fails.
+        If True, an :class:`AdaptiveStepController` is used,
+        which remembers the sub-step size that converged and grows it back gradually after consecutive successes,
+        so that the step size is not found again by failures at each step after a hard region.
+        A :class:`StepController` instance can also be passed for another policy.
+        The remembered sub-step is forgotten at the start of ``transient_split`` or ``static_split``
+        and when the direction of the steps reverses.
 
     LOGGING RELATED:
     ===================
+    telemetry: bool, default=False
+        If True, each step of ``TransientAnalyze`` or ``StaticAnalyze`` is logged,
+        see :meth:`get_telemetry`.
     debugMode: bool, default=False
         If True, print as much information as possible.
         If False, the progress bar will be used.
@@ -287,11 +469,15 @@ class SmartAnalyze:
             "tryAlterAlgoTypes": False,
             "algoTypes": [40, 10, 20, 30, 50, 60, 70, 90],
             "UserAlgoArgs": None,
+            "algoCache": False,
+            "algoCooldown": None,
             "initialStep": None,
             "relaxation": 0.5,
             "minStep": 1.0e-6,
+            "stepController": None,
             "debugMode": False,
             "printPer": 20,
+            "telemetry": False,
         }
         self.control_args["looseTestTolTo"] = 100 * self.control_args["testTol"]
         for name in kargs.keys():
@@ -306,10 +492,20 @@ class SmartAnalyze:
         self.logo_analysis_type = f"[bold cerulean]{self.analysis_type}"
 
         self.debug_mode = self.control_args["debugMode"]
+        self.step_controller = self.control_args["stepController"]
+        if self.step_controller is True:
+            self.step_controller = AdaptiveStepController()
+        elif self.step_controller is False:
+            self.step_controller = None
+        elif self.step_controller is not None and not isinstance(self.step_controller, StepController):
+            raise ValueError("stepController must be None, bool or an instance of StepController!")
 
         # initial test commands
         self._set_init_test()
         # initial algorithm
+        self.algo_type = None  # the current algorithm flag
+        self.algo_cache = []  # the algorithms that made failed steps converge, the most recent first
+        self.algo_cooldown = None  # the number of steps left before the first algorithm is set back
         self._setAlgorithm(
             self.control_args["algoTypes"][0],
             self.control_args["UserAlgoArgs"],
@@ -328,7 +524,16 @@ class SmartAnalyze:
             "step": 0.0,
             "node": 0,
             "dof": 0,
+            "numIter": 0,
+            # the statistics of the current step for the telemetry
+            "numIterStep": 0,
+            "numTrials": 0,
+            "numSubSteps": 0,
+            "stage": 0,
+            # the direction of the last step with the step controller, 0 at the start of an analysis
+            "sign": 0.0,
         }
+        self.step_log = _StepLog() if self.control_args["telemetry"] else None
 
         self.progress = None
         self.task = None
@@ -373,6 +578,7 @@ class SmartAnalyze:
         A list to loop.
         """
         self.current_args["npts"] = npts
+        self.current_args["sign"] = 0.0
         if not self.debug_mode and self.progress is None:
             self._set_progress_bar(npts)
         return list(range(1, npts + 1))
@@ -433,6 +639,7 @@ class SmartAnalyze:
                     j += 1
                 segs.append(section + j * maxStep)
         self.current_args["npts"] = len(segs)
+        self.current_args["sign"] = 0.0
         if not self.debug_mode and self.progress is None:
             self._set_progress_bar(len(segs))
         return segs
@@ -515,17 +722,26 @@ class SmartAnalyze:
     def _analyze(self):
         initial_step = self.control_args["initialStep"]
         verbose = True if self.debug_mode else False
+        t0 = time.perf_counter()
+        for key in ("numIterStep", "numTrials", "numSubSteps", "stage"):
+            self.current_args[key] = 0
+
+        if self.step_controller is None:
+            ok = self._analyze_one_step(initial_step, verbose=verbose)
+
+            if ok < 0:
+                ok = self._try_add_test_times(initial_step, verbose)
+            if ok < 0:
+                ok = self._try_alter_algo_types(initial_step, verbose)
+            if ok < 0:
+                ok = self._try_relax_step(initial_step, verbose)
+            if ok < 0:
+                ok = self._try_loose_test_tol(initial_step, verbose)
+        else:
+            ok = self._analyze_controlled_step(initial_step, verbose)
 
-        ok = self._analyze_one_step(initial_step, verbose=verbose)
-
-        if ok < 0:
-            ok = self._try_add_test_times(initial_step, verbose)
-        if ok < 0:
-            ok = self._try_alter_algo_types(initial_step, verbose)
-        if ok < 0:
-            ok = self._try_relax_step(initial_step, verbose)
-        if ok < 0:
-            ok = self._try_loose_test_tol(initial_step, verbose)
+        if self.step_log is not None:
+            self._log_step(ok, initial_step, time.perf_counter() - t0)
 
         if ok < 0:
             color = get_random_color()
@@ -539,6 +755,7 @@ class SmartAnalyze:
 
         self.current_args["progress"] += 1
         self.current_args["counter"] += 1
+        self._cool_down_algo()
 
         color = get_random_color()
 
@@ -578,6 +795,46 @@ class SmartAnalyze:
             )
         return 0
 
+    def _log_step(self, ok, step, wall_time):
+        norms = ops.testNorm()
+        self.step_log.append(
+            time=ops.getTime(),
+            wallTime=wall_time,
+            stepSize=step,
+            numIter=self.current_args["numIterStep"],
+            numTrials=self.current_args["numTrials"],
+            numSubSteps=self.current_args["numSubSteps"],
+            norm=norms[-1] if len(norms) > 0 else np.nan,
+            stage=self.current_args["stage"] if ok == 0 else -1,
+            algo=self.algo_type if self.algo_type is not None else -1,
+        )
+
+    def get_telemetry(self) -> xr.Dataset:
+        """The log of the steps, ``telemetry=True`` is required.
+
+        Returns
+        --------
+        telemetry: xr.Dataset
+            Data variables along the dimension "step", one for each call of ``TransientAnalyze`` or ``StaticAnalyze``:
+
+            * time: The analysis time after the step.
+            * wallTime: The wall time of the step in seconds.
+            * stepSize: The step size.
+            * numIter: The number of iterations of all trials, i.e., the sum of ``ops.testIter()``.
+            * numTrials: The number of calls of ``ops.analyze``.
+            * numSubSteps: The number of converged sub-steps.
+            * norm: The last norm of the test, i.e., ``ops.testNorm()[-1]``.
+            * stage: The last fallback stage reached,
+              0: direct, 1: addTestTimes, 2: alterAlgoTypes, 3: relaxStep, 4: looseTestTol, -1: failed.
+            * algo: The algorithm flag after the step.
+
+            Use ``.to_dataframe()`` for a pandas table,
+            and ``CreateODB.save_response(telemetry=...)`` to save it in the output database.
+        """
+        if self.step_log is None:
+            raise ValueError("The telemetry is not recorded, please set telemetry=True!")
+        return self.step_log.to_xarray()
+
     def close(self):
         """Close the class.
 
@@ -604,12 +861,66 @@ class SmartAnalyze:
                 ok = ops.analyze(1, step)
 
         self.current_args["step"] = step
+        self.current_args["numIter"] = ops.testIter()
+        self.current_args["numIterStep"] += self.current_args["numIter"]
+        self.current_args["numTrials"] += 1
+        if ok == 0:
+            self.current_args["numSubSteps"] += 1
 
         return ok
 
+    def _analyze_controlled_step(self, step, verbose):
+        """Complete the step by the sub-steps of the step controller."""
+        alpha = self.control_args["relaxation"]
+        min_step = self.control_args["minStep"]
+        sign = 1.0 if step >= 0 else -1.0
+        if sign != self.current_args["sign"]:
+            # the sub-step of a previous analysis or of the other direction is not kept
+            self.step_controller.reset()
+            self.current_args["sign"] = sign
+        step_remaining = abs(step)
+        # as in the default order, more test times and other algorithms are tried once per step,
+        # before the sub-step is reduced
+        try_others = True
+        ok = 0
+        while step_remaining > self.eps:
+            step_try = self.step_controller.get_step(step_remaining)
+            ok = self._analyze_one_step(sign * step_try, verbose=verbose)
+            if ok < 0 and try_others:
+                try_others = False
+                ok = self._try_add_test_times(sign * step_try, verbose)
+                if ok < 0:
+                    ok = self._try_alter_algo_types(sign * step_try, verbose)
+            if ok < 0 and step_try * alpha < min_step:
+                ok = self._try_loose_test_tol(sign * step_try, verbose)
+                if ok < 0:
+                    color = get_random_color()
+                    print(
+                        f">>> ▶️ {self.logo} Current step [bold {color}]%.3e[/bold {color}] beyond the min step!"
+                        % (step_try * alpha)
+                    )
+                    return ok
+            if ok < 0:
+                self._set_stage(3)
+                self.step_controller.on_failure(step_try, alpha)
+                if verbose:
+                    color = get_random_color()
+                    print(
+                        f">>> ▶️ {self.logo} Reducing the sub-step [bold {color}]{step_try:.3e}[/bold {color}] "
+                        f"to [bold {color}]{self.step_controller.get_step(step_remaining):.3e}[/bold {color}]"
+                    )
+                continue
+            step_remaining -= step_try
+            self.step_controller.on_success(step_try, self.current_args["numIter"])
+        return ok
+
+    def _set_stage(self, stage):
+        self.current_args["stage"] = max(self.current_args["stage"], stage)
+
     def _try_add_test_times(self, step, verbose):
         if not self.control_args["tryAddTestTimes"]:
             return -1
+        self._set_stage(1)
         times = self.control_args["testIterTimesMore"]
         if isinstance(times, (int, float)):
             times = [int(times)]
@@ -651,9 +962,10 @@ class SmartAnalyze:
 
         if len(self.control_args["algoTypes"]) <= 1:
             return -1
+        self._set_stage(2)
 
         ok = -1
-        for algo_flag in self.control_args["algoTypes"][1:]:
+        for algo_flag in self._get_algo_types_to_try():
             color = get_random_color()
             if verbose:
                 print(
@@ -667,6 +979,7 @@ class SmartAnalyze:
             )
             ok = self._analyze_one_step(step, verbose=verbose)
             if ok == 0:
+                self._remember_algo(algo_flag)
                 return ok
         if ok < 0:  # goback
             self._setAlgorithm(
@@ -676,7 +989,39 @@ class SmartAnalyze:
             )
         return ok
 
+    def _get_algo_types_to_try(self):
+        algo_types = self.control_args["algoTypes"][1:]
+        if not self.control_args["algoCache"]:
+            return algo_types
+        # the first algorithm is tried last, in case the one that failed is a kept one
+        algo_types = algo_types + self.control_args["algoTypes"][:1]
+        algo_types = self.algo_cache + [flag for flag in algo_types if flag not in self.algo_cache]
+        return [flag for flag in algo_types if flag != self.algo_type]
+
+    def _remember_algo(self, algo_flag):
+        if self.control_args["algoCache"]:
+            if algo_flag in self.algo_cache:
+                self.algo_cache.remove(algo_flag)
+            self.algo_cache.insert(0, algo_flag)
+        self.algo_cooldown = self.control_args["algoCooldown"]
+
+    def _cool_down_algo(self):
+        if self.algo_cooldown is None:
+            return
+        if self.algo_type == self.control_args["algoTypes"][0]:
+            self.algo_cooldown = None
+            return
+        self.algo_cooldown -= 1
+        if self.algo_cooldown <= 0:
+            self.algo_cooldown = None
+            self._setAlgorithm(
+                self.control_args["algoTypes"][0],
+                self.control_args["UserAlgoArgs"],
+                verbose=self.debug_mode
+            )
+
     def _try_relax_step(self, step, verbose):
+        self._set_stage(3)
         alpha = self.control_args["relaxation"]
         min_step = self.control_args["minStep"]
         step_try = step * alpha  # The current step size we're trying to use
@@ -730,6 +1075,7 @@ class SmartAnalyze:
     def _try_loose_test_tol(self, step, verbose):
         if not self.control_args["tryLooseTestTol"]:
             return -1
+        self._set_stage(4)
         if verbose:
             color = get_random_color()
             print(
@@ -758,6 +1104,7 @@ class SmartAnalyze:
         )
 
     def _setAlgorithm(self, algotype, user_algo_args: list = None, verbose=True):
+        self.algo_type = algotype
         color = get_random_color()
         prefix = ">>> ▶️"
 
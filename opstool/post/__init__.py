@@ -2,14 +2,13 @@ import os
 import shutil
 from .model_data import save_model_data, load_model_data
 from .eigen_data import save_eigen_data, load_eigen_data, get_eigen_data
-from .responses_data import CreateODB, loadODB, get_model_data
+from .responses_data import CreateODB, loadODB, loadEnvelope, get_model_data, close_odb
 from .responses_data import get_nodal_responses, get_element_responses, get_sensitivity_responses
+from .responses_data import get_batch_responses, get_solver_telemetry
 from ..utils import CONSTANTS
 
-RESULTS_DIR = CONSTANTS.get_output_dir()
-
-if not os.path.exists(RESULTS_DIR):
-    os.mkdir(RESULTS_DIR)
+if not os.path.exists(CONSTANTS.get_output_dir()):
+    os.mkdir(CONSTANTS.get_output_dir())
 
 def set_odb_path(path: str):
     """Set the output directory for the results.
@@ -19,17 +18,33 @@ def set_odb_path(path: str):
     path: str
         The path to the output directory.
     """
+    close_odb()
+    old_dir = CONSTANTS.get_output_dir()
     CONSTANTS.set_output_dir(path)
-    if os.path.exists(RESULTS_DIR):
-        for item in os.listdir(RESULTS_DIR):
-            source_path = os.path.join(RESULTS_DIR, item)
+    if os.path.exists(old_dir) and os.path.abspath(old_dir) != os.path.abspath(path):
+        for item in os.listdir(old_dir):
+            source_path = os.path.join(old_dir, item)
             target_path = os.path.join(path, item)
             shutil.move(source_path, target_path)
-        shutil.rmtree(RESULTS_DIR)
+        shutil.rmtree(old_dir)
+
+
+def set_odb_format(odb_format: str = "nc"):
+    """Set the file format of the output databases written afterwards.
+
+    Parameters:
+    ------------
+    odb_format: str, default: "nc"
+        "nc" for netCDF files, or "zarr" for Zarr stores (directories), which requires ``pip install zarr``.
+        A Zarr store allows reading the responses while an analysis with ``CreateODB(save_every=...)`` is running.
+        The readers find the output databases in either format.
+    """
+    CONSTANTS.set_odb_format(odb_format)
 
 
 __all__ = [
     "set_odb_path",
+    "set_odb_format",
     "save_model_data",
     "save_eigen_data",
     "load_model_data",
@@ -37,8 +52,12 @@ __all__ = [
     "get_eigen_data",
     "CreateODB",
     "loadODB",
+    "loadEnvelope",
     "get_model_data",
     "get_nodal_responses",
     "get_element_responses",
-    "get_sensitivity_responses"
+    "get_sensitivity_responses",
+    "get_batch_responses",
+    "get_solver_telemetry",
+    "close_odb",
 ]
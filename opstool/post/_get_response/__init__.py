@@ -1,3 +1,4 @@
+from ._response_base import EleGeometryCache, StepSnapshot
 from ._get_model_info_step import ModelInfoStepData
 from ._get_nodal_resp import NodalRespStepData
 from ._get_truss_resp import TrussRespStepData
@@ -11,6 +12,8 @@ from ._get_contact_resp import ContactRespStepData
 from ._get_sensitivity_resp import SensitivityRespStepData
 
 __all__ = [
+    "EleGeometryCache",
+    "StepSnapshot",
     "ModelInfoStepData",
     "NodalRespStepData",
     "TrussRespStepData",
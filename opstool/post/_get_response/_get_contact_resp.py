@@ -1,24 +1,32 @@
-import openseespy.opensees as ops
 import xarray as xr
 
-from ._response_base import ResponseBase
+from ._response_base import EleGeometryCache, RespNameResolver, ResponseBase, StepBuffer
 from ...utils import suppress_ops_print
 
 
 class ContactRespStepData(ResponseBase):
 
-    def __init__(self, ele_tags=None):
+    def __init__(self, ele_tags=None, geo_cache: EleGeometryCache | None = None):
         self.resp_names = [
             "globalForces", "localForces", "localDisp", "slips"
         ]
+        self.attrs = {
+            "Px": "Global force in the x-direction on the constrained node",
+            "Py": "Global force in the y-direction on the constrained node",
+            "Pz": "Global force in the z-direction on the constrained node",
+            "N": "Normal force or deformation",
+            "Tx": "Tangential force or deformation in the x-direction",
+            "Ty": "Tangential force or deformation in the y-direction",
+        }
         self.resp_steps = None
         self.step_track = 0
         self.ele_tags = ele_tags
         self.times = []
+        self.resp_resolver = RespNameResolver(geo_cache)
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.ele_tags)
         self.step_track = 0
         self.times = [0.0]
@@ -27,44 +35,33 @@ class ContactRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, ele_tags):
+        time = self.get_snapshot().time
         with suppress_ops_print():
-            global_forces, forces, defos, slips = _get_contact_resp(ele_tags)
+            global_forces, forces, defos, slips = _get_contact_resp(ele_tags, self.resp_resolver)
         data_vars = {}
         if len(ele_tags) > 0:
             data_vars["globalForces"] = (["eleTags", "globalDOFs"], global_forces)
             data_vars["localForces"] = (["eleTags", "localDOFs"], forces)
             data_vars["localDisp"] = (["eleTags", "localDOFs"], defos)
             data_vars["slips"] = (["eleTags", "slipDOFs"], slips)
-            ds = xr.Dataset(
-                data_vars=data_vars,
-                coords={
-                    "eleTags": ele_tags,
-                    "globalDOFs": ["Px", "Py", "Pz"],
-                    "localDOFs": ["N", "Tx", "Ty"],
-                    "slipDOFs": ["Tx", "Ty"],
-                },
-                attrs={
-                    "Px": "Global force in the x-direction on the constrained node",
-                    "Py": "Global force in the y-direction on the constrained node",
-                    "Pz": "Global force in the z-direction on the constrained node",
-                    "N": "Normal force or deformation",
-                    "Tx": "Tangential force or deformation in the x-direction",
-                    "Ty": "Tangential force or deformation in the y-direction",
-                }
-            )
+            coords = {
+                "eleTags": ele_tags,
+                "globalDOFs": ["Px", "Py", "Pz"],
+                "localDOFs": ["N", "Tx", "Ty"],
+                "slipDOFs": ["Tx", "Ty"],
+            }
+            self.resp_steps.append(data_vars, coords, time=time)
         else:
             data_vars["globalForces"] = xr.DataArray([])
             data_vars["localForces"] = xr.DataArray([])
             data_vars["localDisp"] = xr.DataArray([])
             data_vars["slips"] = xr.DataArray([])
-            ds = xr.Dataset(data_vars=data_vars)
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+            self.resp_steps.append(data_vars, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
     def get_data(self):
         return self.resp_steps
@@ -101,21 +98,21 @@ class ContactRespStepData(ResponseBase):
                 return ds[resp_type]
 
 
-def _get_contact_resp(link_tags):
+def _get_contact_resp(link_tags, resolver: RespNameResolver):
     defos, forces, slips, global_forces = [], [], [], []
     for etag in link_tags:
         etag = int(etag)
         global_fo = _get_contact_resp_by_type(
-            etag, ("force", "forces"), type_="global"
+            etag, ("force", "forces"), resolver, type_="global"
         )
         defo = _get_contact_resp_by_type(
-            etag,("localDisplacement", "localDispJump"), type_="local"
+            etag,("localDisplacement", "localDispJump"), resolver, type_="local"
         )
         force = _get_contact_resp_by_type(
-            etag, ("localForce", "localForces", "forcescalars", "forcescalar"),
+            etag, ("localForce", "localForces", "forcescalars", "forcescalar"), resolver,
             type_ = "local"
         )
-        slip = _get_contact_resp_by_type(etag, ("slip",), type_="slip")
+        slip = _get_contact_resp_by_type(etag, ("slip",), resolver, type_="slip")
         global_forces.append(global_fo)
         defos.append(defo)
         forces.append(force)
@@ -123,13 +120,9 @@ def _get_contact_resp(link_tags):
     return global_forces, forces, defos, slips
 
 
-def _get_contact_resp_by_type(etag, etypes, type_="local"):
+def _get_contact_resp_by_type(etag, etypes, resolver: RespNameResolver, type_="local"):
     etag = int(etag)
-    resp = []
-    for name in etypes:
-        resp = ops.eleResponse(etag, name)
-        if len(resp) > 0:
-            break
+    resp = resolver.get_response(etag, etypes)
     if type_ == "local":
         if len(resp) == 0:
             resp = [0.0] * 3
@@ -2,9 +2,8 @@ import warnings
 import numpy as np
 import xarray as xr
 import openseespy.opensees as ops
-from typing import Union
 
-from ._response_base import ResponseBase, _expand_to_uniform_array
+from ._response_base import ResponseBase, StepBuffer
 
 
 class FiberSecData:
@@ -30,22 +29,28 @@ class FiberSecData:
         return cls.ELE_SEC_KEYS
 
 
-def _set_fiber_sec_data(fiber_ele_tags: Union[str, list, tuple] = None):
+def _set_fiber_sec_data(fiber_ele_tags: str | list | tuple | None = None):
     FiberSecData.add_data(fiber_ele_tags)
 
 
 class FiberSecRespStepData(ResponseBase):
-    def __init__(self, fiber_ele_tags: Union[str, list, tuple] = None):
+    def __init__(
+        self, fiber_ele_tags: str | list | tuple | None = None, fiber_points: str | list | tuple | None = None
+    ):
         _set_fiber_sec_data(fiber_ele_tags)
         self.ELE_SEC_KEYS = FiberSecData.get_ele_sec_keys()
+        self.fiber_points = fiber_points
 
+        self.attrs = None
         self.resp_steps = None
         self.times = []
         self.step_track = 0
+        self.layout = None
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
+        self.layout = _FiberSecLayout(self.ELE_SEC_KEYS, self.fiber_points)
         self.add_data_one_step()
         self.step_track = 0
         self.times = [0.0]
@@ -54,59 +59,34 @@ class FiberSecRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self):
-        stress, strain, defo, force = _get_fiber_sec_resp(self.ELE_SEC_KEYS)
+        time = self.get_snapshot().time
+        stress, strain, defo, force = self.layout.get_resp()
         data_vars = {}
-        if len(stress) > 0:
+        if stress.size > 0:
             data_vars["Stresses"] = (("eleTags", "secPoints", "fiberPoints"), stress)
             data_vars["Strains"] = (("eleTags", "secPoints", "fiberPoints"), strain)
-            if len(defo) > 0:
+            if defo.size > 0:
                 data_vars["secDefo"] = (("eleTags", "secPoints", "DOFs"), defo)
                 data_vars["secForce"] = (("eleTags", "secPoints", "DOFs"), force)
-            ds = xr.Dataset(
-                data_vars=data_vars,
-                coords={
-                    "eleTags": list(self.ELE_SEC_KEYS.keys()),
-                    "secPoints": np.arange(stress.shape[1]) + 1,
-                    "fiberPoints": np.arange(stress.shape[2]) + 1,
-                    "DOFs": ["P", "Mz", "My", "T",],
-                },
-            )
+            coords = {
+                "eleTags": list(self.ELE_SEC_KEYS.keys()),
+                "secPoints": np.arange(stress.shape[1]) + 1,
+                "fiberPoints": np.arange(stress.shape[2]) + 1,
+                "DOFs": ["P", "Mz", "My", "T",],
+            }
+            self.resp_steps.append(data_vars, coords, time=time)
         else:
-            ds = xr.Dataset(data_vars={"none": xr.DataArray([])})
+            self.resp_steps.append({"none": xr.DataArray([])}, time=time)
 
-        self.resp_steps.append(ds)
         self.step_track += 1
-        self.times.append(ops.getTime())
+        self.times.append(time)
 
     def _get_fiber_geo_data(self):
-        all_ys, all_zs, all_mats, all_areas = [], [], [], []
-        for ele_tag, sec_num in self.ELE_SEC_KEYS.items():
-            ele_tag = int(ele_tag)
-            sec_num = int(sec_num)
-            ys, zs, areas, mats = [], [], [], []
-            for i in range(sec_num):
-                fiber_data = _get_fiber_sec_data(ele_tag, i + 1)
-                ys.append(fiber_data[:, 0])
-                zs.append(fiber_data[:, 1])
-                areas.append(fiber_data[:, 2])
-                mats.append(fiber_data[:, 3])
-            all_ys.append(_expand_to_uniform_array(ys))
-            all_zs.append(_expand_to_uniform_array(zs))
-            all_areas.append(_expand_to_uniform_array(areas))
-            all_mats.append(_expand_to_uniform_array(mats))
-        all_ys = _expand_to_uniform_array(all_ys)
-        all_zs = _expand_to_uniform_array(all_zs)
-        all_areas = _expand_to_uniform_array(all_areas)
-        all_mats = _expand_to_uniform_array(all_mats)
-
-        self.resp_steps["ys"] = (("eleTags", "secPoints", "fiberPoints"), all_ys)
-        self.resp_steps["zs"] = (("eleTags", "secPoints", "fiberPoints"), all_zs)
-        self.resp_steps["areas"] = (("eleTags", "secPoints", "fiberPoints"), all_areas)
-        self.resp_steps["matTags"] = (("eleTags", "secPoints", "fiberPoints"), all_mats)
+        for name in ["ys", "zs", "areas", "matTags"]:
+            self.resp_steps[name] = (("eleTags", "secPoints", "fiberPoints"), self.layout.geo[name])
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
         self._get_fiber_geo_data()
 
     def get_data(self):
@@ -144,59 +124,141 @@ class FiberSecRespStepData(ResponseBase):
                 return ds[resp_type]
 
 
-def _get_fiber_sec_resp(ele_secs: dict):
-    """Get the fiber section responses one step.
+class _FiberSecLayout:
+    """The static fiber layout of the sections, found once by ``fiberData2``.
+
+    The fiber coordinates, areas and material tags are kept as arrays of shape (eleTags, secPoints, fiberPoints),
+    and each step only picks the stress and strain columns of the selected fibers into arrays of the same shape.
+    A section whose selected fibers are fewer than ``SPARSE_FIBER_RATIO`` of its fibers, e.g., the extreme fibers
+    or the rebars of a finely meshed section, queries each of them by ``fiber y z matTag stressStrain``
+    instead of the full ``fiberData2`` of the section.
 
     Parameters
     -----------
-    ele_secs: Union[list, tuple]
-        [(ele_tag1, sec_tag1), (ele_tag1, sec_tag2), …, (ele_tag2, sec_tag1), …]
+    ele_secs: dict
+        key: ele_tag, value: number of sections.
+    fiber_points: Union[str, list, tuple], default: None
+        The fibers to be saved for each section.
+        If None or "all", all fibers.
+        If "extreme", the outermost fibers, i.e., the fibers at the minimum or maximum y or z coordinates.
+        If a list of material tags, the fibers made of these materials.
     """
-    all_stress = []
-    all_strains = []
-    for ele_tag, sec_num in ele_secs.items():
-        ele_tag = int(ele_tag)
-        sec_num = int(sec_num)
-        stress, strain, defo, force = [], [], [], []
-        for i in range(sec_num):
-            fiber_data = _get_fiber_sec_data(ele_tag, i+1)
-            stress.append(fiber_data[:, -2])
-            strain.append(fiber_data[:, -1])
-        all_stress.append(_expand_to_uniform_array(stress))
-        all_strains.append(_expand_to_uniform_array(strain))
-    all_stress = _expand_to_uniform_array(all_stress)
-    all_strains = _expand_to_uniform_array(all_strains)
-
-    # -----------------------------------------------------------------------
-    all_defo = []
-    all_force = []
-    for ele_tag, sec_num in ele_secs.items():
-        ele_tag = int(ele_tag)
-        sec_num = int(sec_num)
-        defo, force = [], []
-        for i in range(sec_num):
-            defo_forces = ops.eleResponse(
-                ele_tag, "section", f"{i+1}", "forceAndDeformation"
-            )
-            if len(defo_forces) == 4:
-                defo_forces = [
-                    defo_forces[0],  # epsilon
-                    defo_forces[1],  # kappaz
-                    0.0,  # kappay
-                    0.0,  # theta
-                    defo_forces[2],  # P
-                    defo_forces[3],  # Mz
-                    0.0,  # My
-                    0.0,  # T
-                ]
-            defo.append(defo_forces[:4])
-            force.append(defo_forces[4:])
-        all_defo.append(np.array(defo))
-        all_force.append(np.array(force))
-    all_defo = _expand_to_uniform_array(all_defo)
-    all_force = _expand_to_uniform_array(all_force)
-
-    return all_stress, all_strains, all_defo, all_force
+
+    # the fraction of the fibers of a section below which the selected fibers are queried one by one
+    SPARSE_FIBER_RATIO = 0.1
+
+    def __init__(self, ele_secs: dict, fiber_points: str | list | tuple | None = None):
+        self.ele_secs = {int(ele_tag): int(sec_num) for ele_tag, sec_num in ele_secs.items()}
+        self.fiber_args = {}  # key: (ele_tag, sec_idx), value: eleResponse args of the fiber data
+        self.fiber_idx = {}  # key: (ele_tag, sec_idx), value: indexes of the stress column in the flat fiber data
+        self.fiber_queries = {}  # key: (ele_tag, sec_idx), value: eleResponse args of each fiber, or None
+        num_eles = len(self.ele_secs)
+        num_secs = max(self.ele_secs.values(), default=0)
+        data = {}
+        for ele_tag, sec_num in self.ele_secs.items():
+            for j in range(sec_num):
+                fiber_data = _get_fiber_sec_data(ele_tag, j + 1)
+                fiber_args = (ele_tag, "section", f"{j + 1}", "fiberData2")
+                if len(ops.eleResponse(*fiber_args)) == 0:
+                    fiber_args = (ele_tag, "section", "fiberData2")
+                idx = _select_fibers(fiber_data, fiber_points)
+                self.fiber_args[(ele_tag, j)] = fiber_args
+                self.fiber_idx[(ele_tag, j)] = 6 * idx + 4
+                if len(idx) < self.SPARSE_FIBER_RATIO * len(fiber_data) and len(fiber_args) == 4:
+                    self.fiber_queries[(ele_tag, j)] = _get_fiber_queries(fiber_args[:3], fiber_data, idx)
+                else:
+                    self.fiber_queries[(ele_tag, j)] = None
+                data[(ele_tag, j)] = fiber_data[idx]
+        num_fibers = max([len(d) for d in data.values()], default=0)
+        self.shape = (num_eles, num_secs, num_fibers)
+        self.geo = {name: np.full(self.shape, np.nan) for name in ["ys", "zs", "areas", "matTags"]}
+        for i, ele_tag in enumerate(self.ele_secs):
+            for j in range(self.ele_secs[ele_tag]):
+                fiber_data = data[(ele_tag, j)]
+                for k, name in enumerate(["ys", "zs", "areas", "matTags"]):
+                    self.geo[name][i, j, : len(fiber_data)] = fiber_data[:, k]
+
+    def get_resp(self):
+        """Get the fiber section responses one step."""
+        stress = np.full(self.shape, np.nan)
+        strain = np.full(self.shape, np.nan)
+        for i, ele_tag in enumerate(self.ele_secs):
+            for j in range(self.ele_secs[ele_tag]):
+                idx = self.fiber_idx[(ele_tag, j)]
+                if len(idx) == 0:
+                    continue
+                queries = self.fiber_queries[(ele_tag, j)]
+                if queries is not None:
+                    stress_strain = np.array([ops.eleResponse(*args) for args in queries])
+                    stress[i, j, : len(idx)] = stress_strain[:, 0]
+                    strain[i, j, : len(idx)] = stress_strain[:, 1]
+                    continue
+                fiber_data = np.asarray(ops.eleResponse(*self.fiber_args[(ele_tag, j)]))
+                stress[i, j, : len(idx)] = fiber_data[idx]
+                strain[i, j, : len(idx)] = fiber_data[idx + 1]
+        if stress.size == 0:
+            return stress, strain, np.array([]), np.array([])
+
+        # -----------------------------------------------------------------------
+        defo = np.full(self.shape[:2] + (4,), np.nan)
+        force = np.full(self.shape[:2] + (4,), np.nan)
+        for i, ele_tag in enumerate(self.ele_secs):
+            for j in range(self.ele_secs[ele_tag]):
+                defo_forces = ops.eleResponse(ele_tag, "section", f"{j+1}", "forceAndDeformation")
+                if len(defo_forces) == 4:
+                    defo_forces = [
+                        defo_forces[0],  # epsilon
+                        defo_forces[1],  # kappaz
+                        0.0,  # kappay
+                        0.0,  # theta
+                        defo_forces[2],  # P
+                        defo_forces[3],  # Mz
+                        0.0,  # My
+                        0.0,  # T
+                    ]
+                defo[i, j, : len(defo_forces[:4])] = defo_forces[:4]
+                force[i, j, : len(defo_forces[4:])] = defo_forces[4:]
+        return stress, strain, defo, force
+
+
+def _select_fibers(fiber_data: np.ndarray, fiber_points: str | list | tuple | None = None):
+    """Indexes of the fibers to be saved, see ``_FiberSecLayout``."""
+    if fiber_points is None or (isinstance(fiber_points, str) and fiber_points.lower() == "all"):
+        return np.arange(len(fiber_data))
+    if len(fiber_data) == 0:
+        return np.arange(0)
+    if isinstance(fiber_points, str):
+        if fiber_points.lower() != "extreme":
+            raise ValueError(f"fiber_points {fiber_points} not supported, optional: 'all', 'extreme' or matTags!")
+        ys, zs = fiber_data[:, 0], fiber_data[:, 1]
+        tol = 1e-8 * max(np.ptp(ys), np.ptp(zs), 1e-12)
+        is_extreme = np.zeros(len(fiber_data), dtype=bool)
+        for coords in (ys, zs):
+            # the z coordinates of 2D sections are all zero
+            if np.ptp(coords) > tol:
+                is_extreme |= (coords <= coords.min() + tol) | (coords >= coords.max() - tol)
+        if not np.any(is_extreme):
+            return np.arange(len(fiber_data))
+        return np.flatnonzero(is_extreme)
+    mat_tags = np.atleast_1d(fiber_points).astype(int)
+    return np.flatnonzero(np.isin(fiber_data[:, 3].astype(int), mat_tags))
+
+
+def _get_fiber_queries(sec_args: tuple, fiber_data: np.ndarray, idx: np.ndarray):
+    """The ``eleResponse`` args of the stress and strain of each selected fiber, by its coordinates and material,
+    or None if a fiber query does not return the same data as ``fiberData2``, e.g., for other kinds of sections.
+    The closest fiber of the material is returned by OpenSees, the fibers of one material at one point are alike.
+    """
+    queries = []
+    for k in idx:
+        y, z, _, mat_tag, stress, strain = fiber_data[k]
+        args = (*sec_args, "fiber", str(y), str(z), str(int(mat_tag)), "stressStrain")
+        resp = ops.eleResponse(*args)
+        if len(resp) != 2 or not np.allclose(resp, [stress, strain]):
+            return None
+        queries.append(args)
+    return queries
+
 
 def _get_fiber_sec_data(ele_tag: int, sec_num: int = 1):
     """Get the fiber sec data for a beam element.
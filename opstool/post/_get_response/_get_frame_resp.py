@@ -2,14 +2,20 @@ import numpy as np
 import openseespy.opensees as ops
 import xarray as xr
 
-from ._response_base import ResponseBase, _expand_to_uniform_array
+from ._response_base import EleGeometryCache, RespNameResolver, ResponseBase, StepBuffer, _expand_to_uniform_array
 
 ELASTIC_BEAM_CLASSES = [3, 5, 5001, 145, 146, 63, 631]
 
 
 class FrameRespStepData(ResponseBase):
 
-    def __init__(self, ele_tags=None, ele_load_data=None, elastic_frame_sec_points: int = 7):
+    def __init__(
+            self,
+            ele_tags=None,
+            ele_load_data=None,
+            elastic_frame_sec_points: int = 7,
+            geo_cache: EleGeometryCache | None = None,
+    ):
         self.resp_names = [
             "localForces",
             "basicForces",
@@ -19,16 +25,27 @@ class FrameRespStepData(ResponseBase):
             "sectionDeformations",
             "sectionLocs",
         ]
+        self.attrs = {
+            "localDofs": "local coord system dofs at end 1 and end 2",
+            "basicDofs": "basic coord system dofs at end 1 and end 2",
+            "secPoints": "section points No.",
+            "secDofs": "section forces and deformations Dofs. "
+                       "Note that the section DOFs are only valid for <Elastic Section>, "
+                       "<Elastic Shear Section>, and <Fiber Section>. "
+                       "For <Aggregator Section>, you should carefully check the data, "
+                       "as it may not correspond directly to the DOFs."
+        }
         self.resp_steps = None
         self.step_track = 0
         self.ele_tags = ele_tags
         self.ele_load_data = ele_load_data
         self.times = []
         self.elastic_frame_sec_points = elastic_frame_sec_points
+        self.resp_resolver = RespNameResolver(geo_cache)
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.ele_tags, self.ele_load_data)
         self.times = [0.0]
         self.step_track = 0
@@ -37,8 +54,10 @@ class FrameRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, ele_tags, ele_load_data):
-        local_forces = _get_beam_local_force(ele_tags, ("localForces", "localForce"))
-        basic_forces = _get_beam_basic_resp(ele_tags, ("basicForce", "basicForces"))
+        time = self.get_snapshot().time
+        resolver = self.resp_resolver
+        local_forces = _get_beam_local_force(ele_tags, ("localForces", "localForce"), resolver)
+        basic_forces = _get_beam_basic_resp(ele_tags, ("basicForce", "basicForces"), resolver)
         basic_defos = _get_beam_basic_resp(
             ele_tags,
             (
@@ -48,11 +67,14 @@ class FrameRespStepData(ResponseBase):
                 "chordDeformation",
                 "deformations",
             ),
+            resolver,
         )
         plastic_defos = _get_beam_basic_resp(
-            ele_tags, ("plasticRotation", "plasticDeformation")
+            ele_tags, ("plasticRotation", "plasticDeformation"), resolver
+        )
+        sec_f, sec_d, sec_locs = _get_beam_sec_resp(
+            ele_tags, ele_load_data, local_forces, self.elastic_frame_sec_points, resolver
         )
-        sec_f, sec_d, sec_locs = _get_beam_sec_resp(ele_tags, ele_load_data, local_forces, self.elastic_frame_sec_points)
         data_vars = dict()
         data_vars["localForces"] = (["eleTags", "localDofs"], local_forces)
         data_vars["basicForces"] = (["eleTags", "basicDofs"], basic_forces)
@@ -69,47 +91,33 @@ class FrameRespStepData(ResponseBase):
             loc_dofs = ["alpha", "X", "Y", "Z"]
         else:
             loc_dofs = [f"loc{i+1}" for i in range(sec_locs.shape[-1])]
-        ds = xr.Dataset(
-            data_vars=data_vars,
-            coords={
-                "eleTags": ele_tags,
-                "localDofs": [
-                    "FX1",
-                    "FY1",
-                    "FZ1",
-                    "MX1",
-                    "MY1",
-                    "MZ1",
-                    "FX2",
-                    "FY2",
-                    "FZ2",
-                    "MX2",
-                    "MY2",
-                    "MZ2",
-                ],
-                "basicDofs": ["N", "MZ1", "MZ2", "MY1", "MY2", "T"],
-                "secPoints": np.arange(sec_locs.shape[1])+1,
-                "secDofs": ["N", "MZ", "VY", "MY", "VZ", "T"],
-                "locs": loc_dofs,
-            },
-            attrs={
-                "localDofs": "local coord system dofs at end 1 and end 2",
-                "basicDofs": "basic coord system dofs at end 1 and end 2",
-                "secPoints": "section points No.",
-                "secDofs": "section forces and deformations Dofs. "
-                           "Note that the section DOFs are only valid for <Elastic Section>, "
-                           "<Elastic Shear Section>, and <Fiber Section>. "
-                           "For <Aggregator Section>, you should carefully check the data, "
-                           "as it may not correspond directly to the DOFs."
-            },  # add attributes
-        )
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+        coords = {
+            "eleTags": ele_tags,
+            "localDofs": [
+                "FX1",
+                "FY1",
+                "FZ1",
+                "MX1",
+                "MY1",
+                "MZ1",
+                "FX2",
+                "FY2",
+                "FZ2",
+                "MX2",
+                "MY2",
+                "MZ2",
+            ],
+            "basicDofs": ["N", "MZ1", "MZ2", "MY1", "MY2", "T"],
+            "secPoints": np.arange(sec_locs.shape[1])+1,
+            "secDofs": ["N", "MZ", "VY", "MY", "VZ", "T"],
+            "locs": loc_dofs,
+        }
+        self.resp_steps.append(data_vars, coords, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
     def get_data(self):
         return self.resp_steps
@@ -146,15 +154,11 @@ class FrameRespStepData(ResponseBase):
                 return ds[resp_type]
 
 
-def _get_beam_local_force(beam_tags, resp_types):
+def _get_beam_local_force(beam_tags, resp_types, resolver: RespNameResolver):
     local_forces = []
     for eletag in beam_tags:
         eletag = int(eletag)
-        forces = []
-        for name in resp_types:
-            forces = ops.eleResponse(eletag, name)
-            if len(forces) > 0:
-                break
+        forces = resolver.get_response(eletag, resp_types)
         if len(forces) == 0:
             forces = [0.0] * 12
         elif len(forces) == 6:
@@ -176,15 +180,11 @@ def _get_beam_local_force(beam_tags, resp_types):
     return np.array(local_forces)
 
 
-def _get_beam_basic_resp(beam_tags, resp_types):
+def _get_beam_basic_resp(beam_tags, resp_types, resolver: RespNameResolver):
     basic_resps = []
     for ele_tag in beam_tags:
         ele_tag = int(ele_tag)
-        resp = []
-        for name in resp_types:
-            resp = ops.eleResponse(ele_tag, name)
-            if len(resp) > 0:
-                break
+        resp = resolver.get_response(ele_tag, resp_types)
         if len(resp) == 0:
             resp = [0.0] * 6
         elif len(resp) == 3:
@@ -200,24 +200,26 @@ def _get_beam_basic_resp(beam_tags, resp_types):
     return np.array(basic_resps)
 
 
-def _get_beam_sec_resp(beam_tags, ele_load_data, local_forces, n_secs_elastic_beam):
-    pattern_tags, load_eletags = [], []
-    if len(ele_load_data) > 0:
-        petags = ele_load_data.coords["PatternEleTags"].values
-        for item in petags:
-            num1, num2 = item.split("-")
-            pattern_tags.append(int(num1))
-            load_eletags.append(int(num2))
-    pattern_tags = np.array(pattern_tags)
-    load_eletags = np.array(load_eletags)
-    # -----------------------------------------------------
+def _get_beam_sec_resp(beam_tags, ele_load_data, local_forces, n_secs_elastic_beam, resolver: RespNameResolver):
     beam_secF, beam_secD, beam_locs = [], [], []
-    beam_lengths, start_coords, end_coords = _get_ele_length(beam_tags)
-    for eletag, length, local_f in zip(beam_tags, beam_lengths, local_forces):
+    beam_lengths, start_coords, end_coords = _get_ele_length(beam_tags, resolver.geo_cache)
+    # -----------------------------------------------------
+    # elastic beams, section forces are recovered from the end forces and element loads in a batch
+    is_elastic = np.array(
+        [resolver.get_class_tag(int(tag)) in ELASTIC_BEAM_CLASSES for tag in beam_tags], dtype=bool
+    )
+    elastic_xlocs = np.linspace(0, 1.0, n_secs_elastic_beam)
+    load_table = _get_ele_load_table(ele_load_data, np.asarray(beam_tags)[is_elastic], resolver.geo_cache)
+    elastic_sec_f = _get_elastic_sec_forces(
+        beam_lengths[is_elastic], local_forces[is_elastic], elastic_xlocs, load_table
+    )
+    elastic_sec_f = iter(elastic_sec_f)
+    # -----------------------------------------------------
+    for eletag, length, elastic in zip(beam_tags, beam_lengths, is_elastic):
         eletag = int(eletag)
-        if ops.getEleClassTags(eletag)[0] in ELASTIC_BEAM_CLASSES:  # elastic beam
-            xlocs = np.linspace(0, 1.0, n_secs_elastic_beam)
-            sec_f = _get_sec_forces(eletag, length, ele_load_data, pattern_tags, load_eletags, local_f, xlocs)
+        if elastic:  # elastic beam
+            xlocs = elastic_xlocs
+            sec_f = next(elastic_sec_f)
             sec_d = np.zeros_like(sec_f)
         else:
             xlocs = []
@@ -264,72 +266,95 @@ def _get_beam_sec_resp(beam_tags, ele_load_data, local_forces, n_secs_elastic_be
     return beam_secF, beam_secD, beam_sec_locs
 
 
-def _get_sec_forces(ele_tag, length, ele_load_data, pattern_tags, load_eletags, local_force, xlocs):
-    sec_locs = xlocs
-    sec_x = sec_locs * length
-    sec_f = np.full((len(xlocs), 6), 0.0)
-    # N1, Mz1, Vy1, My1, Vz1, T1
-    sec_f[:, 0] = -local_force[0]
-    sec_f[:, 1] = -local_force[5] + local_force[1] * sec_x
-    sec_f[:, 2] = local_force[1]
-    sec_f[:, 3] = -local_force[4] - local_force[2] * sec_x
-    sec_f[:, 4] = -local_force[2]
-    sec_f[:, 5] = -local_force[3]
-    if ele_tag in load_eletags:
-        idx = np.abs(load_eletags - ele_tag) < 1e-4
-        load_data = ele_load_data[idx, 2:].data
-        ptags = pattern_tags[idx]
-        factors = [ops.getLoadFactor(int(ptag)) for ptag in ptags]
-    else:
-        load_data = [[0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1.0]]
-        factors = [0.0]
-    for ldata, factor in zip(load_data, factors):
-        wya, wyb, wza, wzb, wxa, wxb, xa, xb = ldata
-        if xb > xa and np.abs(xb - xa - 1) < 1e-2:   # Full uniform load
-            wx, wy, wz = wxa * factor, wya * factor, wza * factor
-            sec_f[:, 0] += -wx * sec_x
-            sec_f[:, 1] += 0.5 * wy * sec_x ** 2
-            sec_f[:, 2] += wy * sec_x
-            sec_f[:, 3] += -0.5 * wz * sec_x * sec_x
-            sec_f[:, 4] += -wz * sec_x
-        elif xb < xa:  # Point Load
-            px, py, pz = wxa * factor, wya * factor, wza * factor
-            xa = xa * length
-            idx = sec_x > xa
-            sec_f[idx, 0] += -px
-            sec_f[idx, 1] += py * (sec_x[idx] - xa)
-            sec_f[idx:, 2] += py
-            sec_f[idx:, 3] += -pz * (sec_x[idx] - xa)
-            sec_f[idx:, 4] += -pz
-        elif xb > xa and np.abs(xb - xa - 1) > 1e-2:  # Partial uniform load
-            wx, wy, wz = wxa * factor, wya * factor, wza * factor
-            xa = xa * length
-            xb = xb * length
-            idx2 = sec_x > xa & sec_x < xb
-            idx3 = sec_x >= xb
-            sec_f[idx2, 0] += -wx * (sec_x[idx2] - xa)
-            sec_f[idx2, 1] += 0.5 * wy * (sec_x[idx2] - xa) ** 2
-            sec_f[idx2, 2] += wy * (sec_x[idx2] - xa)
-            sec_f[idx2, 3] += -0.5 * wz * (sec_x[idx2] - xa) ** 2
-            sec_f[idx2, 4] += -wz * (sec_x[idx2] - xa)
-            # ------------------------------
-            sec_f[idx3, 0] += -wx * (xb - xa)
-            sec_f[idx3, 1] += wy * (xb - xa) * (sec_x[idx3] - 0.5 * (xb + xa))
-            sec_f[idx3, 2] += wy * (xb - xa)
-            sec_f[idx3, 3] += -wz * (xb - xa) * (sec_x[idx3] - 0.5 * (xb + xa))
-            sec_f[idx3, 4] += -wz * (xb - xa)
+def _get_ele_load_table(ele_load_data, ele_tags, geo_cache: EleGeometryCache):
+    """Parse the element loads acting on ``ele_tags``.
+
+    The element loads are part of the model info, so the table is cached for the model-info version
+    tracked by ``geo_cache``, whose :meth:`EleGeometryCache.update` drops it when the version changes.
+
+    Returns
+    --------
+    (ele_idx, pattern_tags, load_values):
+        The index in ``ele_tags`` of the loaded element, the load pattern tag,
+        and the load values ``wya, wyb, wza, wzb, wxa, wxb, xa, xb`` of each load.
+    """
+    key = ("eleLoads", geo_cache.version, tuple(int(tag) for tag in ele_tags))
+    if key not in geo_cache.arrays:
+        ele_idx, pattern_tags, rows = [], [], []
+        if len(ele_load_data) > 0:
+            index = {tag: i for i, tag in enumerate(key[2])}
+            petags = ele_load_data.coords["PatternEleTags"].values
+            for k, item in enumerate(petags):
+                num1, num2 = item.split("-")
+                if int(num2) in index:
+                    ele_idx.append(index[int(num2)])
+                    pattern_tags.append(int(num1))
+                    rows.append(k)
+        load_values = np.asarray(ele_load_data.data, dtype=float)[rows, 2:] if len(rows) > 0 else np.zeros((0, 8))
+        geo_cache.arrays[key] = (np.array(ele_idx, dtype=int), np.array(pattern_tags, dtype=int), load_values)
+    return geo_cache.arrays[key]
+
+
+def _get_elastic_sec_forces(lengths, local_forces, xlocs, load_table):
+    """Section forces (N, Mz, Vy, My, Vz, T) of elastic beams, an array of shape (num_eles, num_secs, 6)."""
+    local_forces = np.reshape(local_forces, (-1, 12))
+    sec_x = lengths[:, None] * xlocs[None, :]
+    sec_f = np.zeros((*sec_x.shape, 6))
+    sec_f[..., 0] = -local_forces[:, [0]]
+    sec_f[..., 1] = -local_forces[:, [5]] + local_forces[:, [1]] * sec_x
+    sec_f[..., 2] = local_forces[:, [1]]
+    sec_f[..., 3] = -local_forces[:, [4]] - local_forces[:, [2]] * sec_x
+    sec_f[..., 4] = -local_forces[:, [2]]
+    sec_f[..., 5] = -local_forces[:, [3]]
+    ele_idx, pattern_tags, load_values = load_table
+    if len(ele_idx) == 0:
+        return sec_f
+    # load factors, one call per pattern
+    patterns, pattern_idx = np.unique(pattern_tags, return_inverse=True)
+    factors = np.array([ops.getLoadFactor(int(ptag)) for ptag in patterns])[pattern_idx]
+    wy = (load_values[:, 0] * factors)[:, None]
+    wz = (load_values[:, 2] * factors)[:, None]
+    wx = (load_values[:, 4] * factors)[:, None]
+    xa = load_values[:, [6]] * lengths[ele_idx][:, None]
+    xb = load_values[:, [7]] * lengths[ele_idx][:, None]
+    rel_xa, rel_xb = load_values[:, 6], load_values[:, 7]
+    x = sec_x[ele_idx]
+    load_f = np.zeros((*x.shape, 6))
+    # Full uniform load
+    rows = (rel_xb > rel_xa) & (np.abs(rel_xb - rel_xa - 1) < 1e-2)
+    load_f[rows, :, 0] = -wx[rows] * x[rows]
+    load_f[rows, :, 1] = 0.5 * wy[rows] * x[rows] ** 2
+    load_f[rows, :, 2] = wy[rows] * x[rows]
+    load_f[rows, :, 3] = -0.5 * wz[rows] * x[rows] ** 2
+    load_f[rows, :, 4] = -wz[rows] * x[rows]
+    # Point Load
+    rows = rel_xb < rel_xa
+    after = x[rows] > xa[rows]
+    dx = (x[rows] - xa[rows]) * after
+    load_f[rows, :, 0] = -wx[rows] * after
+    load_f[rows, :, 1] = wy[rows] * dx
+    load_f[rows, :, 2] = wy[rows] * after
+    load_f[rows, :, 3] = -wz[rows] * dx
+    load_f[rows, :, 4] = -wz[rows] * after
+    # Partial uniform load
+    rows = (rel_xb > rel_xa) & (np.abs(rel_xb - rel_xa - 1) > 1e-2)
+    a, b, xs = xa[rows], xb[rows], x[rows]
+    inside = (xs > a) & (xs < b)
+    after = xs >= b
+    dx = (xs - a) * inside
+    resultant = (b - a) * after
+    arm = (xs - 0.5 * (a + b)) * after
+    load_f[rows, :, 0] = -wx[rows] * (dx + resultant)
+    load_f[rows, :, 1] = 0.5 * wy[rows] * dx ** 2 + wy[rows] * (b - a) * arm
+    load_f[rows, :, 2] = wy[rows] * (dx + resultant)
+    load_f[rows, :, 3] = -0.5 * wz[rows] * dx ** 2 - wz[rows] * (b - a) * arm
+    load_f[rows, :, 4] = -wz[rows] * (dx + resultant)
+    np.add.at(sec_f, ele_idx, load_f)
     return sec_f
 
 
-def _get_ele_length(ele_tags):
-    coords1, coords2 = [], []
-    for ele_tag in ele_tags:
-        ele_tag = int(ele_tag)
-        nodes = ops.eleNodes(ele_tag)
-        coords1.append(ops.nodeCoord(nodes[0]))
-        coords2.append(ops.nodeCoord(nodes[1]))
-    start = np.array(coords1)
-    end = np.array(coords2)
+def _get_ele_length(ele_tags, geo_cache: EleGeometryCache):
+    start, end = geo_cache.get_ele_ends(ele_tags)
     return np.linalg.norm(end-start, axis=1), start, end
 
 def _get_ele_sec_coords(start, end, sec_locs):
@@ -1,21 +1,28 @@
-import openseespy.opensees as ops
 import xarray as xr
 
-from ._response_base import ResponseBase
+from ._response_base import EleGeometryCache, RespNameResolver, ResponseBase, StepBuffer
 
 
 class LinkRespStepData(ResponseBase):
 
-    def __init__(self, ele_tags=None):
+    def __init__(self, ele_tags=None, geo_cache: EleGeometryCache | None = None):
         self.resp_names = ["basicDeformation", "basicForce"]
+        self.attrs = {
+            "DOFs": "The DOFs are aligned with the local coordinate system. "
+                    "Note that these DOFs are not necessarily valid unless all degrees of freedom are "
+                    "assigned to the material (e.g., all six DOFs in 3D). "
+                    "For cases where the material is assigned to only partial DOFs, "
+                    "the actual DOFs are arranged sequentially, with the remaining ones padded with zeros."
+        }
         self.resp_steps = None
         self.step_track = 0
         self.ele_tags = ele_tags
         self.times = []
+        self.resp_resolver = RespNameResolver(geo_cache)
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.ele_tags)
         self.step_track = 0
         self.times = [0.0]
@@ -24,36 +31,26 @@ class LinkRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, ele_tags):
-        data = _get_link_resp(ele_tags)
+        time = self.get_snapshot().time
+        data = _get_link_resp(ele_tags, self.resp_resolver)
         data_vars = {}
         if len(ele_tags) > 0:
             for name, data_ in zip(self.resp_names, data):
                 data_vars[name] = (["eleTags", "DOFs"], data_)
-            ds = xr.Dataset(
-                data_vars=data_vars,
-                coords={
-                    "eleTags": ele_tags,
-                    "DOFs": ["UX", "UY", "UZ", "RX", "RY", "RZ"],
-                },
-                attrs={
-                    "DOFs": "The DOFs are aligned with the local coordinate system. "
-                            "Note that these DOFs are not necessarily valid unless all degrees of freedom are "
-                            "assigned to the material (e.g., all six DOFs in 3D). "
-                            "For cases where the material is assigned to only partial DOFs, "
-                            "the actual DOFs are arranged sequentially, with the remaining ones padded with zeros."
-                }
-            )
+            coords = {
+                "eleTags": ele_tags,
+                "DOFs": ["UX", "UY", "UZ", "RX", "RY", "RZ"],
+            }
+            self.resp_steps.append(data_vars, coords, time=time)
         else:
             for name, data_ in zip(self.resp_names, data):
                 data_vars[name] = xr.DataArray([])
-            ds = xr.Dataset(data_vars=data_vars)
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+            self.resp_steps.append(data_vars, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
     def get_data(self):
         return self.resp_steps
@@ -90,7 +87,7 @@ class LinkRespStepData(ResponseBase):
                 return ds[resp_type]
 
 
-def _get_link_resp(link_tags):
+def _get_link_resp(link_tags, resolver: RespNameResolver):
     defos, forces = [], []
     for etag in link_tags:
         etag = int(etag)
@@ -104,22 +101,18 @@ def _get_link_resp(link_tags):
                 "basicDisplacements",
                 "basicDisplacement",
             ),
+            resolver,
         )
-        force = _get_link_resp_by_type(etag, ("basicForces", "basicForce"))
+        force = _get_link_resp_by_type(etag, ("basicForces", "basicForce"), resolver)
         defos.append(defo)
         forces.append(force)
     return defos, forces
 
 
-def _get_link_resp_by_type(etag, etypes):
+def _get_link_resp_by_type(etag, etypes, resolver: RespNameResolver):
     etag = int(etag)
-    ntags = ops.eleNodes(etag)
-    ndim = len(ops.nodeCoord(ntags[0]))
-    resp = []
-    for name in etypes:
-        resp = ops.eleResponse(etag, name)
-        if len(resp) > 0:
-            break
+    ndim = resolver.geo_cache.get_ele_ndm(etag)
+    resp = resolver.get_response(etag, etypes)
     if len(resp) == 0:
         resp = [0.0] * 6
     elif ndim == 2 and len(resp) == 3:
@@ -6,10 +6,29 @@ from ..model_data import GetFEMData
 
 
 class ModelInfoStepData(ResponseBase):
+    """The model info at the recorded steps.
+
+    If ``model_update`` is True, the domain is checked at each step by a cheap signature of the
+    node, element, fixed and constrained node tags and the loads, see ``_get_domain_signature``,
+    and the model info is only rebuilt when the signature changes or the caller says that the model changed.
+    Each kind of model info, e.g., ``NodalData`` or ``BeamData``, keeps its distinct versions only,
+    and each recorded step refers to one of them,
+    so a stage that only removes elements adds no new version of the nodal data.
+    """
 
     def __init__(self, model_update: bool = False):
         self.model_update = model_update
+        # key: model info name, value: list of the distinct versions
         self.model_info_steps = dict()
+        # key: model info name, value: list of the version index at each recorded step
+        self.version_steps = {}
+        # the model info of the last fetched step, recorded or not
+        self.current_info = {}
+        # the domain signature of current_info, see _get_domain_signature
+        self.signature = None
+        # the version is increased whenever the model info changes,
+        # data derived from the domain geometry can be cached for one version
+        self.version = 0
         # -----------------------------------------
         self.times = None
         self.step_track = 0
@@ -26,6 +45,10 @@ class ModelInfoStepData(ResponseBase):
         # ------------------------------------------------------------
         for key, value in model_info.items():
             self.model_info_steps[key] = [value]
+            self.version_steps[key] = [0]
+        self.current_info = model_info
+        self.signature = _get_domain_signature() if self.model_update else None
+        self.version += 1
         # ------------------------------------------------------------------
         self.init = True
         self.step_track = 0
@@ -33,26 +56,49 @@ class ModelInfoStepData(ResponseBase):
     def reset(self):
         self.initialize()
 
-    def add_data_one_step(self):
+    def add_data_one_step(self, record: bool = True, model_changed: bool = False):
+        """Update the current model info if ``model_update`` is True, and record it if ``record`` is True.
+
+        The model info is rebuilt when the domain signature changes,
+        or when ``model_changed`` is True, e.g., after nodes are moved by ``ops.setNodeCoord``.
+        """
         if self.model_update:
-            model_info, _ = GetFEMData().get_model_info()
-            for key, value in model_info.items():
-                self.model_info_steps[key].append(value)
-            self.times.append(ops.getTime())
+            signature = _get_domain_signature()
+            if model_changed or signature != self.signature:
+                self.signature = signature
+                self._update_info()
+            if record:
+                for key, versions in self.version_steps.items():
+                    versions.append(len(self.model_info_steps[key]) - 1)
+                self.times.append(self.get_snapshot().time)
         self.step_track += 1
 
+    def _update_info(self):
+        """Rebuild the model info and add a new version of each kind that changed."""
+        model_info, _ = GetFEMData().get_model_info()
+        changed = False
+        for key, value in model_info.items():
+            if not value.equals(self.current_info[key]):
+                self.model_info_steps[key].append(value)
+                changed = True
+        if changed:
+            self.version += 1
+            self.current_info = model_info
+
     def _to_xarray(self):
         for key, data in self.model_info_steps.items():
-            new_data = xr.concat(data, dim="time", join="outer")
-            new_data.coords["time"] = self.times
-            self.model_info_steps[key] = new_data
+            new_data = xr.concat(data, dim="version", join="outer")
+            self.model_info_steps[key] = xr.Dataset(
+                {key: new_data, "versionSteps": (["time"], self.version_steps[key])},
+                coords={"time": self.times},
+            )
         model_update = 1 if self.model_update else 0
-        self.model_info_steps["ModelUpdate"] = xr.DataArray(
-            model_update, name="ModelUpdate"
+        self.model_info_steps["ModelUpdate"] = xr.Dataset(
+            {"ModelUpdate": xr.DataArray(model_update, name="ModelUpdate")}
         )
 
     def get_current_node_tags(self):
-        da = self.model_info_steps["NodalData"][-1]
+        da = self.current_info["NodalData"]
         node_tags = list(da.coords["tags"].data)
         unused_node_tags = da.attrs["unusedNodeTags"]
         for tag in unused_node_tags:
@@ -61,49 +107,49 @@ class ModelInfoStepData(ResponseBase):
         return node_tags
 
     def get_current_truss_tags(self):
-        da = self.model_info_steps["TrussData"][-1]
+        da = self.current_info["TrussData"]
         if len(da) > 0:
             return da.coords["eleTags"].values
         return []
 
     def get_current_frame_tags(self):
-        da = self.model_info_steps["BeamData"][-1]
+        da = self.current_info["BeamData"]
         if len(da) > 0:
             return da.coords["eleTags"].values
         return []
 
     def get_current_link_tags(self):
-        da = self.model_info_steps["LinkData"][-1]
+        da = self.current_info["LinkData"]
         if len(da) > 0:
             return da.coords["eleTags"].values
         return []
 
     def get_current_shell_tags(self):
-        da = self.model_info_steps["ShellData"][-1]
+        da = self.current_info["ShellData"]
         if len(da) > 0:
             return da.coords["eleTags"].values
         return []
 
     def get_current_plane_tags(self):
-        da = self.model_info_steps["PlaneData"][-1]
+        da = self.current_info["PlaneData"]
         if len(da) > 0:
             return da.coords["eleTags"].values
         return []
 
     def get_current_brick_tags(self):
-        da = self.model_info_steps["BrickData"][-1]
+        da = self.current_info["BrickData"]
         if len(da) > 0:
             return da.coords["eleTags"].values
         return []
 
     def get_current_contact_tags(self):
-        da = self.model_info_steps["ContactData"][-1]
+        da = self.current_info["ContactData"]
         if len(da) > 0:
             return da.coords["eleTags"].values
         return []
 
     def get_current_frame_load_data(self):
-        da = self.model_info_steps["EleLoadData"][-1]
+        da = self.current_info["EleLoadData"]
         if len(da) > 0:
             return da
         return []
@@ -116,16 +162,15 @@ class ModelInfoStepData(ResponseBase):
 
     def save_file(self, dt: xr.DataTree):
         self._to_xarray()
-        model_info_steps = self.model_info_steps
-        for data in model_info_steps.values():
-            dt[f"ModelInfo/{data.name}"] = xr.Dataset({data.name: data})
+        for key, ds in self.model_info_steps.items():
+            dt[f"ModelInfo/{key}"] = ds
         return dt
 
     @staticmethod
     def read_file(dt: xr.DataTree):
         model_info = dict()
         for key, value in dt["ModelInfo"].items():
-            model_info[key] = value[key]
+            model_info[key] = _expand_versions(value.to_dataset(), key)
         model_update = int(model_info["ModelUpdate"])
         model_update = True if model_update == 1 else False
         return model_info, model_update
@@ -142,7 +187,47 @@ class ModelInfoStepData(ResponseBase):
             The data type to read.
         """
         model_update = int(dt["ModelInfo"]["ModelUpdate"]["ModelUpdate"])
-        data = dt["ModelInfo"][data_type][data_type]
+        data = _expand_versions(dt["ModelInfo"][data_type].to_dataset(), data_type)
         if model_update == 1:
             return data
         return data.isel(time=0)
+
+
+def _expand_versions(ds: xr.Dataset, key: str) -> xr.DataArray:
+    """The model info ``key`` along the time dimension, given the dataset of its versions.
+
+    Files written before the model info was versioned hold the steps along time already.
+    """
+    data = ds[key]
+    if "version" not in data.dims:
+        return data
+    steps = ds["versionSteps"]
+    return data.isel(version=steps).drop_vars("versionSteps", errors="ignore")
+
+
+def _get_domain_signature():
+    """A cheap summary of the domain, made of the node, element, fixed, retained and constrained node tags,
+    and the loads of each pattern, i.e., of lists returned by one OpenSees call each.
+
+    No node or element is queried on its own, so changes that keep all these tags are not detected,
+    e.g., nodes moved by ``ops.setNodeCoord``, other fixed DOFs of a fixed node,
+    or an element removed and added again with the same tag in one step.
+    Pass ``model_changed=True`` to ``CreateODB.fetch_response_step`` after such changes.
+    """
+    return (
+        tuple(ops.getNodeTags()),
+        tuple(ops.getEleTags()),
+        tuple(ops.getFixedNodes()),
+        tuple(ops.getRetainedNodes()),
+        tuple(ops.getConstrainedNodes()),
+        tuple(
+            (
+                pattern,
+                tuple(ops.getNodeLoadTags(pattern)),
+                tuple(ops.getNodeLoadData(pattern)),
+                tuple(ops.getEleLoadTags(pattern)),
+                tuple(ops.getEleLoadData(pattern)),
+            )
+            for pattern in ops.getPatterns()
+        ),
+    )
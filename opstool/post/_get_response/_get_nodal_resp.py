@@ -1,8 +1,10 @@
+from itertools import chain
+
 import numpy as np
 import openseespy.opensees as ops
 import xarray as xr
 
-from ._response_base import ResponseBase
+from ._response_base import ResponseBase, StepBuffer
 
 
 class NodalRespStepData(ResponseBase):
@@ -21,13 +23,22 @@ class NodalRespStepData(ResponseBase):
             # "accSensitivity",
         ]
         self.node_tags = node_tags if node_tags is not None else ops.getNodeTags()
+        self.dof_scatter = DofScatter()
+        self.attrs = {
+            "UX": "Displacement in X direction",
+            "UY": "Displacement in Y direction",
+            "UZ": "Displacement in Z direction",
+            "RX": "Rotation about X axis",
+            "RY": "Rotation about Y axis",
+            "RZ": "Rotation about Z axis",
+        }
         self.resp_steps = None
         self.times = []
         self.step_track = 0
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.node_tags)
         self.times = [0.0]
         self.step_track = 0
@@ -36,32 +47,22 @@ class NodalRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, node_tags):
-        # node_tags = ops.getNodeTags()
-        disp, vel, accel, pressure = _get_nodal_resp(node_tags)
-        reacts, reacts_inertia, rayleigh_forces = _get_nodal_react(node_tags)
+        snapshot = self.get_snapshot()
+        time = snapshot.time
+        disp, vel, accel, pressure = _get_nodal_resp(node_tags, snapshot, self.dof_scatter)
+        reacts, reacts_inertia, rayleigh_forces = _get_nodal_react(node_tags, snapshot, self.dof_scatter)
         datas = [disp, vel, accel, reacts, reacts_inertia, rayleigh_forces]
         data_vars = {}
         for name, data_ in zip(self.nodal_resp_names, datas):
             data_vars[name] = (["nodeTags", "DOFs"], data_)
         data_vars["pressure"] = (["nodeTags"], pressure)
         # can have different dimensions and coordinates
-        ds = xr.Dataset(
-            data_vars=data_vars,
-            coords={
-                "nodeTags": node_tags,
-                "DOFs": ["UX", "UY", "UZ", "RX", "RY", "RZ"],
-            },
-            attrs={
-                "UX": "Displacement in X direction",
-                "UY": "Displacement in Y direction",
-                "UZ": "Displacement in Z direction",
-                "RX": "Rotation about X axis",
-                "RY": "Rotation about Y axis",
-                "RZ": "Rotation about Z axis",
-            },
-        )
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+        coords = {
+            "nodeTags": node_tags,
+            "DOFs": ["UX", "UY", "UZ", "RX", "RY", "RZ"],
+        }
+        self.resp_steps.append(data_vars, coords, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def get_data(self):
@@ -71,8 +72,7 @@ class NodalRespStepData(ResponseBase):
         return self.step_track
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
     def save_file(self, dt: xr.DataTree):
         self._to_xarray()
@@ -104,97 +104,100 @@ class NodalRespStepData(ResponseBase):
                 return ds[resp_type]
 
 
-def _get_nodal_resp(node_tags):
-    node_disp = []  # 6 data each row, Ux, Uy, Uz, Rx, Ry, Rz
-    node_vel = []  # 6 data each row, Ux, Uy, Uz, Rx, Ry, Rz
-    node_accel = []  # 6 data each row, Ux, Uy, Uz, Rx, Ry, Rz
-    node_pressure = []  # 1 data each row, P
-    all_node_tags = ops.getNodeTags()
-    for i, tag in enumerate(node_tags):
-        tag = int(tag)
-        if tag in all_node_tags:
-            coord = ops.nodeCoord(tag)
-            disp = ops.nodeDisp(tag)
-            vel = ops.nodeVel(tag)
-            accel = ops.nodeAccel(tag)
-            if len(coord) == 1:
-                disp.extend([0, 0, 0, 0, 0])
-                vel.extend([0, 0, 0, 0, 0])
-                accel.extend([0, 0, 0, 0, 0])
-            elif len(coord) == 2:
-                if len(disp) == 2:  # 2 ndim 2 dof
-                    disp.extend([0, 0, 0, 0])
-                    vel.extend([0, 0, 0, 0])
-                    accel.extend([0, 0, 0, 0])
-                elif len(disp) >= 3:  # 2 ndim 3 dof
-                    disp = [disp[0], disp[1], 0.0, 0.0, 0.0, disp[2]]
-                    vel = [vel[0], vel[1], 0.0, 0.0, 0.0, vel[2]]
-                    accel = [accel[0], accel[1], 0.0, 0.0, 0.0, accel[2]]
-            else:
-                if len(disp) == 3:  # 3 ndim 3 dof
-                    disp.extend([0, 0, 0])
-                    vel.extend([0, 0, 0])
-                    accel.extend([0, 0, 0])
-                elif len(disp) == 4:  # 3 ndim 4 dof
-                    disp = [disp[0], disp[1], disp[2], 0.0, 0.0, disp[3]]
-                    vel = [vel[0], vel[1], vel[2], 0.0, 0.0, vel[3]]
-                    accel = [accel[0], accel[1], accel[2], 0.0, 0.0, accel[3]]
-                elif len(disp) < 6:  # 3 ndim 6 dof
-                    disp.extend([0] * (6 - len(disp)))
-                    vel.extend([0] * (6 - len(vel)))
-                    accel.extend([0] * (6 - len(accel)))
-                elif len(disp) > 6:
-                    disp = disp[:6]
-                    vel = vel[:6]
-                    accel = accel[:6]
-        else:
-            disp = [np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]
-            vel = [np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]
-            accel = [np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]
-        node_disp.append(disp)
-        node_vel.append(vel)
-        node_accel.append(accel)
-        node_pressure.append(ops.nodePressure(tag))
-    node_disp = np.array(node_disp, dtype=float)
-    node_vel = np.array(node_vel, dtype=float)
-    node_accel = np.array(node_accel, dtype=float)
-    node_pressure = np.array(node_pressure, dtype=float)
+class DofScatter:
+    """Scatter the raw values of nodes with (ndm, ndf) dofs into (num_nodes, 6) arrays.
+
+    The scatter maps are built once for a group of nodes and rebuilt only when the node tags
+    or the nodes existing in the domain change, each step then needs a single fancy-index assignment.
+    Nodes that do not exist in the domain are filled with ``numpy.nan``.
+    """
+
+    def __init__(self):
+        self.node_tags = None
+        self.exists = None
+        self.existing_tags = []
+        self.ndms = None
+        self.ndfs = None
+        self.maps = {}  # key: reaction flag, value: (src, dst) indices
+
+    def update(self, node_tags, snapshot):
+        """Update the node group for the current step, given its :class:`StepSnapshot`,
+        and return the tags of existing nodes."""
+        node_tags = np.array(node_tags, dtype=int)
+        all_node_tags = snapshot.node_tag_set
+        exists = np.array([tag in all_node_tags for tag in node_tags.tolist()], dtype=bool)
+        if (
+                self.node_tags is None
+                or not np.array_equal(node_tags, self.node_tags)
+                or not np.array_equal(exists, self.exists)
+        ):
+            self.node_tags = node_tags
+            self.exists = exists
+            self.existing_tags = node_tags[exists].tolist()
+            self.ndms = np.array([len(ops.nodeCoord(tag)) for tag in self.existing_tags], dtype=int)
+            self.ndfs = np.array([len(snapshot.get_node_disp(tag)) for tag in self.existing_tags], dtype=int)
+            self.maps = {}
+        return self.existing_tags
+
+    def _get_map(self, reaction: bool = False):
+        if reaction not in self.maps:
+            rows = np.flatnonzero(self.exists)
+            offsets = np.concatenate([[0], np.cumsum(self.ndfs)[:-1]]).astype(int)
+            src, dst = [np.empty(0, dtype=int)], [np.empty(0, dtype=int)]
+            for ndm, ndf in set(zip(self.ndms.tolist(), self.ndfs.tolist())):
+                mask = (self.ndms == ndm) & (self.ndfs == ndf)
+                cols = np.array(_get_dof_columns(ndm, ndf, reaction=reaction), dtype=int)
+                src.append((offsets[mask][:, None] + np.arange(len(cols))).ravel())
+                dst.append((rows[mask][:, None] * 6 + cols).ravel())
+            self.maps[reaction] = (np.concatenate(src), np.concatenate(dst))
+        return self.maps[reaction]
+
+    def scatter(self, raw_values: list, reaction: bool = False):
+        """Scatter a list with the raw values of each existing node into a (num_nodes, 6) array."""
+        values = np.fromiter(chain.from_iterable(raw_values), dtype=float)
+        if len(values) != np.sum(self.ndfs):
+            self.ndfs = np.array([len(vals) for vals in raw_values], dtype=int)
+            self.maps = {}
+        src, dst = self._get_map(reaction=reaction)
+        output = np.full((len(self.node_tags), 6), np.nan)
+        output[self.exists] = 0.0
+        output.flat[dst] = values[src]
+        return output
+
+
+def _get_dof_columns(ndm: int, ndf: int, reaction: bool = False):
+    """The columns among ``UX, UY, UZ, RX, RY, RZ`` that the raw dofs of a node are placed in."""
+    if ndm == 2 and ndf >= 3:  # 2 ndim 3 dof
+        return [0, 1, 5]
+    if ndm == 3 and ndf == 4 and not reaction:  # 3 ndim 4 dof
+        return [0, 1, 2, 5]
+    return list(range(min(ndf, 6)))
+
+
+def _get_nodal_resp(node_tags, snapshot, dof_scatter: DofScatter):
+    # 6 data each row, Ux, Uy, Uz, Rx, Ry, Rz
+    existing_tags = dof_scatter.update(node_tags, snapshot)
+    node_disp = dof_scatter.scatter([snapshot.get_node_disp(tag) for tag in existing_tags])
+    node_vel = dof_scatter.scatter([ops.nodeVel(tag) for tag in existing_tags])
+    node_accel = dof_scatter.scatter([ops.nodeAccel(tag) for tag in existing_tags])
+    # 1 data each row, P
+    node_pressure = np.array([ops.nodePressure(int(tag)) for tag in node_tags], dtype=float)
     return node_disp, node_vel, node_accel, node_pressure
 
 
-def _get_nodal_react(node_tags):
-    def get_react(tags):
-        forces = []  # 6 data each row, Ux, Uy, Uz, Rx, Ry, Rz
-        for tag in tags:
-            tag = int(tag)
-            if tag in ops.getNodeTags():
-                coord = ops.nodeCoord(tag)
-                fo = ops.nodeReaction(tag)
-                if len(coord) == 1:
-                    fo.extend([0.0, 0.0, 0.0, 0.0, 0.0])
-                elif len(coord) == 2:
-                    if len(fo) == 2:
-                        fo.extend([0.0, 0.0, 0.0, 0.0])
-                    elif len(fo) >= 3:
-                        fo = [fo[0], fo[1], 0.0, 0.0, 0.0, fo[2]]
-                else:
-                    if len(fo) == 3:
-                        fo.extend([0.0, 0.0, 0.0])
-                    elif len(fo) < 6:  # 3 ndim 6 dof
-                        fo.extend([0] * (6 - len(fo)))
-                    elif len(fo) > 6:
-                        fo = fo[:6]
-            else:
-                fo = [np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]
-            forces.append(fo)
-        return forces
+def _get_nodal_react(node_tags, snapshot, dof_scatter: DofScatter):
+    existing_tags = dof_scatter.update(node_tags, snapshot)
+
+    def get_react():
+        # 6 data each row, Ux, Uy, Uz, Rx, Ry, Rz
+        return dof_scatter.scatter([ops.nodeReaction(tag) for tag in existing_tags], reaction=True)
 
     ops.reactions()
-    reacts = np.array(get_react(node_tags), dtype=float)
+    reacts = get_react()
     # rayleighForces
     ops.reactions("-rayleigh")
-    rayleigh_forces = np.array(get_react(node_tags), dtype=float)
+    rayleigh_forces = get_react()
     # Include Inertia
     ops.reactions("-dynamic")
-    reacts_inertia = np.array(get_react(node_tags), dtype=float)
+    reacts_inertia = get_react()
     return reacts, reacts_inertia, rayleigh_forces
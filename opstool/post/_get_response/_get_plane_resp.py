@@ -2,7 +2,7 @@ import numpy as np
 import xarray as xr
 import openseespy.opensees as ops
 
-from ._response_base import ResponseBase, _expand_to_uniform_array
+from ._response_base import ResponseBase, StepBuffer, EleGeometryCache, _expand_to_uniform_array
 from ...utils import OPS_ELE_TAGS
 
 
@@ -16,20 +16,28 @@ from ...utils import OPS_ELE_TAGS
 
 class PlaneRespStepData(ResponseBase):
 
-    def __init__(self, ele_tags=None, compute_measures: bool = True):
+    def __init__(self, ele_tags=None, compute_measures: bool = True, geo_cache: EleGeometryCache | None = None):
         self.resp_names = [
             "Stresses",
             "Strains",
         ]
+        self.attrs = {
+            "sigma11, sigma22, sigma12": "Normal stress and shear stress (strain) in the x-y plane.",
+            "eta_r": "Ratio between the shear (deviatoric) stress and peak shear strength at the current confinement",
+            "p1, p2": "Principal stresses (strains).",
+            "sigma_vm": "Von Mises stress.",
+            "tau_max": "Maximum shear stress (strains).",
+        }
         self.resp_steps = None
         self.step_track = 0
         self.ele_tags = ele_tags
         self.times = []
         self.compute_measures = compute_measures
+        self.geo_cache = geo_cache if geo_cache is not None else EleGeometryCache()
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.ele_tags)
         self.times = [0.0]
         self.step_track = 0
@@ -38,7 +46,8 @@ class PlaneRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, ele_tags):
-        stresses, strains = _get_gauss_resp(ele_tags)
+        time = self.get_snapshot().time
+        stresses, strains = _get_gauss_resp(ele_tags, self.geo_cache)
         data_vars = dict()
         data_vars["Stresses"] = (["eleTags", "GaussPoints", "stressDOFs"], stresses)
         data_vars["Strains"] = (["eleTags", "GaussPoints", "strainDOFs"], strains)
@@ -52,31 +61,20 @@ class PlaneRespStepData(ResponseBase):
         else:
             stressDOFs = [f"sigma{i+1}" for i in range(ndofs)]
         strainDOFs = ["eps11", "eps22", "eps12"]
-        ds = xr.Dataset(
-            data_vars=data_vars,
-            coords={
-                "eleTags": ele_tags,
-                "GaussPoints": np.arange(strains.shape[1])+1,
-                "stressDOFs": stressDOFs,
-                "strainDOFs": strainDOFs
-            },
-            attrs={
-                "sigma11, sigma22, sigma12": "Normal stress and shear stress (strain) in the x-y plane.",
-                "eta_r": "Ratio between the shear (deviatoric) stress and peak shear strength at the current confinement",
-                "p1, p2": "Principal stresses (strains).",
-                "sigma_vm": "Von Mises stress.",
-                "tau_max": "Maximum shear stress (strains).",
-            },
-        )
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+        coords = {
+            "eleTags": ele_tags,
+            "GaussPoints": np.arange(strains.shape[1])+1,
+            "stressDOFs": stressDOFs,
+            "strainDOFs": strainDOFs
+        }
+        self.resp_steps.append(data_vars, coords, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
-        if self.compute_measures:
+        if self.compute_measures and "Stresses" in self.resp_steps:
             self._compute_measures_()
 
     def _compute_measures_(self):
@@ -142,30 +140,22 @@ class PlaneRespStepData(ResponseBase):
                 return ds[resp_type]
 
 
-def _get_gauss_resp(ele_tags):
+def _get_gauss_resp(ele_tags, geo_cache: EleGeometryCache):
     all_stresses, all_strains = [], []
     for etag in ele_tags:
         etag = int(etag)
-        integr_point_stress = []
-        integr_point_strain = []
-        for i in range(100000000):  # Ugly but useful
-            # loop for integrPoint
-            stress_ = ops.eleResponse(etag, "material", f"{i+1}", "stresses")
-            stress_ = _reshape_stress(stress_)
-            strain_ = ops.eleResponse(etag, "material", f"{i+1}", "strains")
-            if len(stress_) == 0 or len(strain_) == 0:
-                break
-            integr_point_stress.append(stress_)
-            integr_point_strain.append(strain_)
-        # Call material response directly
-        if len(integr_point_stress) == 0 or len(integr_point_strain) == 0:
-            stress = ops.eleResponse(etag, "stresses")
-            stress = _reshape_stress(stress)
-            strain = ops.eleResponse(etag, "strains")
-            integr_point_stress.append(stress)
-            integr_point_strain.append(strain)
-        all_stresses.append(np.array(integr_point_stress))
-        all_strains.append(np.array(integr_point_strain))
+        num_points = geo_cache.get_num_points(etag, "material")
+        if num_points > 0:
+            stress = [
+                _reshape_stress(ops.eleResponse(etag, "material", f"{i+1}", "stresses")) for i in range(num_points)
+            ]
+            strain = [ops.eleResponse(etag, "material", f"{i+1}", "strains") for i in range(num_points)]
+        else:
+            # Call material response directly
+            stress = [_reshape_stress(ops.eleResponse(etag, "stresses"))]
+            strain = [ops.eleResponse(etag, "strains")]
+        all_stresses.append(np.array(stress))
+        all_strains.append(np.array(strain))
     stresses = _expand_to_uniform_array(all_stresses)
     strains = _expand_to_uniform_array(all_strains)
     return stresses, strains
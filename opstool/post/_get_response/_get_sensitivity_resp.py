@@ -2,7 +2,8 @@ import numpy as np
 import openseespy.opensees as ops
 import xarray as xr
 
-from ._response_base import ResponseBase
+from ._get_nodal_resp import DofScatter
+from ._response_base import ResponseBase, StepBuffer
 
 
 class SensitivityRespStepData(ResponseBase):
@@ -18,13 +19,22 @@ class SensitivityRespStepData(ResponseBase):
         self.node_tags = node_tags if node_tags is not None else ops.getNodeTags()
         self.ele_tags = ele_tags if ele_tags is not None else []
         self.sens_para_tags = sens_para_tags if sens_para_tags is not None else ops.getParamTags()
+        self.dof_scatter = DofScatter()
+        self.attrs = {
+            "UX": "Displacement in X direction",
+            "UY": "Displacement in Y direction",
+            "UZ": "Displacement in Z direction",
+            "RX": "Rotation about X axis",
+            "RY": "Rotation about Y axis",
+            "RZ": "Rotation about Z axis",
+        }
         self.resp_steps = None
         self.times = []
         self.step_track = 0
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.node_tags, self.sens_para_tags)
         self.times = [0.0]
         self.step_track = 0
@@ -33,11 +43,13 @@ class SensitivityRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, node_tags, sens_para_tags):
+        snapshot = self.get_snapshot()
+        time = snapshot.time
         if node_tags is None:
             node_tags = self.node_tags
         if sens_para_tags is None:
             sens_para_tags = self.sens_para_tags
-        disp, vel, accel, pressure = _get_nodal_sens_resp(node_tags, sens_para_tags)
+        disp, vel, accel, pressure = _get_nodal_sens_resp(node_tags, sens_para_tags, snapshot, self.dof_scatter)
         lambdas_ = _get_sens_lambda(sens_para_tags)
         datas = [disp, vel, accel]
         data_vars = {}
@@ -47,25 +59,14 @@ class SensitivityRespStepData(ResponseBase):
         data_vars["lambdas"] = (["paraTags", "patternTags"], lambdas_)
         patternTags = [] if len(lambdas_) == 0 else np.arange(lambdas_.shape[1]) + 1
         # can have different dimensions and coordinates
-        ds = xr.Dataset(
-            data_vars=data_vars,
-            coords={
-                "paraTags": sens_para_tags,
-                "nodeTags": node_tags,
-                "DOFs": ["UX", "UY", "UZ", "RX", "RY", "RZ"],
-                "patternTags": patternTags
-            },
-            attrs={
-                "UX": "Displacement in X direction",
-                "UY": "Displacement in Y direction",
-                "UZ": "Displacement in Z direction",
-                "RX": "Rotation about X axis",
-                "RY": "Rotation about Y axis",
-                "RZ": "Rotation about Z axis",
-            },
-        )
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+        coords = {
+            "paraTags": sens_para_tags,
+            "nodeTags": node_tags,
+            "DOFs": ["UX", "UY", "UZ", "RX", "RY", "RZ"],
+            "patternTags": patternTags
+        }
+        self.resp_steps.append(data_vars, coords, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def get_data(self):
@@ -75,8 +76,7 @@ class SensitivityRespStepData(ResponseBase):
         return self.step_track
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
     def save_file(self, dt: xr.DataTree):
         self._to_xarray()
@@ -102,70 +102,24 @@ class SensitivityRespStepData(ResponseBase):
             return ds[resp_type]
 
 
-def _get_nodal_sens_resp(node_tags, sens_para_tags):
-    all_node_tags = ops.getNodeTags()
+def _get_nodal_sens_resp(node_tags, sens_para_tags, snapshot, dof_scatter: DofScatter):
+    existing_tags = dof_scatter.update(node_tags, snapshot)
+    ndfs = dof_scatter.ndfs.tolist()
     all_sens_disp = []
     all_sens_vel = []
     all_sens_accel = []
     all_sens_pressure = []
     for para_tag in sens_para_tags:
         para_tag = int(para_tag)
-        node_sens_disp = []
-        node_sens_vel = []
-        node_sens_accel = []
-        node_sens_pressure = []
-        for ntag in node_tags:
-            ntag = int(ntag)
-            if ntag in all_node_tags:
-                coord = ops.nodeCoord(ntag)
-                disp = ops.nodeDisp(ntag)
-                ndim = len(coord)
-                ndof = len(disp)
-                sens_disp = [ops.sensNodeDisp(ntag, i+1, para_tag) for i in range(ndof)]
-                sens_vel = [ops.sensNodeVel(ntag, i+1, para_tag) for i in range(ndof)]
-                sens_accel = [ops.sensNodeAccel(ntag, i+1, para_tag) for i in range(ndof)]
-                if ndim == 1:
-                    sens_disp.extend([0, 0, 0, 0, 0])
-                    sens_vel.extend([0, 0, 0, 0, 0])
-                    sens_accel.extend([0, 0, 0, 0, 0])
-                elif ndim == 2:
-                    if ndof == 2:  # 2 ndim 2 dof
-                        sens_disp.extend([0, 0, 0, 0])
-                        sens_vel.extend([0, 0, 0, 0])
-                        sens_accel.extend([0, 0, 0, 0])
-                    elif ndof >= 3:  # 2 ndim 3 dof
-                        sens_disp = [sens_disp[0], sens_disp[1], 0.0, 0.0, 0.0, sens_disp[2]]
-                        sens_vel = [sens_vel[0], sens_vel[1], 0.0, 0.0, 0.0, sens_vel[2]]
-                        sens_accel = [sens_accel[0], sens_accel[1], 0.0, 0.0, 0.0, sens_accel[2]]
-                else:
-                    if ndof == 3:  # 3 ndim 3 dof
-                        sens_disp.extend([0, 0, 0])
-                        sens_vel.extend([0, 0, 0])
-                        sens_accel.extend([0, 0, 0])
-                    elif ndof == 4:  # 3 ndim 4 dof
-                        sens_disp = [sens_disp[0], sens_disp[1], sens_disp[2], 0.0, 0.0, sens_disp[3]]
-                        sens_vel = [sens_vel[0], sens_vel[1], sens_vel[2], 0.0, 0.0, sens_vel[3]]
-                        sens_accel = [sens_accel[0], sens_accel[1], sens_accel[2], 0.0, 0.0, sens_accel[3]]
-                    elif ndof < 6:  # 3 ndim 6 dof
-                        sens_disp.extend([0] * (6 - len(sens_disp)))
-                        sens_vel.extend([0] * (6 - len(sens_vel)))
-                        sens_accel.extend([0] * (6 - len(sens_accel)))
-                    elif ndof > 6:
-                        sens_disp = sens_disp[:6]
-                        sens_vel = sens_vel[:6]
-                        sens_accel = sens_accel[:6]
-            else:
-                sens_disp = [np.nan] * 6
-                sens_vel = [np.nan] * 6
-                sens_accel = [np.nan] * 6
-            node_sens_disp.append(sens_disp)
-            node_sens_vel.append(sens_vel)
-            node_sens_accel.append(sens_accel)
-            node_sens_pressure.append(ops.sensNodePressure(ntag, para_tag))
-        all_sens_disp.append(node_sens_disp)
-        all_sens_vel.append(node_sens_vel)
-        all_sens_accel.append(node_sens_accel)
-        all_sens_pressure.append(node_sens_pressure)
+        sens_disp, sens_vel, sens_accel = [], [], []
+        for ntag, ndof in zip(existing_tags, ndfs):
+            sens_disp.append([ops.sensNodeDisp(ntag, i + 1, para_tag) for i in range(ndof)])
+            sens_vel.append([ops.sensNodeVel(ntag, i + 1, para_tag) for i in range(ndof)])
+            sens_accel.append([ops.sensNodeAccel(ntag, i + 1, para_tag) for i in range(ndof)])
+        all_sens_disp.append(dof_scatter.scatter(sens_disp))
+        all_sens_vel.append(dof_scatter.scatter(sens_vel))
+        all_sens_accel.append(dof_scatter.scatter(sens_accel))
+        all_sens_pressure.append([ops.sensNodePressure(int(ntag), para_tag) for ntag in node_tags])
     return all_sens_disp, all_sens_vel, all_sens_accel, all_sens_pressure
 
 
@@ -2,7 +2,7 @@ import numpy as np
 import xarray as xr
 import openseespy.opensees as ops
 
-from ._response_base import ResponseBase, _expand_to_uniform_array
+from ._response_base import ResponseBase, StepBuffer, EleGeometryCache, _expand_to_uniform_array
 # from ._response_extrapolation import (
 #     resp_extrap_tri3,
 #     resp_extrap_quad4,
@@ -13,21 +13,29 @@ from ._response_base import ResponseBase, _expand_to_uniform_array
 
 class ShellRespStepData(ResponseBase):
 
-    def __init__(self, ele_tags=None):
+    def __init__(self, ele_tags=None, geo_cache: EleGeometryCache | None = None):
         self.resp_names = [
             "sectionForces",
             "sectionDeformations",
             "Stresses",
             "Strains",
         ]
+        self.attrs = {
+            "FXX,FYY,FXY": "Membrane (in-plane) forces or deformations.",
+            "MXX,MYY,MXY": "Bending moments or rotations (out-plane) of plate.",
+            "VXZ,VYZ": "Shear forces or deformations.",
+            "sigma11, sigma22": "Normal stress (strain) along local x, y",
+            "sigma12, sigma23, sigma13": "Shear stress (strain).",
+        }
         self.resp_steps = None
         self.step_track = 0
         self.ele_tags = ele_tags
         self.times = []
+        self.geo_cache = geo_cache if geo_cache is not None else EleGeometryCache()
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.ele_tags)
         self.times = [0.0]
         self.step_track = 0
@@ -36,36 +44,26 @@ class ShellRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, ele_tags):
-        sec_forces, sec_defos, stresses, strains = _get_shell_resp_one_step(ele_tags)
+        time = self.get_snapshot().time
+        sec_forces, sec_defos, stresses, strains = _get_shell_resp_one_step(ele_tags, self.geo_cache)
         data_vars = dict()
         data_vars["sectionForces"] = (["eleTags", "GaussPoints", "secDOFs"], sec_forces)
         data_vars["sectionDeformations"] = (["eleTags", "GaussPoints", "secDOFs"], sec_defos)
         data_vars["Stresses"] = (["eleTags", "GaussPoints", "fiberPoints", "stressDOFs"], stresses)
         data_vars["Strains"] = (["eleTags", "GaussPoints", "fiberPoints", "stressDOFs"], strains)
-        ds = xr.Dataset(
-            data_vars=data_vars,
-            coords={
-                "eleTags": ele_tags,
-                "GaussPoints": np.arange(sec_forces.shape[1])+1,
-                "secDOFs": ["FXX", "FYY", "FXY", "MXX", "MYY", "MXY", "VXZ", "VYZ"],
-                "fiberPoints": np.arange(stresses.shape[2])+1,
-                "stressDOFs": ["sigma11", "sigma22", "sigma12", "sigma23", "sigma13"],
-            },
-            attrs={
-                "FXX,FYY,FXY": "Membrane (in-plane) forces or deformations.",
-                "MXX,MYY,MXY": "Bending moments or rotations (out-plane) of plate.",
-                "VXZ,VYZ": "Shear forces or deformations.",
-                "sigma11, sigma22": "Normal stress (strain) along local x, y",
-                "sigma12, sigma23, sigma13": "Shear stress (strain).",
-            },
-        )
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+        coords = {
+            "eleTags": ele_tags,
+            "GaussPoints": np.arange(sec_forces.shape[1])+1,
+            "secDOFs": ["FXX", "FYY", "FXY", "MXX", "MYY", "MXY", "VXZ", "VYZ"],
+            "fiberPoints": np.arange(stresses.shape[2])+1,
+            "stressDOFs": ["sigma11", "sigma22", "sigma12", "sigma23", "sigma13"],
+        }
+        self.resp_steps.append(data_vars, coords, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
     def get_data(self):
         return self.resp_steps
@@ -101,7 +99,7 @@ class ShellRespStepData(ResponseBase):
             else:
                 return ds[resp_type]
 
-def _get_shell_resp_one_step(ele_tags):
+def _get_shell_resp_one_step(ele_tags, geo_cache: EleGeometryCache):
     sec_forces, sec_defos = [], []
     stresses, strains = [], []
     for i, etag in enumerate(ele_tags):
@@ -114,13 +112,10 @@ def _get_shell_resp_one_step(ele_tags):
         num_sec = int(len(forces) / 8)
         sec_stress, sec_strain = [], []
         for j in range(num_sec):
-            for k in range(100000000000000000):  # ugly but useful
-                stress = ops.eleResponse(etag, "Material", f"{j+1}", "fiber", f"{k+1}", "stresses")
-                strain = ops.eleResponse(etag, "Material", f"{j + 1}", "fiber", f"{k + 1}", "strains")
-                if len(stress) == 0 or len(strain) == 0:
-                    break
-                sec_stress.extend(stress)
-                sec_strain.extend(strain)
+            num_fibers = geo_cache.get_num_points(etag, "Material", f"{j+1}", "fiber")
+            for k in range(num_fibers):
+                sec_stress.extend(ops.eleResponse(etag, "Material", f"{j+1}", "fiber", f"{k+1}", "stresses"))
+                sec_strain.extend(ops.eleResponse(etag, "Material", f"{j+1}", "fiber", f"{k+1}", "strains"))
         sec_stress = np.reshape(sec_stress, (num_sec, -1, 5))
         sec_strain = np.reshape(sec_strain, (num_sec, -1, 5))
         stresses.append(sec_stress)
@@ -2,25 +2,36 @@ import numpy as np
 import openseespy.opensees as ops
 import xarray as xr
 
-from ._response_base import ResponseBase, _expand_to_uniform_array
+from ._response_base import ResponseBase, StepBuffer, EleGeometryCache, _expand_to_uniform_array
 # from ...utils import OPS_ELE_TAGS
 
 class BrickRespStepData(ResponseBase):
 
-    def __init__(self, ele_tags=None, compute_measures: bool = True):
+    def __init__(self, ele_tags=None, compute_measures: bool = True, geo_cache: EleGeometryCache | None = None):
         self.resp_names = [
             "Stresses",
             "Strains",
         ]
+        self.attrs = {
+            "sigma11, sigma22, sigma33": "Normal stress (strain) along x, y, z.",
+            "sigma12, sigma23, sigma13": "Shear stress (strain).",
+            "p1, p2, p3": "Principal stresses (strains).",
+            "eta_r": "Ratio between the shear (deviatoric) stress and peak shear strength at the current confinement",
+            "sigma_vm": "Von Mises stress.",
+            "tau_max": "Maximum shear stress (strains).",
+            "sigma_oct": "Octahedral normal stress (strains).",
+            "tau_oct": "Octahedral shear stress (strains).",
+        }
         self.resp_steps = None
         self.step_track = 0
         self.ele_tags = ele_tags
         self.times = []
         self.compute_measures = compute_measures
+        self.geo_cache = geo_cache if geo_cache is not None else EleGeometryCache()
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.ele_tags)
         self.times = [0.0]
         self.step_track = 0
@@ -29,7 +40,8 @@ class BrickRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, ele_tags):
-        stresses, strains = _get_gauss_resp(ele_tags)
+        time = self.get_snapshot().time
+        stresses, strains = _get_gauss_resp(ele_tags, self.geo_cache)
         data_vars = dict()
         data_vars["Stresses"] = (["eleTags", "GaussPoints", "stressDOFs"], stresses)
         data_vars["Strains"] = (["eleTags", "GaussPoints", "strainDOFs"], strains)
@@ -40,34 +52,20 @@ class BrickRespStepData(ResponseBase):
         else:
             stressDOFs = [f"sigma{i+1}" for i in stresses.shape[-1]]
         strainDOFs = ["eps11", "eps22", "eps33", "eps12", "eps23", "eps13"]
-        ds = xr.Dataset(
-            data_vars=data_vars,
-            coords={
-                "eleTags": ele_tags,
-                "GaussPoints": np.arange(stresses.shape[1])+1,
-                "stressDOFs": stressDOFs,
-                "strainDOFs": strainDOFs,
-            },
-            attrs={
-                "sigma11, sigma22, sigma33": "Normal stress (strain) along x, y, z.",
-                "sigma12, sigma23, sigma13": "Shear stress (strain).",
-                "p1, p2, p3": "Principal stresses (strains).",
-                "eta_r": "Ratio between the shear (deviatoric) stress and peak shear strength at the current confinement",
-                "sigma_vm": "Von Mises stress.",
-                "tau_max": "Maximum shear stress (strains).",
-                "sigma_oct": "Octahedral normal stress (strains).",
-                "tau_oct": "Octahedral shear stress (strains).",
-            },
-        )
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+        coords = {
+            "eleTags": ele_tags,
+            "GaussPoints": np.arange(stresses.shape[1])+1,
+            "stressDOFs": stressDOFs,
+            "strainDOFs": strainDOFs,
+        }
+        self.resp_steps.append(data_vars, coords, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
-        if self.compute_measures:
+        if self.compute_measures and "Stresses" in self.resp_steps:
             self._compute_measures_()
 
     def _compute_measures_(self):
@@ -133,28 +131,20 @@ class BrickRespStepData(ResponseBase):
                 return ds[resp_type]
 
 
-def _get_gauss_resp(ele_tags):
+def _get_gauss_resp(ele_tags, geo_cache: EleGeometryCache):
     all_stresses, all_strains = [], []
     for etag in ele_tags:
         etag = int(etag)
-        integr_point_stress = []
-        integr_point_strain = []
-        for i in range(100000000):  # Ugly but useful
-            # loop for integrPoint
-            stress_ = ops.eleResponse(etag, "material", f"{i+1}", "stresses")
-            strain_ = ops.eleResponse(etag, "material", f"{i+1}", "strains")
-            if len(stress_) == 0 or len(strain_) == 0:
-                break
-            integr_point_stress.append(stress_)
-            integr_point_strain.append(strain_)
-        # Call material response directly
-        if len(integr_point_stress) == 0 or len(integr_point_strain) == 0:
-            stress = ops.eleResponse(etag, "stresses")
-            strain = ops.eleResponse(etag, "strains")
-            integr_point_stress.append(stress)
-            integr_point_strain.append(strain)
-        all_stresses.append(np.array(integr_point_stress))
-        all_strains.append(np.array(integr_point_strain))
+        num_points = geo_cache.get_num_points(etag, "material")
+        if num_points > 0:
+            stress = [ops.eleResponse(etag, "material", f"{i+1}", "stresses") for i in range(num_points)]
+            strain = [ops.eleResponse(etag, "material", f"{i+1}", "strains") for i in range(num_points)]
+        else:
+            # Call material response directly
+            stress = [ops.eleResponse(etag, "stresses")]
+            strain = [ops.eleResponse(etag, "strains")]
+        all_stresses.append(np.array(stress))
+        all_strains.append(np.array(strain))
     stresses = _expand_to_uniform_array(all_stresses)
     strains = _expand_to_uniform_array(all_strains)
     return stresses, strains
@@ -185,13 +175,7 @@ def _calculate_stresses_measures_4D(stress_array):
     )
 
     # Calculate principal stresses
-    # Using the stress tensor to calculate eigenvalues
-    stress_tensor = _assemble_stress_tensor_4D(stress_array)
-    # Calculate principal stresses (eigenvalues)
-    principal_stresses = np.linalg.eigvalsh(stress_tensor)  # Returns sorted eigenvalues
-    p1 = principal_stresses[..., 2]  # Maximum principal stress
-    p2 = principal_stresses[..., 1]  # Intermediate principal stress
-    p3 = principal_stresses[..., 0]  # Minimum principal stress
+    p1, p2, p3 = _calculate_principal_stresses(stress_array)
 
     # Calculate maximum shear stress
     tau_max = np.abs(p1 - p3) / 2
@@ -207,65 +191,40 @@ def _calculate_stresses_measures_4D(stress_array):
     return data
 
 
-def _assemble_stress_tensor_3D(stress_array):
-    """
-    Assemble a 3D stress array into a 4D stress tensor array.
+def _calculate_principal_stresses(stress_array):
     """
-    num_elements, num_gauss_points, _ = stress_array.shape
-    stress_tensor = np.full((num_elements, num_gauss_points, 3, 3), np.nan)
-    for i in range(num_elements):
-        for j in range(num_gauss_points):
-            sig11 = stress_array[i, j, 0]  # Normal stress in x-direction
-            sig22 = stress_array[i, j, 1]  # Normal stress in y-direction
-            sig33 = stress_array[i, j, 2]  # Normal stress in z-direction
-            tau12 = stress_array[i, j, 3]  # Shear stress in xy-plane
-            tau23 = stress_array[i, j, 4]  # Shear stress in yz-plane
-            tau13 = stress_array[i, j, 5]  # Shear stress in xz-plane
-            st = np.array(
-                [
-                    [sig11, tau12, tau13],
-                    [tau12, sig22, tau23],
-                    [tau13, tau23, sig33],
-                ]
-            )
-            stress_tensor[i, j, ...] = st
-    return np.nan_to_num(stress_tensor, nan=0.0)
-
-
-def _assemble_stress_tensor_4D(stress_array):
-    """
-    Assemble a 4D stress array [time, eleTags, GaussPoints, 6]
-    into a 5D stress tensor array [time, eleTags, GaussPoints, 3, 3].
-    Handles NaNs safely (returns 0.0 where data is missing).
+    Closed-form principal values of symmetric 3x3 tensors given in Voigt order
+    [11, 22, 33, 12, 23, 13] along the last axis, for any number of leading dimensions.
+    The roots of the characteristic equation are evaluated from the invariants,
+    so no 3x3 tensors are assembled.
+    Points with missing data (any component is NaN) give NaN.
 
     Parameters:
-        stress_array (np.ndarray): shape (time, eleTags, GaussPoints, 6)
+        stress_array (np.ndarray): shape (..., 6)
 
     Returns:
-        np.ndarray: shape (time, eleTags, GaussPoints, 3, 3)
+        tuple: (p1, p2, p3), each of shape (...), sorted as p1 >= p2 >= p3.
     """
-    num_time, num_elements, num_gauss_points, _ = stress_array.shape
-    stress_tensor = np.full((num_time, num_elements, num_gauss_points, 3, 3), np.nan)
-
-    for t in range(num_time):
-        for i in range(num_elements):
-            for j in range(num_gauss_points):
-                sig11 = stress_array[t, i, j, 0]
-                sig22 = stress_array[t, i, j, 1]
-                sig33 = stress_array[t, i, j, 2]
-                tau12 = stress_array[t, i, j, 3]
-                tau23 = stress_array[t, i, j, 4]
-                tau13 = stress_array[t, i, j, 5]
-
-                if np.any(np.isnan([sig11, sig22, sig33, tau12, tau23, tau13])):
-                    continue  # skip invalid tensor
-
-                stress_tensor[t, i, j, ...] = np.array([
-                    [sig11, tau12, tau13],
-                    [tau12, sig22, tau23],
-                    [tau13, tau23, sig33]
-                ])
-
-    return np.nan_to_num(stress_tensor, nan=0.0)
+    sig11, sig22, sig33, tau12, tau23, tau13 = np.moveaxis(stress_array, -1, 0)
+    sig_m = (sig11 + sig22 + sig33) / 3
+    s11, s22, s33 = sig11 - sig_m, sig22 - sig_m, sig33 - sig_m
+    # invariants of the deviatoric tensor
+    j2 = 0.5 * (s11 ** 2 + s22 ** 2 + s33 ** 2) + tau12 ** 2 + tau23 ** 2 + tau13 ** 2
+    j3 = (
+        s11 * s22 * s33
+        + 2 * tau12 * tau23 * tau13
+        - s11 * tau23 ** 2
+        - s22 * tau13 ** 2
+        - s33 * tau12 ** 2
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cos3theta = np.where(j2 > 0, 1.5 * np.sqrt(3.0) * j3 / j2 ** 1.5, 1.0)
+    # Lode angle, clipped against round-off
+    theta = np.arccos(np.clip(cos3theta, -1.0, 1.0)) / 3
+    radius = 2 * np.sqrt(j2 / 3)
+    p1 = sig_m + radius * np.cos(theta)
+    p2 = sig_m + radius * np.cos(theta - 2 * np.pi / 3)
+    p3 = sig_m + radius * np.cos(theta + 2 * np.pi / 3)
+    return p1, p2, p3
 
 
@@ -1,21 +1,23 @@
 import xarray as xr
 import openseespy.opensees as ops
 
-from ._response_base import ResponseBase
+from ._response_base import EleGeometryCache, RespNameResolver, ResponseBase, StepBuffer
 
 
 class TrussRespStepData(ResponseBase):
 
-    def __init__(self, ele_tags=None):
+    def __init__(self, ele_tags=None, geo_cache: EleGeometryCache | None = None):
         self.resp_names = ["axialForce", "axialDefo", "Stress", "Strain"]
+        self.attrs = None
         self.resp_steps = None
         self.step_track = 0
         self.ele_tags = ele_tags
         self.times = []
+        self.resp_resolver = RespNameResolver(geo_cache)
         self.initialize()
 
     def initialize(self):
-        self.resp_steps = []
+        self.resp_steps = StepBuffer()
         self.add_data_one_step(self.ele_tags)
         self.times = [0.0]
         self.step_track = 0
@@ -24,23 +26,22 @@ class TrussRespStepData(ResponseBase):
         self.initialize()
 
     def add_data_one_step(self, ele_tags):
-        data = _get_truss_resp(ele_tags)
+        time = self.get_snapshot().time
+        data = _get_truss_resp(ele_tags, self.resp_resolver)
         data_vars = {}
         if len(ele_tags) > 0:
             for name, data_ in zip(self.resp_names, data):
                 data_vars[name] = (["eleTags"], data_)
-            ds = xr.Dataset(data_vars=data_vars, coords={"eleTags": ele_tags})
+            self.resp_steps.append(data_vars, {"eleTags": ele_tags}, time=time)
         else:
             for name, data_ in zip(self.resp_names, data):
                 data_vars[name] = xr.DataArray([])
-            ds = xr.Dataset(data_vars=data_vars)
-        self.resp_steps.append(ds)
-        self.times.append(ops.getTime())
+            self.resp_steps.append(data_vars, time=time)
+        self.times.append(time)
         self.step_track += 1
 
     def _to_xarray(self):
-        self.resp_steps = xr.concat(self.resp_steps, dim="time", join="outer")
-        self.resp_steps.coords["time"] = self.times
+        self.resp_steps = self.resp_steps.to_xarray(self.times, attrs=self.attrs)
 
     def get_data(self):
         return self.resp_steps
@@ -77,7 +78,7 @@ class TrussRespStepData(ResponseBase):
                 return ds[resp_type]
 
 
-def _get_truss_resp(truss_tags):
+def _get_truss_resp(truss_tags, resolver: RespNameResolver):
     forces, defos, stressss, strains = [], [], [], []
     for etag in truss_tags:
         etag = int(etag)
@@ -89,9 +90,9 @@ def _get_truss_resp(truss_tags):
             stress = 0.0
         else:
             stress = stress[0]
-        strain = ops.eleResponse(etag, "material", "1", "strain")
-        if len(strain) == 0:
-            strain = ops.eleResponse(etag, "section", "1", "deformation")
+        strain = resolver.get_response(
+            etag, (("material", "1", "strain"), ("section", "1", "deformation"))
+        )
         if len(strain) == 0:
             strain = 0.0
         else:
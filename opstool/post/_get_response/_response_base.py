@@ -1,8 +1,15 @@
 from abc import ABC, abstractmethod
 import numpy as np
+import openseespy.opensees as ops
+import xarray as xr
 
 
 class ResponseBase(ABC):
+    # running statistics of the responses, see enable_envelope
+    envelope = None
+    keep_history = True
+    # StepSnapshot shared by the extractors of one ODB, see get_snapshot
+    snapshot = None
 
     @abstractmethod
     def initialize(self):
@@ -32,6 +39,401 @@ class ResponseBase(ABC):
     def read_file(self, *args):
         """Read response data from a file."""
 
+    def clear_steps(self):
+        """Drop the response steps kept in memory, e.g., once they have been written to disk."""
+        self.resp_steps = StepBuffer()
+        self.times = []
+        if self.envelope is not None:
+            self.resp_steps.set_envelope(self.envelope, self.times, keep_history=self.keep_history)
+
+    def get_snapshot(self):
+        """The shared :class:`StepSnapshot` of the current step, a fresh one if none is attached."""
+        return self.snapshot if self.snapshot is not None else StepSnapshot()
+
+    def enable_envelope(self, keep_history: bool = True):
+        """Update an :class:`Envelope` of the responses at each step, starting with the steps in memory.
+
+        Parameters
+        -----------
+        keep_history: bool, default: True
+            If False, the steps are not kept, only the envelope and the times.
+        """
+        self.envelope = Envelope()
+        self.keep_history = keep_history
+        self.resp_steps.set_envelope(self.envelope, self.times, keep_history=keep_history)
+
+    def save_envelope(self, dt: xr.DataTree, path: str):
+        """Save the envelope to the group ``/Envelope{path}`` of the data tree,
+        apart from the histories since the coordinates may be ordered differently."""
+        if self.envelope is not None:
+            dt[f"/Envelope{path}"] = self.envelope.to_xarray()
+        return dt
+
+
+class StepBuffer:
+    """Growable NumPy buffers that hold the response steps along a leading time axis.
+
+    Each step is written in place into one array per response,
+    labelled xarray objects are only created by :meth:`to_xarray`.
+    A new segment is started when the coordinates or shapes change between steps,
+    e.g., when nodes or elements are removed, and the segments are joined as ``xr.concat(..., join="outer")``.
+    """
+
+    def __init__(self, init_capacity: int = 16):
+        self.init_capacity = init_capacity
+        self.segments = []
+        self.envelope = None
+        self.keep_history = True
+
+    def __len__(self):
+        return sum(seg["num_steps"] for seg in self.segments)
+
+    def set_envelope(self, envelope, times: list, keep_history: bool = True):
+        """Update ``envelope`` with the steps in the buffer, whose times are ``times``, and all later steps.
+        If ``keep_history`` is False, the steps are dropped once the envelope is updated.
+        """
+        start = 0
+        for seg in self.segments:
+            for i in range(seg["num_steps"]):
+                data_vars = {name: (seg["dims"][name], buffer[i]) for name, buffer in seg["data"].items()}
+                envelope.update(data_vars, seg["coords"], times[start + i])
+            start += seg["num_steps"]
+        self.envelope = envelope
+        self.keep_history = keep_history
+        if not keep_history:
+            self.segments = []
+
+    def append(self, data_vars: dict, coords: dict | None = None, time: float | None = None):
+        """Add one step.
+
+        Parameters
+        -----------
+        data_vars: dict
+            key: response name, value: (dims, data) tuple or xarray.DataArray, same as ``xr.Dataset``.
+        coords: dict, default: None
+            key: dim name, value: coordinates.
+        time: float, default: None
+            The time of the step for the envelope, if None, ``ops.getTime()``.
+        """
+        coords = {} if coords is None else coords
+        data_vars = {name: _as_dims_data(value) for name, value in data_vars.items()}
+        if self.envelope is not None:
+            self.envelope.update(data_vars, coords, time if time is not None else ops.getTime())
+            if not self.keep_history:
+                return
+        seg = self.segments[-1] if len(self.segments) > 0 else None
+        if seg is None or not _is_same_layout(seg, data_vars, coords):
+            seg = self._new_segment(data_vars, coords)
+        idx = seg["num_steps"]
+        if idx == seg["capacity"]:
+            seg["capacity"] *= 2
+            for name, buffer in seg["data"].items():
+                new_buffer = np.empty((seg["capacity"], *buffer.shape[1:]), dtype=buffer.dtype)
+                new_buffer[:idx] = buffer[:idx]
+                seg["data"][name] = new_buffer
+        for name, (_, data) in data_vars.items():
+            seg["data"][name][idx] = data
+        seg["num_steps"] += 1
+
+    def _new_segment(self, data_vars: dict, coords: dict):
+        seg = {
+            "coords": {key: np.asarray(value) for key, value in coords.items()},
+            "dims": {name: tuple(dims) for name, (dims, _) in data_vars.items()},
+            "data": {
+                name: np.empty((self.init_capacity, *data.shape), dtype=data.dtype)
+                for name, (_, data) in data_vars.items()
+            },
+            "capacity": self.init_capacity,
+            "num_steps": 0,
+        }
+        self.segments.append(seg)
+        return seg
+
+    def to_xarray(self, times: list, attrs: dict | None = None) -> xr.Dataset:
+        """Convert all steps to a dataset with a ``time`` dimension, an empty dataset if no steps are kept."""
+        if len(self.segments) == 0:
+            return xr.Dataset(attrs=attrs)
+        datasets = []
+        start = 0
+        for seg in self.segments:
+            n = seg["num_steps"]
+            data_vars = {
+                name: (("time", *seg["dims"][name]), buffer[:n])
+                for name, buffer in seg["data"].items()
+            }
+            coords = dict(seg["coords"])
+            coords["time"] = times[start:start + n]
+            datasets.append(xr.Dataset(data_vars=data_vars, coords=coords))
+            start += n
+        ds = datasets[0] if len(datasets) == 1 else xr.concat(datasets, dim="time", join="outer")
+        if attrs is not None:
+            ds.attrs = attrs
+        return ds
+
+
+class Envelope:
+    """Running statistics of each response, updated in place at each step.
+
+    The statistics of each entry of the responses (e.g., each node and DOF) are
+    ``max``, ``min``, ``absMax``, ``rms``, and the times of the peaks ``maxTime``, ``minTime``, ``absMaxTime``.
+    NaN entries, e.g., of removed elements, are ignored.
+    The memory is O(entries) and does not grow with the number of steps.
+    If the coordinates change between steps, the envelope covers the union of them.
+    """
+
+    STATS = ("max", "min", "absMax", "rms", "maxTime", "minTime", "absMaxTime")
+
+    def __init__(self):
+        self.coords = {}  # key: dim name, value: coordinates covered so far
+        self.dims = {}  # key: response name, value: dims
+        self.data = {}  # key: response name, value: dict of arrays of the stats, sumSq and count
+        self.num_steps = 0
+        self.end_time = np.nan  # the time of the last step
+
+    def update(self, data_vars: dict, coords: dict, time: float):
+        """Add one step, the arguments are the same as :meth:`StepBuffer.append` plus the time of the step."""
+        data_vars = {
+            name: (tuple(dims), np.asarray(data, dtype=float)) for name, (dims, data) in data_vars.items()
+            if np.asarray(data).dtype.kind in "fiu"
+        }
+        if not self._is_covered(data_vars, coords):
+            self._extend(data_vars, coords)
+        for name, (dims, data) in data_vars.items():
+            data = self._to_layout(dims, data, coords)
+            stats = self.data[name]
+            valid = ~np.isnan(data)
+            for key, values, larger in (("max", data, True), ("min", data, False), ("absMax", np.abs(data), True)):
+                old = stats[key]
+                new = values > old if larger else values < old
+                new |= np.isnan(old) & valid
+                old[new] = values[new]
+                stats[f"{key}Time"][new] = time
+            stats["sumSq"][valid] += data[valid] ** 2
+            stats["count"][valid] += 1
+        self.num_steps += 1
+        self.end_time = time
+
+    def to_xarray(self) -> xr.Dataset:
+        """The statistics of each response along a leading ``stats`` dimension,
+        with the number of steps ``numSteps`` and the time of the last step ``endTime`` as attributes."""
+        data_vars = {}
+        for name, stats in self.data.items():
+            with np.errstate(invalid="ignore", divide="ignore"):
+                rms = np.sqrt(stats["sumSq"] / stats["count"])
+            values = [rms if key == "rms" else stats[key] for key in self.STATS]
+            data_vars[name] = (("stats",) + self.dims[name], np.stack(values))
+        coords = dict(self.coords)
+        coords["stats"] = list(self.STATS)
+        return xr.Dataset(
+            data_vars=data_vars, coords=coords, attrs={"numSteps": self.num_steps, "endTime": self.end_time}
+        )
+
+    def _get_shape(self, dims, shape, coords: dict | None = None):
+        coords = self.coords if coords is None else coords
+        return tuple(len(coords[dim]) if dim in coords else size for dim, size in zip(dims, shape))
+
+    def _is_covered(self, data_vars: dict, coords: dict):
+        """Whether the step fits into the current layout, i.e., its coordinates are subsets of the covered ones."""
+        if data_vars.keys() != self.data.keys():
+            return False
+        for key, value in coords.items():
+            old = self.coords.get(key, None)
+            if old is None:
+                return False
+            if value is not old and not np.all(np.isin(np.asarray(value), old)):
+                return False
+        for name, (dims, data) in data_vars.items():
+            if self.dims[name] != dims or self._get_shape(dims, data.shape) != self.data[name]["max"].shape:
+                return False
+        return True
+
+    def _extend(self, data_vars: dict, coords: dict):
+        """Grow the statistics to the union of the old and new coordinates, the new entries are empty."""
+        new_coords = dict(self.coords)
+        for key, value in coords.items():
+            value = np.asarray(value)
+            if key in new_coords:
+                value = np.concatenate([new_coords[key], value[~np.isin(value, new_coords[key])]])
+            new_coords[key] = value
+        for name, (dims, data) in data_vars.items():
+            shape = self._get_shape(dims, data.shape, new_coords)
+            stats = {key: np.full(shape, np.nan) for key in self.STATS if key != "rms"}
+            stats["sumSq"], stats["count"] = np.zeros(shape), np.zeros(shape)
+            if name in self.data:
+                if self.dims[name] != dims:
+                    raise ValueError(f"The dims of response {name} changed from {self.dims[name]} to {dims}!")
+                index = _get_layout_index(dims, self.data[name]["max"].shape, self.coords, new_coords)
+                for key, values in self.data[name].items():
+                    stats[key][index] = values
+            self.dims[name] = dims
+            self.data[name] = stats
+        self.coords = new_coords
+
+    def _to_layout(self, dims, data: np.ndarray, coords: dict):
+        """Place the data of one step into the layout of the statistics, the missing entries are NaN."""
+        same = all(
+            dim not in coords or coords[dim] is self.coords[dim] or np.array_equal(coords[dim], self.coords[dim])
+            for dim in dims
+        )
+        if same and self._get_shape(dims, data.shape) == data.shape:
+            return data
+        out = np.full(self._get_shape(dims, data.shape), np.nan)
+        out[_get_layout_index(dims, data.shape, coords, self.coords)] = data
+        return out
+
+
+class EleGeometryCache:
+    """Element class tags, connectivity, node coordinates and integration point counts
+    shared by the element extractors.
+
+    The cached data is only valid for one version of the model info held by ``ModelInfoStepData``,
+    :meth:`update` empties the cache when that version changes, i.e., when the domain actually changes.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.class_tags = {}  # key: ele tag, value: class tag
+        self.ele_nodes = {}  # key: ele tag, value: node tags
+        self.node_coords = {}  # key: node tag, value: coordinates
+        self.arrays = {}  # key: (name, ele tags), value: arrays derived from the above
+        self.num_points = {}  # key: (ele tag, response args), value: number of integration points
+
+    def update(self, version):
+        if version != self.version:
+            self.version = version
+            self.class_tags = {}
+            self.ele_nodes = {}
+            self.node_coords = {}
+            self.arrays = {}
+            self.num_points = {}
+
+    def get_class_tag(self, ele_tag: int):
+        if ele_tag not in self.class_tags:
+            self.class_tags[ele_tag] = ops.getEleClassTags(ele_tag)[0]
+        return self.class_tags[ele_tag]
+
+    def get_ele_nodes(self, ele_tag: int):
+        if ele_tag not in self.ele_nodes:
+            self.ele_nodes[ele_tag] = ops.eleNodes(ele_tag)
+        return self.ele_nodes[ele_tag]
+
+    def get_node_coord(self, node_tag: int):
+        if node_tag not in self.node_coords:
+            self.node_coords[node_tag] = ops.nodeCoord(node_tag)
+        return self.node_coords[node_tag]
+
+    def get_ele_ndm(self, ele_tag: int):
+        """The number of dimensions of the first node of an element."""
+        return len(self.get_node_coord(self.get_ele_nodes(ele_tag)[0]))
+
+    def get_num_points(self, ele_tag: int, *args):
+        """The number of points ``i`` (from 1) for which both
+        ``ops.eleResponse(ele_tag, *args, str(i), "stresses")`` and ``"strains"`` return data.
+        The points are probed once, 0 means that the element does not respond to these arguments.
+        """
+        key = (ele_tag, *args)
+        if key not in self.num_points:
+            num = 0
+            while (
+                len(ops.eleResponse(ele_tag, *args, f"{num + 1}", "stresses")) > 0
+                and len(ops.eleResponse(ele_tag, *args, f"{num + 1}", "strains")) > 0
+            ):
+                num += 1
+            self.num_points[key] = num
+        return self.num_points[key]
+
+    def get_ele_ends(self, ele_tags):
+        """The coordinates of the first and second nodes of line elements, arrays of shape (num_eles, ndm)."""
+        key = ("ends", tuple(int(tag) for tag in ele_tags))
+        if key not in self.arrays:
+            start, end = [], []
+            for ele_tag in key[1]:
+                nodes = self.get_ele_nodes(ele_tag)
+                start.append(self.get_node_coord(nodes[0]))
+                end.append(self.get_node_coord(nodes[1]))
+            self.arrays[key] = (np.array(start), np.array(end))
+        return self.arrays[key]
+
+
+class RespNameResolver:
+    """Learn which of several candidate response names works for each element class.
+
+    The first element of a class probes the candidates in order, later elements of the same class
+    call ``ops.eleResponse`` once with the cached name.
+    If the cached name returns no data for an element, the candidates are probed again.
+    A candidate is a response name or a tuple of arguments, e.g., ``("material", "1", "strain")``.
+    """
+
+    def __init__(self, geo_cache: EleGeometryCache | None = None):
+        self.geo_cache = geo_cache if geo_cache is not None else EleGeometryCache()
+        self.names = {}  # key: (class tag, candidates), value: working name or None
+
+    def clear(self):
+        self.names = {}
+
+    def get_class_tag(self, ele_tag: int):
+        return self.geo_cache.get_class_tag(ele_tag)
+
+    def get_response(self, ele_tag: int, candidates: tuple):
+        """Return the response of the first candidate name with data, an empty list if none works."""
+        key = (self.get_class_tag(ele_tag), candidates)
+        if key in self.names:
+            name = self.names[key]
+            if name is None:
+                return []
+            resp = _ele_response(ele_tag, name)
+            if len(resp) > 0:
+                return resp
+        resp, self.names[key] = [], None
+        for name in candidates:
+            resp = _ele_response(ele_tag, name)
+            if len(resp) > 0:
+                self.names[key] = name
+                break
+        return resp
+
+
+def _ele_response(ele_tag: int, name):
+    if isinstance(name, str):
+        return ops.eleResponse(ele_tag, name)
+    return ops.eleResponse(ele_tag, *name)
+
+
+def _get_layout_index(dims, shape, old_coords: dict, new_coords: dict):
+    """The index of the entries of an array with ``old_coords`` in the layout of ``new_coords``."""
+    index = []
+    for dim, size in zip(dims, shape):
+        if dim in old_coords and dim in new_coords:
+            pos = {value: i for i, value in enumerate(np.asarray(new_coords[dim]).tolist())}
+            index.append(np.array([pos[value] for value in np.asarray(old_coords[dim]).tolist()], dtype=int))
+        else:
+            index.append(np.arange(size))
+    return np.ix_(*index)
+
+
+def _as_dims_data(value):
+    if isinstance(value, xr.DataArray):
+        return tuple(value.dims), np.asarray(value.values)
+    dims, data = value
+    return tuple(dims), np.asarray(data)
+
+
+def _is_same_layout(seg: dict, data_vars: dict, coords: dict):
+    if seg["dims"].keys() != data_vars.keys() or seg["coords"].keys() != coords.keys():
+        return False
+    for name, (dims, data) in data_vars.items():
+        buffer = seg["data"][name]
+        if seg["dims"][name] != dims or buffer.shape[1:] != data.shape or buffer.dtype != data.dtype:
+            return False
+    for key, value in coords.items():
+        old = seg["coords"][key]
+        if value is old:
+            continue
+        value = np.asarray(value)
+        if value.shape != old.shape or not np.array_equal(value, old):
+            return False
+    return True
+
 
 def _expand_to_uniform_array(array_list):
     """
@@ -56,3 +458,55 @@ def _expand_to_uniform_array(array_list):
         result[i][slices] = arr
 
     return result
+
+
+class StepSnapshot:
+    """Domain data of the current analysis step shared by the response extractors.
+
+    Each item is queried from OpenSees at most once per step, when first needed,
+    and :meth:`clear` must be called when the analysis moves to another step.
+    The returned arrays and tuples are shared and must not be modified.
+    Data that only changes with the model, e.g., connectivity and node coordinates,
+    is kept across steps by :class:`EleGeometryCache` instead.
+    """
+
+    def __init__(self):
+        self.items = {}  # key: name, value: data of the current step
+        self.node_disps = {}  # key: node tag, value: displacements
+
+    def clear(self):
+        self.items = {}
+        self.node_disps = {}
+
+    @property
+    def time(self) -> float:
+        if "time" not in self.items:
+            self.items["time"] = ops.getTime()
+        return self.items["time"]
+
+    @property
+    def node_tags(self) -> np.ndarray:
+        """Read-only array of the node tags in the domain."""
+        if "node_tags" not in self.items:
+            node_tags = np.array(ops.getNodeTags(), dtype=int)
+            node_tags.flags.writeable = False
+            self.items["node_tags"] = node_tags
+        return self.items["node_tags"]
+
+    @property
+    def node_tag_set(self) -> set:
+        """Set of the node tags in the domain, for membership tests."""
+        if "node_tag_set" not in self.items:
+            self.items["node_tag_set"] = frozenset(self.node_tags.tolist())
+        return self.items["node_tag_set"]
+
+    @property
+    def param_tags(self) -> tuple:
+        if "param_tags" not in self.items:
+            self.items["param_tags"] = tuple(ops.getParamTags())
+        return self.items["param_tags"]
+
+    def get_node_disp(self, node_tag: int) -> tuple:
+        if node_tag not in self.node_disps:
+            self.node_disps[node_tag] = tuple(ops.nodeDisp(int(node_tag)))
+        return self.node_disps[node_tag]
@@ -0,0 +1,139 @@
+"""
+Readers that open only the groups of a response file that are needed.
+
+The output databases are netCDF files (``.nc``) or Zarr stores (``.zarr``, a directory).
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+import netCDF4
+import xarray as xr
+
+
+class ODBFileCache:
+    """Process-level cache of open ODB files, with the least recently used file closed first.
+
+    Each entry keeps one ``netCDF4.Dataset`` handle and the lazily indexed groups opened from it,
+    so that repeated queries skip opening the file and parsing its metadata.
+    An entry is reopened when the modification time or size of the file changes.
+    Zarr stores hold no file handle and are not cached,
+    their groups are opened at each query so that the steps appended by a running analysis are seen.
+    Threads that read the cached groups should hold :attr:`lock`, so that no file is closed meanwhile.
+
+    Parameters
+    -----------
+    max_size: int, default: 8
+        The maximum number of files kept open.
+    """
+
+    def __init__(self, max_size: int = 8):
+        self.max_size = max_size
+        self.files = OrderedDict()  # key: abs path, value: dict(nc, stamp, groups)
+        self.lock = threading.RLock()
+
+    def get_group(self, filename: str, name: str):
+        """The lazily indexed group ``name`` of the file, None if the file has no such group."""
+        if is_zarr_store(filename):
+            return _open_zarr_group(filename, name)
+        with self.lock:
+            entry = self._get_entry(filename)
+            if name not in entry["groups"]:
+                if name not in entry["nc"].groups:
+                    return None
+                entry["groups"][name] = _open_group(entry["nc"].groups[name])
+            return entry["groups"][name]
+
+    def close(self, filename: str | None = None):
+        """Close one file, or all files if ``filename`` is None."""
+        with self.lock:
+            paths = list(self.files.keys()) if filename is None else [os.path.abspath(filename)]
+            for path in paths:
+                entry = self.files.pop(path, None)
+                if entry is not None and entry["nc"].isopen():
+                    entry["nc"].close()
+
+    def _get_entry(self, filename: str):
+        path = os.path.abspath(filename)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        entry = self.files.get(path)
+        if entry is not None and (entry["stamp"] != stamp or not entry["nc"].isopen()):
+            self.close(path)
+            entry = None
+        if entry is None:
+            entry = {"nc": netCDF4.Dataset(path, "r"), "stamp": stamp, "groups": {}}
+            self.files[path] = entry
+            while len(self.files) > self.max_size:
+                self.close(next(iter(self.files)))
+        self.files.move_to_end(path)
+        return entry
+
+
+ODB_FILE_CACHE = ODBFileCache()
+
+
+def open_odb_groups(filename: str, groups: list) -> xr.DataTree:
+    """Open some top-level groups of a netCDF data tree without reading their data.
+
+    The variables are lazily indexed, i.e., selections by time, tags and dofs are pushed down to the file
+    and only the selected slices are read when the data is accessed or computed.
+    The other groups of the file are never opened, and groups not in the file are skipped.
+    The file handle is taken from ``ODB_FILE_CACHE`` and stays open.
+
+    .. Note::
+        Use ``.compute()`` rather than ``.load()`` to read the data,
+        the latter would also load the groups kept in the cache.
+
+    Parameters
+    -----------
+    filename: str
+        The netCDF file to be read.
+    groups: list
+        Paths of the groups, e.g., ``["/ModelInfo", "/NodalResponses"]``.
+
+    Returns
+    --------
+    dt: xr.DataTree
+        The data tree with the same paths as the file.
+    """
+    dt = xr.DataTree()
+    for group in groups:
+        name = group.strip("/")
+        tree = ODB_FILE_CACHE.get_group(filename, name)
+        if tree is not None:
+            dt[name] = tree
+    return dt
+
+
+def get_odb_filename(stem: str) -> str:
+    """The existing output database ``{stem}.nc`` or ``{stem}.zarr``, ``{stem}.nc`` if neither exists."""
+    for ext in (".nc", ".zarr"):
+        if os.path.exists(stem + ext):
+            return stem + ext
+    return stem + ".nc"
+
+
+def is_zarr_store(filename: str) -> bool:
+    return filename.endswith(".zarr")
+
+
+def close_odb_file(filename: str | None = None):
+    """Close a file kept in ``ODB_FILE_CACHE``, or all files if None, e.g., before the file is overwritten."""
+    ODB_FILE_CACHE.close(filename)
+
+
+def _open_zarr_group(filename: str, name: str):
+    if not os.path.isdir(os.path.join(filename, name)):
+        return None
+    # the stores are written without consolidated metadata, see ZarrStepWriter
+    return xr.open_datatree(filename, engine="zarr", group=name, consolidated=False)
+
+
+def _open_group(grp: netCDF4.Group) -> xr.DataTree:
+    ds = xr.open_dataset(xr.backends.NetCDF4DataStore(grp), cache=False)
+    tree = xr.DataTree(ds)
+    for name, sub_grp in grp.groups.items():
+        tree[name] = _open_group(sub_grp)
+    return tree
@@ -0,0 +1,341 @@
+"""
+Writers that save response steps to disk while the analysis is running.
+
+The output databases are netCDF files (``.nc``) or Zarr stores (``.zarr``, a directory),
+Zarr is an optional dependency, i.e., ``pip install zarr``.
+"""
+
+import os
+import shutil
+
+import netCDF4
+import numpy as np
+import xarray as xr
+
+from ._odb_reader import close_odb_file, is_zarr_store
+
+COMPRESSORS = (
+    "zlib", "zstd", "bzip2", "szip",
+    "blosc_lz", "blosc_lz4", "blosc_lz4hc", "blosc_zlib", "blosc_zstd",
+)
+STORAGE_KEYS = ("compressor", "complevel", "shuffle", "chunk_bytes", "dtype", "significant_digits")
+
+
+def check_storage(storage):
+    """Check the storage layout options and fill in the defaults.
+
+    Parameters
+    -----------
+    storage: Union[bool, dict, None]
+        None or False means no compression, True means the default options.
+        A dict may contain:
+
+        * compressor: str, default: "zlib"
+            One of "zlib", "zstd", "bzip2", "szip", "blosc_lz", "blosc_lz4", "blosc_lz4hc",
+            "blosc_zlib" and "blosc_zstd".
+        * complevel: int, default: 4
+            The compression level.
+        * shuffle: bool, default: True
+            Whether to apply the byte shuffle filter before compression.
+            For Zarr stores, it only applies to the blosc compressors.
+        * chunk_bytes: int, default: 1048576
+            The target size in bytes of the chunks of the response variables.
+            Each chunk holds a block of consecutive steps with all nodes or elements,
+            the steps per chunk are chosen to approach this size.
+        * dtype: Union[str, dict], default: None
+            The data type of the saved floating-point responses, e.g., "float32",
+            or a dict with response names as keys.
+            If None, the data type is kept, i.e., the compression is lossless.
+        * significant_digits: Union[int, dict], default: None
+            The number of significant decimal digits kept by quantization of the floating-point responses,
+            or a dict with response names as keys.
+            If None, the data is not quantized.
+            Not supported by Zarr stores.
+
+    Returns
+    --------
+    storage: Union[dict, None]
+    """
+    if storage is None or storage is False:
+        return None
+    if storage is True:
+        storage = {}
+    if not isinstance(storage, dict):
+        raise ValueError("storage must be a bool or a dict!")
+    for key in storage:
+        if key not in STORAGE_KEYS:
+            raise ValueError(f"Incorrect storage option {key}, should be one of {list(STORAGE_KEYS)}!")
+    storage = {
+        "compressor": "zlib",
+        "complevel": 4,
+        "shuffle": True,
+        "chunk_bytes": 2**20,
+        "dtype": None,
+        "significant_digits": None,
+        **storage,
+    }
+    if storage["compressor"] not in COMPRESSORS:
+        raise ValueError(f"compressor must be one of {list(COMPRESSORS)}!")
+    if int(storage["chunk_bytes"]) < 1:
+        raise ValueError("chunk_bytes must be a positive integer!")
+    return storage
+
+
+def get_storage_encoding(
+        dt: xr.DataTree, storage: dict, max_chunk_steps: int | None = None, engine: str = "netcdf4"
+) -> dict:
+    """The netCDF encoding of all numeric variables in a data tree, keyed by group path and variable name.
+
+    Variables with a leading ``time`` dimension are chunked time-major,
+    i.e., a chunk holds a block of steps of all nodes or elements,
+    so that reading some steps or the full history of some tags touches few chunks.
+
+    Parameters
+    -----------
+    dt: xr.DataTree
+        The data tree to be written.
+    storage: dict
+        The storage layout options returned by :func:`check_storage`.
+    max_chunk_steps: int, default: None
+        The maximum number of steps in a chunk.
+        If None, a chunk holds at most the steps in the data tree.
+    engine: str, default: "netcdf4"
+        "netcdf4" or "zarr".
+
+    Returns
+    --------
+    encoding: dict
+    """
+    encoding = {}
+    for node in dt.subtree:
+        if not node.has_data:
+            continue
+        ds = node.to_dataset()
+        group_encoding = {}
+        for name, da in ds.variables.items():
+            enc = _get_variable_encoding(name, da, storage, max_chunk_steps)
+            if enc is not None and engine == "zarr":
+                enc = _to_zarr_encoding(enc, da.dtype.itemsize)
+            if enc is not None:
+                group_encoding[name] = enc
+        if len(group_encoding) > 0:
+            encoding[node.path] = group_encoding
+    return encoding
+
+
+def _get_variable_encoding(name, da: xr.Variable, storage: dict, max_chunk_steps: int):
+    if da.dtype.kind not in "fiub" or da.size == 0:
+        return None
+    enc = {"compression": storage["compressor"], "shuffle": storage["shuffle"]}
+    if storage["compressor"] == "szip":
+        enc.update(szip_coding="nn", szip_pixels_per_block=8)
+    else:
+        enc["complevel"] = storage["complevel"]
+    if da.dtype.kind == "f":
+        dtype = _get_var_option(storage["dtype"], name)
+        if dtype is not None:
+            enc["dtype"] = np.dtype(dtype)
+        digits = _get_var_option(storage["significant_digits"], name)
+        if digits is not None:
+            enc["significant_digits"] = int(digits)
+    if da.dims[:1] == ("time",) and da.ndim > 1:
+        enc["chunksizes"] = _get_time_major_chunks(da, int(storage["chunk_bytes"]), max_chunk_steps)
+    return enc
+
+
+def _to_zarr_encoding(enc: dict, itemsize: int):
+    from zarr.codecs import BloscCodec, GzipCodec, ZstdCodec
+
+    if "significant_digits" in enc:
+        raise ValueError("significant_digits is not supported by Zarr stores!")
+    compressor, level = enc["compression"], enc.get("complevel", 4)
+    if compressor == "zlib":
+        codec = GzipCodec(level=level)
+    elif compressor == "zstd":
+        codec = ZstdCodec(level=level)
+    elif compressor.startswith("blosc_"):
+        cname = "blosclz" if compressor == "blosc_lz" else compressor[len("blosc_"):]
+        shuffle = "shuffle" if enc["shuffle"] else "noshuffle"
+        codec = BloscCodec(cname=cname, clevel=level, shuffle=shuffle, typesize=itemsize)
+    else:
+        raise ValueError(f"compressor {compressor} is not supported by Zarr stores!")
+    zarr_enc = {"compressors": (codec,)}
+    if "chunksizes" in enc:
+        zarr_enc["chunks"] = enc["chunksizes"]
+    if "dtype" in enc:
+        zarr_enc["dtype"] = enc["dtype"]
+    return zarr_enc
+
+
+def _get_var_option(option, name):
+    if isinstance(option, dict):
+        return option.get(name, None)
+    return option
+
+
+def _get_time_major_chunks(da: xr.Variable, chunk_bytes: int, max_chunk_steps: int):
+    """A block of steps with all entities, the trailing dims are split only if one step exceeds the target size."""
+    shape = list(da.shape[1:])
+    itemsize = da.dtype.itemsize
+    # split the leading non-time dim (e.g., tags) while a single step is too large
+    while len(shape) > 0 and shape[0] > 1 and int(np.prod(shape)) * itemsize > chunk_bytes:
+        shape[0] = (shape[0] + 1) // 2
+    step_bytes = max(int(np.prod(shape)) * itemsize, 1)
+    max_chunk_steps = da.shape[0] if max_chunk_steps is None else max_chunk_steps
+    num_steps = max(min(chunk_bytes // step_bytes, max_chunk_steps), 1)
+    return tuple([num_steps] + [max(size, 1) for size in shape])
+
+
+def get_odb_stem(filename: str) -> str:
+    """The file name without the ``.nc`` or ``.zarr`` extension."""
+    return os.path.splitext(filename)[0]
+
+
+def remove_odb_file(filename: str):
+    """Remove an output database in both formats, i.e., ``{stem}.nc`` and ``{stem}.zarr``,
+    so that the readers find the one written next."""
+    stem = get_odb_stem(filename)
+    for path in (stem + ".nc", stem + ".zarr"):
+        close_odb_file(path)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def write_odb_tree(dt: xr.DataTree, filename: str, encoding: dict | None = None):
+    """Write a whole data tree to a netCDF file or a Zarr store, chosen by the extension of ``filename``."""
+    remove_odb_file(filename)
+    if is_zarr_store(filename):
+        dt.to_zarr(filename, mode="w", encoding=encoding, consolidated=False)
+    else:
+        dt.to_netcdf(filename, mode="w", engine="netcdf4", encoding=encoding)
+
+
+def get_step_writer(filename: str, storage: dict | None = None):
+    """A :class:`NetCDFStepWriter` or :class:`ZarrStepWriter`, chosen by the extension of ``filename``."""
+    if is_zarr_store(filename):
+        return ZarrStepWriter(filename, storage=storage)
+    return NetCDFStepWriter(filename, storage=storage)
+
+
+class NetCDFStepWriter:
+    """Append blocks of response steps to a netCDF file along an unlimited ``time`` dimension.
+
+    The first block written to a group fixes its layout (dimensions and coordinates other than ``time``),
+    later blocks are aligned to that layout and appended in place.
+    Variables without a ``time`` dimension are written only once.
+
+    Parameters
+    -----------
+    filename: str
+        The netCDF file to be written, an existing file will be overwritten.
+    storage: dict, default: None
+        The storage layout options returned by :func:`check_storage`, None means no compression.
+    """
+
+    def __init__(self, filename: str, storage: dict | None = None):
+        self.filename = filename
+        self.storage = storage
+        self.layouts = {}  # key: group path, value: {dim: coords}
+        self.var_dims = {}  # key: group path, value: {var name: dims}
+        self.num_steps = {}  # key: group path, value: number of steps written
+        remove_odb_file(self.filename)
+
+    def append(self, dt: xr.DataTree):
+        """Write all groups of a data tree, new groups are created and existing groups are appended."""
+        for node in dt.subtree:
+            if not node.has_data:
+                continue
+            ds = node.to_dataset()
+            if node.path in self.layouts:
+                self._append_group(node.path, ds)
+            else:
+                self._create_group(node.path, ds)
+
+    def _create_group(self, path: str, ds: xr.Dataset):
+        mode = "a" if os.path.exists(self.filename) else "w"
+        unlimited_dims = ["time"] if "time" in ds.dims else None
+        encoding = None
+        if self.storage is not None:
+            # one chunk per block of steps, so that each block appended later fills whole chunks
+            encoding = get_storage_encoding(
+                xr.DataTree(ds), self.storage, max_chunk_steps=ds.sizes.get("time", None)
+            ).get("/", None)
+        ds.to_netcdf(
+            self.filename, mode=mode, group=path, engine="netcdf4",
+            unlimited_dims=unlimited_dims, encoding=encoding
+        )
+        self.layouts[path] = {dim: ds.indexes[dim] for dim in ds.dims if dim != "time" and dim in ds.indexes}
+        self.var_dims[path] = {name: da.dims for name, da in ds.data_vars.items()}
+        self.num_steps[path] = ds.sizes.get("time", 0)
+
+    def _append_group(self, path: str, ds: xr.Dataset):
+        if "time" not in ds.dims:
+            return
+        layout = {dim: coords for dim, coords in self.layouts[path].items() if dim in ds.dims}
+        ds = ds.reindex(layout)
+        start = self.num_steps[path]
+        end = start + ds.sizes["time"]
+        with netCDF4.Dataset(self.filename, "a") as nc:
+            grp = nc[path.lstrip("/")]
+            grp.variables["time"][start:end] = ds["time"].values
+            for name, dims in self.var_dims[path].items():
+                if dims[:1] != ("time",) or name not in ds or ds[name].size == 0:
+                    continue
+                grp.variables[name][start:end, ...] = ds[name].transpose(*dims).values
+        self.num_steps[path] = end
+
+
+class ZarrStepWriter(NetCDFStepWriter):
+    """Append blocks of response steps to a Zarr store along the ``time`` dimension.
+
+    Same as :class:`NetCDFStepWriter`, the arrays are resized and each block only writes new chunks,
+    and the store can be read, e.g., by :func:`get_nodal_responses`, while the analysis is still running.
+    The metadata is not consolidated, so that the readers see the steps appended after they opened the store.
+
+    Parameters
+    -----------
+    filename: str
+        The Zarr store (a directory) to be written, an existing store will be overwritten.
+    storage: dict, default: None
+        The storage layout options returned by :func:`check_storage`, None means the Zarr defaults.
+    """
+
+    def __init__(self, filename: str, storage: dict | None = None):
+        import zarr  # noqa: F401, raise early if the optional dependency is missing
+
+        super().__init__(filename, storage=storage)
+
+    def _create_group(self, path: str, ds: xr.Dataset):
+        mode = "a" if os.path.exists(self.filename) else "w"
+        encoding = None
+        if self.storage is not None:
+            encoding = get_storage_encoding(
+                xr.DataTree(ds), self.storage, max_chunk_steps=ds.sizes.get("time", None), engine="zarr"
+            ).get("/", None)
+        ds.to_zarr(self.filename, mode=mode, group=path, encoding=encoding, consolidated=False)
+        self.layouts[path] = {dim: ds.indexes[dim] for dim in ds.dims if dim != "time" and dim in ds.indexes}
+        self.var_dims[path] = {name: da.dims for name, da in ds.data_vars.items()}
+        self.num_steps[path] = ds.sizes.get("time", 0)
+
+    def _append_group(self, path: str, ds: xr.Dataset):
+        import zarr
+
+        if "time" not in ds.dims:
+            return
+        layout = {dim: coords for dim, coords in self.layouts[path].items() if dim in ds.dims}
+        ds = ds.reindex(layout)
+        start = self.num_steps[path]
+        end = start + ds.sizes["time"]
+        grp = zarr.open_group(self.filename, path=path.lstrip("/"), mode="a")
+        values = {"time": ds["time"].values}
+        for name, dims in self.var_dims[path].items():
+            if dims[:1] == ("time",) and name in ds:
+                values[name] = ds[name].transpose(*dims).values
+        for name, value in values.items():
+            arr = grp[name]
+            arr.resize((end,) + arr.shape[1:])
+            if arr.size > 0:
+                arr[start:end, ...] = value
+        self.num_steps[path] = end
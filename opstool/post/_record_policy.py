@@ -0,0 +1,142 @@
+"""
+Policies that decide at which analysis steps each response type is recorded.
+"""
+
+import numpy as np
+
+POLICY_KEYS = ("every", "min_interval", "tol", "peak", "trigger")
+
+
+class RecordPolicy:
+    """Decide for each response type whether the current step is recorded.
+
+    A step is recorded only if all the given conditions hold:
+
+    * every: int, default: 1
+        At least ``every`` fetched steps since the last recorded step.
+    * min_interval: float, default: 0.0
+        At least ``min_interval`` of analysis time since the last recorded step.
+    * tol: float, default: None
+        The trigger value has changed by more than ``tol`` since the last recorded step.
+    * peak: bool, default: False
+        The absolute trigger value exceeds that of all recorded steps.
+    * trigger: callable, default: None
+        A function without arguments that returns a scalar,
+        if None, the maximum absolute nodal displacement of the saved nodes.
+
+    Parameters
+    -----------
+    policy: dict, default: None
+        The options above apply to all response types,
+        a key of ``resp_types`` with a dict of options overrides them for that type,
+        e.g., ``{"every": 2, "fibersec": {"every": 50}}``.
+        If None, all steps are recorded.
+    resp_types: list
+        The response types, e.g., ``["nodal", "frame", "fibersec"]``.
+    """
+
+    def __init__(self, policy: dict | None = None, resp_types: list = ()):
+        policy = {} if policy is None else dict(policy)
+        base = {key: policy.pop(key) for key in POLICY_KEYS if key in policy}
+        for key, value in policy.items():
+            if key not in resp_types:
+                raise ValueError(
+                    f"Incorrect record policy key {key}, should be one of {list(POLICY_KEYS) + list(resp_types)}!"
+                )
+            if not isinstance(value, dict):
+                raise ValueError(f"The record policy of {key} must be a dict!")
+        self.uniform = len(policy) == 0
+        self.options = {
+            resp_type: _check_options({**base, **policy.get(resp_type, {})}) for resp_type in resp_types
+        }
+        self.record_all = all(_is_trivial(opts) for opts in self.options.values())
+        self.states = {}
+        self.reset()
+
+    def reset(self, get_trigger_value=None):
+        """Forget the recorded steps, the initial step at time 0 counts as recorded.
+
+        The trigger values of the initial step are taken from ``get_trigger_value`` (the default trigger)
+        and the ``trigger`` options, if None, the first step checked is compared with no reference.
+        """
+        self.states = {
+            resp_type: {"count": 0, "time": 0.0, "value": None, "peak": 0.0} for resp_type in self.options
+        }
+        if get_trigger_value is None:
+            return
+        values = {}
+        for resp_type, opts in self.options.items():
+            if opts["tol"] is None and not opts["peak"]:
+                continue
+            trigger = opts["trigger"] if opts["trigger"] is not None else get_trigger_value
+            if trigger not in values:
+                values[trigger] = float(trigger())
+            self.states[resp_type]["value"] = values[trigger]
+            self.states[resp_type]["peak"] = abs(values[trigger])
+
+    def check(self, time: float, get_trigger_value) -> dict:
+        """Whether each response type records the current step.
+
+        Parameters
+        -----------
+        time: float
+            The current analysis time.
+        get_trigger_value: callable
+            The default trigger, only called if a policy needs it.
+
+        Returns
+        --------
+        records: dict
+            key: response type, value: bool.
+        """
+        if self.record_all:
+            return {resp_type: True for resp_type in self.options}
+        values = {}  # trigger values of this step, key: trigger function
+        records = {}
+        for resp_type, opts in self.options.items():
+            state = self.states[resp_type]
+            state["count"] += 1
+            record = state["count"] >= opts["every"] and time - state["time"] >= opts["min_interval"]
+            value = None
+            if record and (opts["tol"] is not None or opts["peak"]):
+                trigger = opts["trigger"] if opts["trigger"] is not None else get_trigger_value
+                if trigger not in values:
+                    values[trigger] = float(trigger())
+                value = values[trigger]
+                if opts["tol"] is not None and state["value"] is not None:
+                    record = abs(value - state["value"]) > opts["tol"]
+                if record and opts["peak"]:
+                    record = abs(value) > state["peak"]
+            if record:
+                state["count"], state["time"] = 0, time
+                if value is not None:
+                    state["value"], state["peak"] = value, max(state["peak"], abs(value))
+            records[resp_type] = record
+        return records
+
+
+def get_max_abs_disp(node_tags, get_disp) -> float:
+    """The maximum absolute displacement of some nodes, ``get_disp`` is e.g. ``ops.nodeDisp``."""
+    value = 0.0
+    for tag in node_tags:
+        disp = get_disp(int(tag))
+        if len(disp) > 0:
+            value = max(value, float(np.max(np.abs(disp))))
+    return value
+
+
+def _check_options(opts: dict):
+    opts = {"every": 1, "min_interval": 0.0, "tol": None, "peak": False, "trigger": None, **opts}
+    opts["every"] = int(opts["every"])
+    if opts["every"] < 1:
+        raise ValueError("every must be a positive integer!")
+    opts["min_interval"] = float(opts["min_interval"])
+    if opts["tol"] is not None:
+        opts["tol"] = float(opts["tol"])
+    if opts["trigger"] is not None and not callable(opts["trigger"]):
+        raise ValueError("trigger must be a callable without arguments!")
+    return opts
+
+
+def _is_trivial(opts: dict):
+    return opts["every"] == 1 and opts["min_interval"] <= 0.0 and opts["tol"] is None and not opts["peak"]
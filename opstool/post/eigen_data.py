@@ -6,8 +6,9 @@ import openseespy.opensees as ops
 
 from ..utils import CONSTANTS, get_random_color
 from .model_data import GetFEMData
+from ._odb_reader import get_odb_filename, open_odb_groups
+from ._odb_writer import write_odb_tree
 
-RESULTS_DIR = CONSTANTS.get_output_dir()
 CONSOLE = CONSTANTS.get_console()
 PKG_PREFIX = CONSTANTS.get_pkg_prefix()
 EIGEN_FILE_NAME = CONSTANTS.get_eigen_filename()
@@ -129,14 +130,15 @@ def save_eigen_data(
     Parameters
     ----------
     odb_tag: Union[str, int], default = 1
-        Output database tag, the data will be saved in ``EigenData-{odb_tag}.nc``.
+        Output database tag, the data will be saved in ``EigenData-{odb_tag}.nc``,
+        or ``EigenData-{odb_tag}.zarr`` if set by ``opstool.post.set_odb_format("zarr")``.
     mode_tag : int, optional,
         Modal tag, all modal data smaller than this modal tag will be saved, by default 1
     solver : str, optional,
        OpenSees' eigenvalue analysis solver, by default "-genBandArpack".
        See `eigen Command <https://opensees.github.io/OpenSeesDocumentation/user/manual/analysis/eigen.html>`_
     """
-    output_filename = RESULTS_DIR + "/" + f"{EIGEN_FILE_NAME}-{odb_tag}.nc"
+    output_filename = CONSTANTS.get_output_dir() + "/" + f"{EIGEN_FILE_NAME}-{odb_tag}.{CONSTANTS.get_odb_format()}"
     # -----------------------------------------------------------------
     model_info, _ = GetFEMData().get_model_info()
     modal_props, eigen_vectors = _get_eigen_info(mode_tag, solver)
@@ -146,7 +148,7 @@ def save_eigen_data(
     eigen_data["Eigen/ModalProps"] = xr.Dataset({modal_props.name: modal_props})
     eigen_data["Eigen/EigenVectors"] = xr.Dataset({eigen_vectors.name: eigen_vectors})
     dt = xr.DataTree.from_dict(eigen_data, name=f"{EIGEN_FILE_NAME}")
-    dt.to_netcdf(output_filename, mode="w", engine="netcdf4")
+    write_odb_tree(dt, output_filename)
     # /////////////////////////////////////
     color = get_random_color()
     CONSOLE.print(
@@ -161,22 +163,23 @@ def load_eigen_data(
     resave: bool = True,
 ):
     """Get the eigenvalue data from the saved file."""
-    filename = f"{RESULTS_DIR}/" + f"{EIGEN_FILE_NAME}-{odb_tag}.nc"
+    filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{EIGEN_FILE_NAME}-{odb_tag}")
     if not os.path.exists(filename):
         resave = True
     if resave:
         save_eigen_data(odb_tag=odb_tag, mode_tag=mode_tag, solver=solver)
+        filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{EIGEN_FILE_NAME}-{odb_tag}")
     else:
         color = get_random_color()
         CONSOLE.print(
             f"{PKG_PREFIX} Loading eigen data from [bold {color}]{filename}[/] ..."
         )
-    with xr.open_datatree(filename, engine="netcdf4").load() as dt:
-        model_info = dict()
-        for key, value in dt["ModelInfo"].items():
-            model_info[key] = value[key]
-        model_props = dt["Eigen/ModalProps"]["ModalProps"]
-        eigen_vectors = dt["Eigen/EigenVectors"]["EigenVectors"]
+    dt = open_odb_groups(filename, ["/ModelInfo", "/Eigen"]).compute()
+    model_info = {}
+    for key, value in dt["ModelInfo"].items():
+        model_info[key] = value[key]
+    model_props = dt["Eigen/ModalProps"]["ModalProps"]
+    eigen_vectors = dt["Eigen/EigenVectors"]["EigenVectors"]
     return model_props, eigen_vectors, model_info
 
 
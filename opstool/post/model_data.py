@@ -9,8 +9,9 @@ from typing import Union
 
 from ..utils import CONSTANTS, get_random_color
 from ._get_model_data_base import FEMData
+from ._odb_reader import get_odb_filename, open_odb_groups
+from ._odb_writer import write_odb_tree
 
-RESULTS_DIR = CONSTANTS.get_output_dir()
 CONSOLE = CONSTANTS.get_console()
 PKG_PREFIX = CONSTANTS.get_pkg_prefix()
 MODEL_FILE_NAME = CONSTANTS.get_model_filename()
@@ -454,14 +455,16 @@ def save_model_data(
     .. Note::
        Since this package chooses `xarray <https://docs.xarray.dev/en/stable/index.html>`_
        as the data structure, it is saved in
-       `netCDF <https://docs.xarray.dev/en/stable/user-guide/io.html>`_ format.
+       `netCDF <https://docs.xarray.dev/en/stable/user-guide/io.html>`_ format,
+       or as a Zarr store if set by ``opstool.post.set_odb_format("zarr")``.
 
     Parameters
     ----------
     odb_tag: Union[str, int], default = 1
-        Output database tag, the data will be saved in ``ModelData-{odb_tag}.nc``.
+        Output database tag, the data will be saved in ``ModelData-{odb_tag}.nc``,
+        or ``ModelData-{odb_tag}.zarr`` if set by ``opstool.post.set_odb_format("zarr")``.
     """
-    output_filename = RESULTS_DIR + "/" + f"{MODEL_FILE_NAME}-{odb_tag}.nc"
+    output_filename = CONSTANTS.get_output_dir() + "/" + f"{MODEL_FILE_NAME}-{odb_tag}.{CONSTANTS.get_odb_format()}"
     model_data = GetFEMData()
     model_info, cells = model_data.get_model_info()
     model_data = dict()
@@ -473,7 +476,7 @@ def save_model_data(
     else:
         model_data["Cells"] = xr.Dataset()
     dt = xr.DataTree.from_dict(model_data, name=f"{MODEL_FILE_NAME}")
-    dt.to_netcdf(output_filename, mode="w", engine="netcdf4")
+    write_odb_tree(dt, output_filename)
     # /////////////////////////////////////
     color = get_random_color()
     CONSOLE.print(
@@ -499,22 +502,23 @@ def load_model_data(
     model_info: dict[xarray.DataArray]
     cells: dict[xarray.DataArray]
     """
-    filename = f"{RESULTS_DIR}/" + f"{MODEL_FILE_NAME}-{odb_tag}.nc"
+    filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{MODEL_FILE_NAME}-{odb_tag}")
     if not os.path.exists(filename):
         resave = True
     if resave:
         save_model_data(odb_tag=odb_tag)
+        filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{MODEL_FILE_NAME}-{odb_tag}")
     else:
         color = get_random_color()
         CONSOLE.print(
             f"{PKG_PREFIX} Loading model data from [bold {color}]{filename}[/] ..."
         )
     model_info, cells = dict(), dict()
-    with xr.open_datatree(filename, engine="netcdf4").load() as dt:
-        for key, value in dt["ModelInfo"].items():
-            model_info[key] = value[key]
-        for key, value in dt["Cells"].items():
-            cells[key] = value[key]
+    dt = open_odb_groups(filename, ["/ModelInfo", "/Cells"]).compute()
+    for key, value in dt["ModelInfo"].items():
+        model_info[key] = value[key]
+    for key, value in dt["Cells"].items():
+        cells[key] = value[key]
     return model_info, cells
 
 #
@@ -1,11 +1,16 @@
-from typing import Union
+import glob
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Callable, Union
 from types import SimpleNamespace
 
 import numpy as np
-import openseespy.opensees as ops
 import xarray as xr
 
 from ._get_response import (
+    EleGeometryCache,
+    StepSnapshot,
     ModelInfoStepData,
     NodalRespStepData,
     TrussRespStepData,
@@ -18,16 +23,33 @@ from ._get_response import (
     ContactRespStepData,
     SensitivityRespStepData
 )
+from ._odb_reader import ODB_FILE_CACHE, open_odb_groups, close_odb_file, get_odb_filename, is_zarr_store
+from ._odb_writer import get_step_writer, write_odb_tree, check_storage, get_storage_encoding
+from ._record_policy import RecordPolicy, get_max_abs_disp
 from .eigen_data import save_eigen_data
 from .model_data import save_model_data
 from ..utils import get_random_color, CONSTANTS
 
-RESULTS_DIR = CONSTANTS.get_output_dir()
 CONSOLE = CONSTANTS.get_console()
 PKG_PREFIX = CONSTANTS.get_pkg_prefix()
 RESP_FILE_NAME = CONSTANTS.get_resp_filename()
 MODEL_FILE_NAME = CONSTANTS.get_model_filename()
 
+# key: resp_type of loadODB, value: group in the response file
+RESP_GROUPS = {
+    "nodal": "/NodalResponses",
+    "frame": "/FrameResponses",
+    "fibersec": "/FiberSectionResponses",
+    "truss": "/TrussResponses",
+    "link": "/LinkResponses",
+    "shell": "/ShellResponses",
+    "plane": "/PlaneResponses",
+    "brick": "/SolidResponses",
+    "solid": "/SolidResponses",
+    "contact": "/ContactResponses",
+    "sensitivity": "/SensitivityResponses",
+}
+
 
 POST_ARGS = SimpleNamespace(
     elastic_frame_sec_points=7,
@@ -50,6 +72,7 @@ POST_ARGS = SimpleNamespace(
     link_tags=None,
     shell_tags=None,
     fiber_ele_tags=None,
+    fiber_points=None,
     plane_tags=None,
     brick_tags=None,
     contact_tags=None,
@@ -73,6 +96,85 @@ class CreateODB:
             keep this parameter set to **False**.
             Enabling model updates unnecessarily can increase memory usage and slow down performance.
             If some nodes or elements are deleted during the analysis, you should set this parameter to `True`.
+    save_every: int, default: None
+        If None, all response steps are kept in memory and written to the file by ``save_response``.
+        If an integer N is given, the response steps are written to the file in blocks of N steps
+        while the analysis is running, so that the memory usage stays flat for long analyses.
+
+        .. Note::
+            The streaming mode requires ``model_update=False``.
+            The file is created at the first block and appended afterwards,
+            ``save_response`` must still be called at the end to write the remaining steps and the model data.
+    storage: Union[bool, dict], default: None
+        The storage layout of the file, None or False means uncompressed
+        (Zarr stores are compressed by zstd by default).
+        If True, the responses are compressed losslessly by zlib with the shuffle filter
+        and chunked time-major, i.e., each chunk holds a block of steps of all nodes or elements.
+        A dict may change the options:
+
+        * compressor: str, default: "zlib"
+            One of "zlib", "zstd", "bzip2", "szip", "blosc_lz", "blosc_lz4", "blosc_lz4hc",
+            "blosc_zlib" and "blosc_zstd".
+        * complevel: int, default: 4
+            The compression level.
+        * shuffle: bool, default: True
+            Whether to apply the byte shuffle filter.
+            For Zarr stores, it only applies to the blosc compressors.
+        * chunk_bytes: int, default: 1048576
+            The target size in bytes of each chunk.
+        * dtype: Union[str, dict], default: None
+            The data type of the floating-point responses, e.g., "float32",
+            or a dict with response names as keys, e.g., ``{"disp": "float32"}``.
+        * significant_digits: Union[int, dict], default: None
+            The number of significant digits kept by quantization,
+            or a dict with response names as keys.
+
+        .. Note::
+            ``dtype`` and ``significant_digits`` are lossy and not applied by default.
+            ``significant_digits``, "bzip2" and "szip" are not supported by Zarr stores.
+    record_policy: dict, default: None
+        At which steps fetched by ``fetch_response_step`` the responses are recorded, None means all steps.
+        A step is recorded only if all the given conditions hold:
+
+        * every: int, default: 1
+            At least ``every`` fetched steps since the last recorded step, i.e., a stride.
+        * min_interval: float, default: 0.0
+            At least ``min_interval`` of analysis time since the last recorded step.
+        * tol: float, default: None
+            The trigger value has changed by more than ``tol`` since the last recorded step.
+        * peak: bool, default: False
+            The absolute trigger value exceeds that of all recorded steps, i.e., only new peaks are recorded.
+        * trigger: callable, default: None
+            A function without arguments that returns a scalar for ``tol`` and ``peak``,
+            if None, the maximum absolute nodal displacement of the saved nodes.
+
+        Each response type can have its own policy, given by one of the keys
+        "nodal", "frame", "fibersec", "truss", "link", "shell", "plane", "brick", "contact" and "sensitivity",
+        e.g., ``{"every": 2, "fibersec": {"every": 50}}`` records the fiber sections every 50 steps
+        and the other responses every 2 steps.
+        The initial state at time 0 is always recorded.
+
+        .. Note::
+            If ``model_update=True``, the responses types cannot have their own policies,
+            since the model info is recorded at the same steps as the responses.
+    envelope: Union[bool, list], default: False
+        Whether to update running statistics of the responses at each recorded step,
+        True for all response types, or a list of the response types in ``record_policy``, e.g., ``["nodal"]``.
+        The statistics of each entry (e.g., each node and DOF) are
+        ``max``, ``min``, ``absMax``, ``rms``, and the times of the peaks ``maxTime``, ``minTime``, ``absMaxTime``,
+        saved along a ``stats`` dimension in the group ``/Envelope/{group of the response type}``,
+        and read by ``get_nodal_responses(..., envelope=True)`` or ``get_element_responses(..., envelope=True)``.
+        The peak steps and the colour limits of the response plots in ``opstool.vis`` are read from it.
+    save_history: bool, default: True
+        Whether to save the full histories of the response types with ``envelope``.
+        If False, only their envelopes are saved, and the memory does not grow with the number of steps.
+        The response plots in ``opstool.vis`` then show the maximum and the minimum of the envelope as two steps.
+
+    .. Note::
+        The file format is set by :func:`opstool.post.set_odb_format`, netCDF by default.
+        A Zarr store (``RespStepData-{odb_tag}.zarr``) together with ``save_every``
+        writes each block of steps as new chunks,
+        and the responses can be read, e.g., by :func:`get_nodal_responses`, while the analysis is still running.
     kwargs: Other post-processing parameters, optional:
         * elastic_frame_sec_points: int, default: 7
             The number of elastic frame elements section points.
@@ -121,6 +223,11 @@ class CreateODB:
                 Element tags that contain fiber sections to be saved.
                 If "all", save all fiber section elements responses.
                 If None, save nothing.
+            * fiber_points: Union[str, list, tuple], default: None
+                Fibers of each section to be saved for ``fiber_ele_tags``.
+                If None or "all", save all fibers.
+                If "extreme", save only the outermost fibers, i.e., at the minimum or maximum y or z coordinates.
+                If a list of material tags, save only the fibers made of these materials, e.g., the rebars.
             * plane_tags: Union[list, tuple, int], default: None
                 Plane element tags to be saved.
                 If None, save all plane elements' responses.
@@ -142,10 +249,17 @@ class CreateODB:
             self,
             odb_tag: Union[int, str] = 1,
             model_update: bool = False,
+            save_every: int | None = None,
+            storage: bool | dict | None = None,
+            record_policy: dict | None = None,
+            envelope: Union[bool, list] = False,
+            save_history: bool = True,
             **kwargs
     ):
         self._odb_tag = odb_tag
         self._model_update = model_update
+        self._odb_format = CONSTANTS.get_odb_format()
+        self._odb_dir = CONSTANTS.get_output_dir()
 
         for key, value in kwargs.items():
             if key not in list(vars(POST_ARGS).keys()):
@@ -170,6 +284,7 @@ class CreateODB:
         self._link_tags = POST_ARGS.link_tags
         self._shell_tags = POST_ARGS.shell_tags
         self._fiber_ele_tags = POST_ARGS.fiber_ele_tags
+        self._fiber_points = POST_ARGS.fiber_points
         self._plane_tags = POST_ARGS.plane_tags
         self._brick_tags = POST_ARGS.brick_tags
         self._contact_tags = POST_ARGS.contact_tags
@@ -200,6 +315,30 @@ class CreateODB:
         if self._sensitivity_para_tags is not None:
             self._sensitivity_para_tags = [int(tag) for tag in np.atleast_1d(self._sensitivity_para_tags)]
 
+        self._save_every = save_every
+        if self._save_every is not None:
+            self._save_every = int(self._save_every)
+            if self._save_every < 1:
+                raise ValueError("save_every must be a positive integer!")
+            if self._model_update:
+                raise ValueError("save_every is not supported when model_update=True!")
+        self._storage = check_storage(storage)
+        resp_types = [key for key in RESP_GROUPS if key != "solid"]
+        self._record_policy = RecordPolicy(record_policy, resp_types)
+        if self._model_update and not self._record_policy.uniform:
+            raise ValueError("Response types cannot have their own record policies when model_update=True!")
+        if envelope is True:
+            envelope = resp_types
+        elif envelope is False or envelope is None:
+            envelope = []
+        for key in envelope:
+            if key not in resp_types:
+                raise ValueError(f"Incorrect envelope response type {key}, should be one of {resp_types}!")
+        self._envelope = list(envelope)
+        self._save_history = save_history
+        self._writer = None
+        self._num_steps_in_memory = 0
+
         self._ModelInfo = None
         self._NodalResp = None
         self._FrameResp = None
@@ -211,6 +350,10 @@ class CreateODB:
         self._BrickResp = None
         self._ContactResp = None
         self._SensitivityResp = None
+        # element geometry shared by the element extractors, valid for one version of the model info
+        self._geo_cache = EleGeometryCache()
+        # domain data of the current step shared by all extractors, emptied at each fetched step
+        self._snapshot = StepSnapshot()
 
         self._initialize()
 
@@ -222,8 +365,35 @@ class CreateODB:
         ]
         return output
 
+    def _get_resp_dict(self):
+        """key: response type in ``RESP_GROUPS``, value: response data object."""
+        output = {
+            "nodal": self._NodalResp, "frame": self._FrameResp, "truss": self._TrussResp,
+            "link": self._LinkResp, "shell": self._ShellResp, "fibersec": self._FiberSecResp,
+            "plane": self._PlaneResp, "brick": self._BrickResp, "contact": self._ContactResp,
+            "sensitivity": self._SensitivityResp,
+        }
+        return output
+
+    def _attach_snapshot(self):
+        for resp in self._get_resp():
+            if resp is not None:
+                resp.snapshot = self._snapshot
+
+    def _enable_envelopes(self):
+        for key, resp in self._get_resp_dict().items():
+            if resp is not None and key in self._envelope:
+                resp.enable_envelope(keep_history=self._save_history)
+
+    def _save_envelopes(self, dt: xr.DataTree):
+        for key, resp in self._get_resp_dict().items():
+            if resp is not None:
+                resp.save_envelope(dt, RESP_GROUPS[key])
+
     def _initialize(self):
+        self._snapshot.clear()
         self._ModelInfo = ModelInfoStepData(model_update=self._model_update)
+        self._geo_cache.update(self._ModelInfo.version)
         if self._node_tags is not None:
             node_tags = self._node_tags
         else:
@@ -240,7 +410,8 @@ class CreateODB:
             self._FrameResp = FrameRespStepData(
                 frame_tags,
                 frame_load_data,
-                elastic_frame_sec_points=POST_ARGS.elastic_frame_sec_points
+                elastic_frame_sec_points=POST_ARGS.elastic_frame_sec_points,
+                geo_cache=self._geo_cache,
             )
         # -----------------------------------------------------------------
         if self._truss_tags is not None:
@@ -248,31 +419,31 @@ class CreateODB:
         else:
             truss_tags = self._ModelInfo.get_current_truss_tags()
         if len(truss_tags) > 0 and self._save_truss_resp:
-            self._TrussResp = TrussRespStepData(truss_tags)
+            self._TrussResp = TrussRespStepData(truss_tags, geo_cache=self._geo_cache)
         # -----------------------------------------------------------------
         if self._link_tags is not None:
             link_tags = self._link_tags
         else:
             link_tags = self._ModelInfo.get_current_link_tags()
         if len(link_tags) > 0 and self._save_link_resp:
-            self._LinkResp = LinkRespStepData(link_tags)
+            self._LinkResp = LinkRespStepData(link_tags, geo_cache=self._geo_cache)
         # -----------------------------------------------------------------
         if self._shell_tags is not None:
             shell_tags = self._shell_tags
         else:
             shell_tags = self._ModelInfo.get_current_shell_tags()
         if len(shell_tags) > 0 and self._save_shell_resp:
-            self._ShellResp = ShellRespStepData(shell_tags)
+            self._ShellResp = ShellRespStepData(shell_tags, geo_cache=self._geo_cache)
         # -----------------------------------------------------------------
         if self._fiber_ele_tags is not None and self._save_fiber_sec_resp:
-            self._FiberSecResp = FiberSecRespStepData(self._fiber_ele_tags)
+            self._FiberSecResp = FiberSecRespStepData(self._fiber_ele_tags, fiber_points=self._fiber_points)
         # -----------------------------------------------------------------
         if self._plane_tags is not None:
             plane_tags = self._plane_tags
         else:
             plane_tags = self._ModelInfo.get_current_plane_tags()
         if len(plane_tags) > 0 and self._save_plane_resp:
-            self._PlaneResp = PlaneRespStepData(plane_tags)
+            self._PlaneResp = PlaneRespStepData(plane_tags, geo_cache=self._geo_cache)
         # -----------------------------------------------------------------
         if self._brick_tags is not None:
             brick_tags = self._brick_tags
@@ -282,6 +453,7 @@ class CreateODB:
             self._BrickResp = BrickRespStepData(
                 brick_tags,
                 compute_measures=POST_ARGS.compute_mechanical_measures,
+                geo_cache=self._geo_cache,
             )
         # -----------------------------------------------------------------
         if self._contact_tags is not None:
@@ -289,38 +461,81 @@ class CreateODB:
         else:
             contact_tags = self._ModelInfo.get_current_contact_tags()
         if len(contact_tags) > 0 and self._save_contact_resp:
-            self._ContactResp = ContactRespStepData(contact_tags)
+            self._ContactResp = ContactRespStepData(contact_tags, geo_cache=self._geo_cache)
         # ------------------------------------------------------------------
         if self._sensitivity_para_tags is not None:
             sens_para_tags = self._sensitivity_para_tags
         else:
-            sens_para_tags = ops.getParamTags()
+            sens_para_tags = self._snapshot.param_tags
         if len(node_tags) > 0 and len(sens_para_tags) > 0 and self._save_sensitivity_resp:
             self._SensitivityResp = SensitivityRespStepData(
                 node_tags=node_tags, ele_tags=None, sens_para_tags=sens_para_tags
             )
+        # ------------------------------------------------------------------
+        self._attach_snapshot()
+        self._enable_envelopes()
+        self._record_policy.reset(self._get_max_abs_disp)
+        self._init_writer()
+
+    def _get_filename(self):
+        return f"{self._odb_dir}/" + f"{RESP_FILE_NAME}-{self._odb_tag}.{self._odb_format}"
+
+    def _init_writer(self):
+        if self._save_every is not None:
+            self._writer = get_step_writer(self._get_filename(), storage=self._storage)
+        self._num_steps_in_memory = 1
+
+    def _flush_steps(self):
+        """Write the response steps in memory to the file and release them, the model info is kept."""
+        dt = xr.DataTree(name=f"{RESP_FILE_NAME}")
+        for resp in self._get_resp()[1:]:
+            if resp is not None and len(resp.times) > 0:
+                resp.save_file(dt)
+                resp.clear_steps()
+        self._writer.append(dt)
+        self._num_steps_in_memory = 0
 
     def reset(self):
         """Reset the ODB model.
         """
-        for resp in self._get_resp():
+        self._snapshot.clear()
+        self._ModelInfo.reset()
+        self._geo_cache.update(self._ModelInfo.version)
+        for resp in self._get_resp()[1:]:
             if resp is not None:
                 resp.reset()
+        self._enable_envelopes()
+        self._record_policy.reset(self._get_max_abs_disp)
+        self._init_writer()
 
-    def fetch_response_step(self, print_info: bool = False):
+    def _get_max_abs_disp(self):
+        """The default trigger of the record policies."""
+        node_tags = self._node_tags if self._node_tags is not None else self._snapshot.node_tags
+        return get_max_abs_disp(node_tags, self._snapshot.get_node_disp)
+
+    def fetch_response_step(self, print_info: bool = False, model_changed: bool = False):
         """Extract response data for the current analysis step.
 
         Parameters
         ------------
         print_info: bool, optional
             print information, by default, False
+        model_changed: bool, default: False
+            Only used if ``model_update=True``, whose model data is rebuilt when the node, element,
+            fixed or constrained node tags or the loads change.
+            Set True at the first step after other changes of the model, e.g., nodes moved by ``ops.setNodeCoord``,
+            which are not detected otherwise.
         """
-        self._ModelInfo.add_data_one_step()
+        self._snapshot.clear()
+        records = self._record_policy.check(self._snapshot.time, self._get_max_abs_disp)
+        record = any(records.values())
+        self._ModelInfo.add_data_one_step(record=record, model_changed=model_changed)
+        self._geo_cache.update(self._ModelInfo.version)
         if self._node_tags is not None:
             node_tags = self._node_tags
         else:
             node_tags = self._ModelInfo.get_current_node_tags()
-        if len(node_tags) > 0 and self._save_nodal_resp:
+        if len(node_tags) > 0 and self._save_nodal_resp and records["nodal"]:
             self._NodalResp.add_data_one_step(node_tags)
         # -----------------------------------------------------------------
         if self._frame_tags is not None:
@@ -328,31 +543,31 @@ class CreateODB:
         else:
             frame_tags = self._ModelInfo.get_current_frame_tags()
         frame_load_data = self._ModelInfo.get_current_frame_load_data()
-        if len(frame_tags) > 0 and self._save_frame_resp:
+        if len(frame_tags) > 0 and self._save_frame_resp and records["frame"]:
             self._FrameResp.add_data_one_step(frame_tags, frame_load_data)
         # -----------------------------------------------------------------
         if self._truss_tags is not None:
             truss_tags = self._truss_tags
         else:
             truss_tags = self._ModelInfo.get_current_truss_tags()
-        if len(truss_tags) > 0 and self._save_truss_resp:
+        if len(truss_tags) > 0 and self._save_truss_resp and records["truss"]:
             self._TrussResp.add_data_one_step(truss_tags)
         # -----------------------------------------------------------------
         if self._link_tags is not None:
             link_tags = self._link_tags
         else:
             link_tags = self._ModelInfo.get_current_link_tags()
-        if len(link_tags) > 0 and self._save_link_resp:
+        if len(link_tags) > 0 and self._save_link_resp and records["link"]:
             self._LinkResp.add_data_one_step(link_tags)
         # -----------------------------------------------------------------
         if self._shell_tags is not None:
             shell_tags = self._shell_tags
         else:
             shell_tags = self._ModelInfo.get_current_shell_tags()
-        if len(shell_tags) > 0 and self._save_shell_resp:
+        if len(shell_tags) > 0 and self._save_shell_resp and records["shell"]:
             self._ShellResp.add_data_one_step(shell_tags)
         # -----------------------------------------------------------------
-        if self._fiber_ele_tags is not None and self._save_fiber_sec_resp:
+        if self._fiber_ele_tags is not None and self._save_fiber_sec_resp and records["fibersec"]:
             self._FiberSecResp.add_data_one_step()
         # -----------------------------------------------------------------
         if self._plane_tags is not None:
@@ -360,81 +575,93 @@ class CreateODB:
         else:
             plane_tags = self._ModelInfo.get_current_plane_tags()
         # -----------------------------------------------------------------
-        if len(plane_tags) > 0 and self._save_plane_resp:
+        if len(plane_tags) > 0 and self._save_plane_resp and records["plane"]:
             self._PlaneResp.add_data_one_step(plane_tags)
         # -----------------------------------------------------------------
         if self._brick_tags is not None:
             brick_tags = self._brick_tags
         else:
             brick_tags = self._ModelInfo.get_current_brick_tags()
-        if len(brick_tags) > 0 and self._save_brick_resp:
+        if len(brick_tags) > 0 and self._save_brick_resp and records["brick"]:
             self._BrickResp.add_data_one_step(brick_tags)
         # -----------------------------------------------------------------
         if self._contact_tags is not None:
             contact_tags = self._contact_tags
         else:
             contact_tags = self._ModelInfo.get_current_contact_tags()
-        if len(contact_tags) > 0 and self._save_contact_resp:
+        if len(contact_tags) > 0 and self._save_contact_resp and records["contact"]:
             self._ContactResp.add_data_one_step(contact_tags)
         # -------------------------------------------------------------------
         if self._sensitivity_para_tags is not None:
             sens_para_tags = self._sensitivity_para_tags
         else:
-            sens_para_tags = ops.getParamTags()
-        if len(node_tags) > 0 and len(sens_para_tags) > 0 and self._save_sensitivity_resp:
+            sens_para_tags = self._snapshot.param_tags
+        if (
+                len(node_tags) > 0 and len(sens_para_tags) > 0
+                and self._save_sensitivity_resp and records["sensitivity"]
+        ):
             self._SensitivityResp.add_data_one_step(node_tags=node_tags, sens_para_tags=sens_para_tags)
 
+        # only the recorded steps fill the blocks written in the streaming mode
+        if record:
+            self._num_steps_in_memory += 1
+        if self._writer is not None and self._num_steps_in_memory >= self._save_every:
+            self._flush_steps()
+
         if print_info:
-            time = ops.getTime()
+            time = self._snapshot.time
             color = get_random_color()
             CONSOLE.print(
                 f"{PKG_PREFIX} The responses data at time [bold {color}]{time:.4f}[/] has been fetched!"
             )
 
-    def save_response(self, zlib: bool = False):
+    def save_response(self, zlib: bool = False, telemetry: xr.Dataset = None):
         """
-        Save all response data to a file name ``RespStepData-{odb_tag}.nc``.
+        Save all response data to a file name ``RespStepData-{odb_tag}.nc``,
+        or ``RespStepData-{odb_tag}.zarr`` if set by :func:`opstool.post.set_odb_format`.
 
         Parameters
         -----------
         zlib: bool, optional, default: False
-            If True, the data is saved compressed,
+            If True, the data is saved compressed losslessly with the default ``storage`` options,
             which is useful when your result files are expected to be large,
             especially if model updating is turned on.
+            It has no effect if ``storage`` is given to ``CreateODB``.
+            In the streaming mode (``save_every`` is given), the steps are already on disk
+            and only the ``storage`` given to ``CreateODB`` applies.
+        telemetry: xr.Dataset, optional, default: None
+            The log of the solver returned by ``SmartAnalyze.get_telemetry()``,
+            saved in the group ``/SolverTelemetry`` and read by :func:`get_solver_telemetry`.
         """
-        filename = f"{RESULTS_DIR}/" + f"{RESP_FILE_NAME}-{self._odb_tag}.nc"
-        with xr.DataTree(name=f"{RESP_FILE_NAME}") as dt:
-            for resp in self._get_resp():
-                if resp is not None:
-                    resp.save_file(dt)
-
-            if zlib:
-                encoding = {}
-                for path, node in dt.items():
-                    if path == "ModelInfo":
-                        for key, value in node.items():
-                            encoding[f"/{path}/{key}"] = {
-                                key: {
-                                    "_FillValue": -9999,
-                                    "zlib": True,
-                                    "complevel": 5,
-                                    "dtype": "float32"
-                                }
-                            }
-                    else:
-                        for key, value in node.items():
-                            encoding[f"/{path}"] = {
-                                key: {
-                                    "_FillValue": -9999,
-                                    "zlib": True,
-                                    "complevel": 5,
-                                    "dtype": "float32"
-                                }
-                            }
-            else:
-                encoding = None
-
-            dt.to_netcdf(filename, mode="w", engine="netcdf4", encoding=encoding)
+        filename = self._get_filename()
+        if self._writer is not None:
+            if self._num_steps_in_memory > 0:
+                self._flush_steps()
+            with xr.DataTree(name=f"{RESP_FILE_NAME}") as dt:
+                self._ModelInfo.save_file(dt)
+                self._save_envelopes(dt)
+                if telemetry is not None:
+                    dt["SolverTelemetry"] = xr.DataTree(telemetry)
+                self._writer.append(dt)
+        else:
+            with xr.DataTree(name=f"{RESP_FILE_NAME}") as dt:
+                for resp in self._get_resp():
+                    if resp is not None:
+                        resp.save_file(dt)
+                self._save_envelopes(dt)
+                if telemetry is not None:
+                    dt["SolverTelemetry"] = xr.DataTree(telemetry)
+
+                storage = self._storage
+                if storage is None and zlib:
+                    storage = check_storage(True)
+                if storage is not None:
+                    engine = "zarr" if is_zarr_store(filename) else "netcdf4"
+                    encoding = get_storage_encoding(dt, storage, engine=engine)
+                else:
+                    encoding = None
+
+                write_odb_tree(dt, filename, encoding=encoding)
 
         color = get_random_color()
         CONSOLE.print(
@@ -475,39 +702,100 @@ def loadODB(obd_tag, resp_type: str = "Nodal"):
     --------
     Relevant to a response type.
     """
-    filename = f"{RESULTS_DIR}/" + f"{RESP_FILE_NAME}-{obd_tag}.nc"
-    with xr.open_datatree(filename, engine="netcdf4").load() as dt:
-        color = get_random_color()
-        CONSOLE.print(
-            f"{PKG_PREFIX} Loading response data from [bold {color}]{filename}[/] ..."
-        )
-        model_info_steps, model_update = ModelInfoStepData.read_file(dt)
-        if resp_type.lower() == "nodal":
-            resp_step = NodalRespStepData.read_file(dt)
-        elif resp_type.lower() == "frame":
-            resp_step = FrameRespStepData.read_file(dt)
-        elif resp_type.lower() == "fibersec":
-            resp_step = FiberSecRespStepData.read_file(dt)
-        elif resp_type.lower() == "truss":
-            resp_step = TrussRespStepData.read_file(dt)
-        elif resp_type.lower() == "link":
-            resp_step = LinkRespStepData.read_file(dt)
-        elif resp_type.lower() == "shell":
-            resp_step = ShellRespStepData.read_file(dt)
-        elif resp_type.lower() == "plane":
-            resp_step = PlaneRespStepData.read_file(dt)
-        elif resp_type.lower() in ["brick", "solid"]:
-            resp_step = BrickRespStepData.read_file(dt)
-        elif resp_type.lower() == "contact":
-            resp_step = ContactRespStepData.read_file(dt)
-        elif resp_type.lower() == "sensitivity":
-            resp_step = SensitivityRespStepData.read_file(dt)
-        else:
-            raise ValueError(f"Unsupported response type {resp_type}!")
+    filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{obd_tag}")
+    if resp_type.lower() not in RESP_GROUPS:
+        raise ValueError(f"Unsupported response type {resp_type}!")
+    name = RESP_GROUPS[resp_type.lower()].strip("/")
+    dt = open_odb_groups(filename, ["/ModelInfo", name]).compute()
+    color = get_random_color()
+    CONSOLE.print(
+        f"{PKG_PREFIX} Loading response data from [bold {color}]{filename}[/] ..."
+    )
+    model_info_steps, model_update = ModelInfoStepData.read_file(dt)
+    envelope_steps = name in dt.children and len(dt[name].data_vars) == 0
+    if envelope_steps:
+        envelope = loadEnvelope(obd_tag, resp_type=resp_type)
+        envelope_steps = envelope is not None
+    if envelope_steps:
+        # only the envelope is saved, see CreateODB(save_history=False),
+        # whose maximum and minimum are the steps on the initial model
+        dt[name] = xr.DataTree(_get_envelope_steps(envelope, dt[name].attrs))
+        model_update = False
+    if resp_type.lower() == "nodal":
+        resp_step = NodalRespStepData.read_file(dt)
+    elif resp_type.lower() == "frame":
+        resp_step = FrameRespStepData.read_file(dt)
+    elif resp_type.lower() == "fibersec":
+        resp_step = FiberSecRespStepData.read_file(dt)
+    elif resp_type.lower() == "truss":
+        resp_step = TrussRespStepData.read_file(dt)
+    elif resp_type.lower() == "link":
+        resp_step = LinkRespStepData.read_file(dt)
+    elif resp_type.lower() == "shell":
+        resp_step = ShellRespStepData.read_file(dt)
+    elif resp_type.lower() == "plane":
+        resp_step = PlaneRespStepData.read_file(dt)
+    elif resp_type.lower() in ["brick", "solid"]:
+        resp_step = BrickRespStepData.read_file(dt)
+    elif resp_type.lower() == "contact":
+        resp_step = ContactRespStepData.read_file(dt)
+    elif resp_type.lower() == "sensitivity":
+        resp_step = SensitivityRespStepData.read_file(dt)
+    else:
+        raise ValueError(f"Unsupported response type {resp_type}!")
+    if envelope_steps:
+        resp_step.attrs["envelopeStats"] = ["max", "min"]
 
     return model_info_steps, model_update, resp_step
 
 
+def loadEnvelope(odb_tag, resp_type: str = "Nodal"):
+    """Load the envelope of a response type saved by ``CreateODB(..., envelope=...)``.
+
+    Returns
+    --------
+    The statistics of the responses along the ``stats`` dimension, None if the envelope is not saved.
+    """
+    filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{odb_tag}")
+    if resp_type.lower() not in RESP_GROUPS:
+        raise ValueError(f"Unsupported response type {resp_type}!")
+    name = RESP_GROUPS[resp_type.lower()].strip("/")
+    dt = open_odb_groups(filename, ["/Envelope"])
+    if "Envelope" not in dt.children or name not in dt["Envelope"].children:
+        return None
+    return dt["Envelope"][name].to_dataset().compute()
+
+
+def _get_envelope_steps(envelope: xr.Dataset, attrs: dict) -> xr.Dataset:
+    """The maximum and the minimum of the envelope as two steps at the end time, in place of the histories."""
+    ds = envelope.sel(stats=["max", "min"]).rename(stats="time")
+    end_time = envelope.attrs.get("endTime", np.nan)
+    ds = ds.assign_coords(time=[end_time, end_time])
+    ds.attrs = dict(attrs)
+    return ds
+
+
+def close_odb(odb_tag: int | str | None = None):
+    """Close the files of an output database (ODB) kept open by the readers.
+
+    The readers, such as :func:`get_nodal_responses` and :func:`get_element_responses`,
+    keep the last opened files in a process-level cache,
+    so that repeated queries to the same ODB skip opening the file and parsing its metadata.
+    A file that is changed on disk is reopened automatically.
+
+    Parameters
+    ----------
+    odb_tag: Union[int, str], default: None
+        Tag of output databases (ODB) to be closed.
+        If None, close all files in the cache.
+    """
+    if odb_tag is None:
+        close_odb_file()
+    else:
+        close_odb_file(get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{odb_tag}"))
+        close_odb_file(get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{MODEL_FILE_NAME}-{odb_tag}"))
+
+
 def get_model_data(
         odb_tag: int = None,
         data_type: str = "Nodal",
@@ -550,13 +838,13 @@ def get_model_data(
     else:
         raise ValueError(f"Data type {data_type} not found.")
     if from_responses:
-        filename = f"{RESULTS_DIR}/" + f"{RESP_FILE_NAME}-{odb_tag}.nc"
-        with xr.open_datatree(filename, engine="netcdf4").load() as dt:
-            data = ModelInfoStepData.read_data(dt, data_type)
+        filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{odb_tag}")
+        dt = open_odb_groups(filename, ["/ModelInfo"])
+        data = ModelInfoStepData.read_data(dt, data_type).compute()
     else:
-        filename = f"{RESULTS_DIR}/" + f"{MODEL_FILE_NAME}-{odb_tag}.nc"
-        with xr.open_datatree(filename, engine="netcdf4").load() as dt:
-            data = dt["ModelInfo"][data_type][data_type]
+        filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{MODEL_FILE_NAME}-{odb_tag}")
+        dt = open_odb_groups(filename, ["/ModelInfo"])
+        data = dt["ModelInfo"][data_type][data_type].compute()
     color = get_random_color()
     CONSOLE.print(
         f"{PKG_PREFIX} Loading {data_type} data from [bold {color}]{filename}[/] ..."
@@ -569,6 +857,8 @@ def get_nodal_responses(
         resp_type: str = None,
         node_tags: Union[list, tuple, int] = None,
         print_info: bool = True,
+        lazy_load: bool = False,
+        envelope: bool = False,
 ) -> xr.Dataset:
     """Read nodal responses data from a file.
 
@@ -605,6 +895,16 @@ def get_nodal_responses(
 
     print_info: bool, default: True
         Whether to print information
+    lazy_load: bool, default: False
+        If False, only the selected data is read from the file into memory.
+        If True, the returned data is lazily indexed and is only read when it is accessed,
+        e.g., by ``.values`` or ``.load()``, so that further selections by time, tags or DOFs
+        are also pushed down to the file.
+        The file stays open in a process-level cache until it changes or :func:`close_odb` is called.
+    envelope: bool, default: False
+        If True, read the running statistics saved by ``CreateODB(..., envelope=...)`` instead of the histories,
+        i.e., the responses with a ``stats`` dimension
+        ("max", "min", "absMax", "rms", "maxTime", "minTime", "absMaxTime") instead of ``time``.
 
     Returns
     ---------
@@ -617,20 +917,25 @@ def get_nodal_responses(
         You can further index or process the data.
 
     """
-    filename = f"{RESULTS_DIR}/" + f"{RESP_FILE_NAME}-{odb_tag}.nc"
-    with xr.open_datatree(filename, engine="netcdf4").load() as dt:
-        if print_info:
-            color = get_random_color()
-            if resp_type is None:
-                CONSOLE.print(
-                    f"{PKG_PREFIX} Loading all response data from [bold {color}]{filename}[/] ..."
-                )
-            else:
-                CONSOLE.print(
-                    f"{PKG_PREFIX} Loading {resp_type} response data from [bold {color}]{filename}[/] ..."
-                )
+    filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{odb_tag}")
+    if envelope:
+        dt = _select_envelope(open_odb_groups(filename, ["/Envelope"]), RESP_GROUPS["nodal"])
+    else:
+        dt = open_odb_groups(filename, [RESP_GROUPS["nodal"]])
+    if print_info:
+        color = get_random_color()
+        if resp_type is None:
+            CONSOLE.print(
+                f"{PKG_PREFIX} Loading all response data from [bold {color}]{filename}[/] ..."
+            )
+        else:
+            CONSOLE.print(
+                f"{PKG_PREFIX} Loading {resp_type} response data from [bold {color}]{filename}[/] ..."
+            )
 
-        nodal_resp = NodalRespStepData.read_response(dt, resp_type=resp_type, node_tags=node_tags)
+    nodal_resp = NodalRespStepData.read_response(dt, resp_type=resp_type, node_tags=node_tags)
+    if not lazy_load:
+        nodal_resp = nodal_resp.compute()
     return nodal_resp
 
 
@@ -640,6 +945,8 @@ def get_element_responses(
         resp_type: str = None,
         ele_tags: Union[list, tuple, int] = None,
         print_info: bool = True,
+        lazy_load: bool = False,
+        envelope: bool = False,
 ) -> xr.Dataset:
     """Read nodal responses data from a file.
 
@@ -706,6 +1013,16 @@ def get_element_responses(
 
     print_info: bool, default: True
         Whether to print information.
+    lazy_load: bool, default: False
+        If False, only the selected data is read from the file into memory.
+        If True, the returned data is lazily indexed and is only read when it is accessed,
+        e.g., by ``.values`` or ``.load()``, so that further selections by time, tags or DOFs
+        are also pushed down to the file.
+        The file stays open in a process-level cache until it changes or :func:`close_odb` is called.
+    envelope: bool, default: False
+        If True, read the running statistics saved by ``CreateODB(..., envelope=...)`` instead of the histories,
+        i.e., the responses with a ``stats`` dimension
+        ("max", "min", "absMax", "rms", "maxTime", "minTime", "absMaxTime") instead of ``time``.
 
     Returns
     ---------
@@ -717,41 +1034,48 @@ def get_element_responses(
         dimension names and coordinates.
         You can further index or process the data.
     """
-    filename = f"{RESULTS_DIR}/" + f"{RESP_FILE_NAME}-{odb_tag}.nc"
-    with xr.open_datatree(filename, engine="netcdf4").load() as dt:
-        if print_info:
-            color = get_random_color()
-            if resp_type is None:
-                CONSOLE.print(
-                    f"{PKG_PREFIX} Loading {ele_type} response data from [bold {color}]{filename}[/] ..."
-                )
-            else:
-                CONSOLE.print(
-                    f"{PKG_PREFIX} Loading {ele_type} {resp_type} response data from [bold {color}]{filename}[/] ..."
-                )
-
-        if ele_type.lower() == "frame":
-            ele_resp = FrameRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
-        elif ele_type.lower() == "fibersection":
-            ele_resp = FiberSecRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
-        elif ele_type.lower() == "truss":
-            ele_resp = TrussRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
-        elif ele_type.lower() == "link":
-            ele_resp = LinkRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
-        elif ele_type.lower() == "shell":
-            ele_resp = ShellRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
-        elif ele_type.lower() == "plane":
-            ele_resp = PlaneRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
-        elif ele_type.lower() in ["brick", "solid"]:
-            ele_resp = BrickRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
-        elif ele_type.lower() == "contact":
-            ele_resp = ContactRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{odb_tag}")
+    ele_group = "fibersec" if ele_type.lower() == "fibersection" else ele_type.lower()
+    groups = [RESP_GROUPS[ele_group]] if ele_group in RESP_GROUPS else []
+    if envelope and len(groups) > 0:
+        dt = _select_envelope(open_odb_groups(filename, ["/Envelope"]), groups[0])
+    else:
+        dt = open_odb_groups(filename, groups)
+    if print_info:
+        color = get_random_color()
+        if resp_type is None:
+            CONSOLE.print(
+                f"{PKG_PREFIX} Loading {ele_type} response data from [bold {color}]{filename}[/] ..."
+            )
         else:
-            raise ValueError(
-                f"Unsupported element type {ele_type}, "
-                "must in [Frame, Truss, Link, Shell, Plane, Solid]!"
+            CONSOLE.print(
+                f"{PKG_PREFIX} Loading {ele_type} {resp_type} response data from [bold {color}]{filename}[/] ..."
             )
 
+    if ele_type.lower() == "frame":
+        ele_resp = FrameRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    elif ele_type.lower() == "fibersection":
+        ele_resp = FiberSecRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    elif ele_type.lower() == "truss":
+        ele_resp = TrussRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    elif ele_type.lower() == "link":
+        ele_resp = LinkRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    elif ele_type.lower() == "shell":
+        ele_resp = ShellRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    elif ele_type.lower() == "plane":
+        ele_resp = PlaneRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    elif ele_type.lower() in ["brick", "solid"]:
+        ele_resp = BrickRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    elif ele_type.lower() == "contact":
+        ele_resp = ContactRespStepData.read_response(dt, resp_type=resp_type, ele_tags=ele_tags)
+    else:
+        raise ValueError(
+            f"Unsupported element type {ele_type}, "
+            "must in [Frame, Truss, Link, Shell, Plane, Solid]!"
+        )
+    if not lazy_load:
+        ele_resp = ele_resp.compute()
+
     return ele_resp
 
 
@@ -759,6 +1083,7 @@ def get_sensitivity_responses(
         odb_tag: int,
         resp_type: str = None,
         print_info: bool = True,
+        lazy_load: bool = False,
 ) -> xr.Dataset:
     """Read sensitivity responses data from a file.
 
@@ -779,25 +1104,191 @@ def get_sensitivity_responses(
 
     print_info: bool, default: True
         Whether to print information.
+    lazy_load: bool, default: False
+        If False, only the selected data is read from the file into memory.
+        If True, the returned data is lazily indexed and is only read when it is accessed,
+        e.g., by ``.values`` or ``.load()``, so that further selections by time, tags or DOFs
+        are also pushed down to the file.
+        The file stays open in a process-level cache until it changes or :func:`close_odb` is called.
 
     Returns
     ---------
     SensResp: `xarray.Dataset <https://docs.xarray.dev/en/stable/generated/xarray.Dataset.html>`_
         Sensitivity responses' data.
     """
-    filename = f"{RESULTS_DIR}/" + f"{RESP_FILE_NAME}-{odb_tag}.nc"
-    with xr.open_datatree(filename, engine="netcdf4").load() as dt:
-        if print_info:
-            color = get_random_color()
-            if resp_type is None:
-                CONSOLE.print(
-                    f"{PKG_PREFIX} Loading response data from [bold {color}]{filename}[/] ..."
-                )
-            else:
-                CONSOLE.print(
-                    f"{PKG_PREFIX} Loading {resp_type} response data from [bold {color}]{filename}[/] ..."
-                )
+    filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{odb_tag}")
+    dt = open_odb_groups(filename, [RESP_GROUPS["sensitivity"]])
+    if print_info:
+        color = get_random_color()
+        if resp_type is None:
+            CONSOLE.print(
+                f"{PKG_PREFIX} Loading response data from [bold {color}]{filename}[/] ..."
+            )
+        else:
+            CONSOLE.print(
+                f"{PKG_PREFIX} Loading {resp_type} response data from [bold {color}]{filename}[/] ..."
+            )
+
+    resp = SensitivityRespStepData.read_response(dt, resp_type=resp_type)
+    if not lazy_load:
+        resp = resp.compute()
+
+    return resp
+
+
+def get_solver_telemetry(odb_tag: Union[int, str] = 1) -> xr.Dataset:
+    """Read the log of the solver saved by ``CreateODB.save_response(telemetry=...)``.
+
+    Parameters
+    ----------
+    odb_tag: Union[int, str], default: 1
+        Tag of output databases (ODB) to be read.
 
-        resp = SensitivityRespStepData.read_response(dt, resp_type=resp_type)
+    Returns
+    ---------
+    telemetry: xr.Dataset
+        See ``SmartAnalyze.get_telemetry``.
+    """
+    filename = get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{odb_tag}")
+    dt = open_odb_groups(filename, ["/SolverTelemetry"])
+    if "SolverTelemetry" not in dt:
+        raise ValueError(f"No solver telemetry is saved in {filename}!")
+    color = get_random_color()
+    CONSOLE.print(
+        f"{PKG_PREFIX} Loading solver telemetry from [bold {color}]{filename}[/] ..."
+    )
+    return dt["SolverTelemetry"].to_dataset().compute()
+
+
+def get_batch_responses(
+        odb_tags: Union[list, tuple, str],
+        ele_type: str = "Nodal",
+        resp_type: str | None = None,
+        tags: list | tuple | int | None = None,
+        reduce_func: Callable | None = None,
+        envelope: bool = False,
+        executor: str | None = None,
+        max_workers: int | None = None,
+        print_info: bool = True,
+) -> Union[xr.Dataset, xr.DataArray]:
+    """Read the responses of many output databases (ODB), e.g., the records of an IDA,
+    in parallel and stack them along a new ``case`` dimension.
 
+    Parameters
+    ------------
+    odb_tags: Union[list, tuple, str]
+        Tags of output databases (ODB) to be read, such as ``[1, 2, 3]``,
+        or a glob pattern of the tags, such as ``"ida-*"``, which matches ``RespStepData-ida-*.nc``.
+    ele_type: str, default: "Nodal"
+        "Nodal" for the nodal responses, otherwise an element type of :func:`get_element_responses`.
+    resp_type: str, default: None
+        The response type, see :func:`get_nodal_responses` and :func:`get_element_responses`.
+        If None, return all responses to that `ele_type`.
+    tags: Union[list, tuple, int], default: None
+        Node or element tags to be read. If None, return the responses of all nodes or elements.
+    reduce_func: Callable, default: None
+        A function applied to the responses of each case in the worker,
+        which returns an ``xarray.Dataset`` or ``xarray.DataArray``,
+        e.g., ``lambda ds: abs(ds["disp"]).max("time")`` for the peak displacements of each record,
+        which needs ``executor="thread"`` as a lambda cannot be sent to other processes.
+        Only the reduced data of each case is kept, so that the full histories of all cases never reside in memory.
+        If None, the histories are stacked, and cases with different times are aligned on the union of the times.
+    envelope: bool, default: False
+        If True, read the envelopes saved by ``CreateODB(..., envelope=...)`` instead of the histories.
+    executor: str, default: None
+        "thread" to read the cases in a thread pool,
+        or "process" to read them in a pool of new processes,
+        whose ``reduce_func`` must be picklable, i.e., defined at the module level rather than a lambda.
+        If None, "process" if any ODB is a netCDF file, otherwise "thread".
+        Threads only speed up Zarr stores and ``reduce_func``,
+        as the netCDF library is not thread-safe and netCDF files are read by one thread at a time.
+    max_workers: int, default: None
+        The maximum number of workers, if None, the default of ``concurrent.futures``.
+        If 1, the cases are read one by one in the current process.
+    print_info: bool, default: True
+        Whether to print information.
+
+    Returns
+    ---------
+    BatchResp: xarray.Dataset or xarray.DataArray
+        The responses or the outputs of ``reduce_func`` with a ``case`` dimension, whose coordinates are the ODB tags.
+    """
+    odb_tags = _get_batch_odb_tags(odb_tags)
+    if executor is None:
+        is_zarr = [is_zarr_store(_get_batch_filename(tag)) for tag in odb_tags]
+        executor = "thread" if all(is_zarr) else "process"
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Incorrect executor {executor}, should be one of ['thread', 'process']!")
+    if print_info:
+        color = get_random_color()
+        CONSOLE.print(
+            f"{PKG_PREFIX} Loading {ele_type} response data of [bold {color}]{len(odb_tags)}[/] ODBs ..."
+        )
+    args = [(tag, ele_type, resp_type, tags, reduce_func, envelope) for tag in odb_tags]
+    if max_workers == 1 or len(odb_tags) == 1:
+        outputs = [_read_batch_case(*arg) for arg in args]
+    else:
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            # new processes inherit no open files nor OpenSees domain, nor the output directory
+            pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=CONSTANTS.set_output_dir,
+                initargs=(CONSTANTS.get_output_dir(),),
+            )
+        with pool:
+            outputs = list(pool.map(_read_batch_case, *zip(*args)))
+    output = xr.concat(outputs, dim="case", join="outer")
+    return output.assign_coords(case=list(odb_tags))
+
+
+def _get_batch_odb_tags(odb_tags) -> list:
+    if not isinstance(odb_tags, str):
+        odb_tags = list(np.atleast_1d(odb_tags).tolist())
+        if len(odb_tags) == 0:
+            raise ValueError("odb_tags is empty!")
+        return odb_tags
+    if not glob.has_magic(odb_tags):
+        return [odb_tags]
+    prefix = f"{CONSTANTS.get_output_dir()}/{RESP_FILE_NAME}-"
+    output = set()
+    for ext in (".nc", ".zarr"):
+        for filename in glob.glob(f"{prefix}{odb_tags}{ext}"):
+            output.add(filename[len(prefix):-len(ext)])
+    if len(output) == 0:
+        raise ValueError(f"No ODB matches {odb_tags} in {CONSTANTS.get_output_dir()}!")
+    return sorted(output)
+
+
+def _get_batch_filename(odb_tag) -> str:
+    return get_odb_filename(f"{CONSTANTS.get_output_dir()}/" + f"{RESP_FILE_NAME}-{odb_tag}")
+
+
+def _read_batch_case(odb_tag, ele_type, resp_type, tags, reduce_func, envelope):
+    filename = _get_batch_filename(odb_tag)
+    # the cached netCDF files must not be closed by other threads while they are read
+    lock = nullcontext() if is_zarr_store(filename) else ODB_FILE_CACHE.lock
+    with lock:
+        if ele_type.lower() == "nodal":
+            resp = get_nodal_responses(
+                odb_tag, resp_type=resp_type, node_tags=tags, print_info=False, envelope=envelope
+            )
+        else:
+            resp = get_element_responses(
+                odb_tag, ele_type, resp_type=resp_type, ele_tags=tags, print_info=False, envelope=envelope
+            )
+    if reduce_func is not None:
+        resp = reduce_func(resp)
     return resp
+
+
+def _select_envelope(dt: xr.DataTree, group: str) -> xr.DataTree:
+    """A data tree with the envelope of a response group in place of the group."""
+    name = group.strip("/")
+    if "Envelope" not in dt.children or name not in dt["Envelope"].children:
+        raise ValueError(f"No envelope of {name} found, set envelope in CreateODB to save it!")
+    env_dt = xr.DataTree()
+    env_dt[name] = dt["Envelope"][name]
+    return env_dt
@@ -4,6 +4,7 @@ from .consts import CONSTANTS
 from ._util_funcs import add_ops_hints_file, print_version, check_file_type, suppress_ops_print
 from ._util_funcs import get_color_rich, get_cycle_color_rich, get_random_color
 from ._util_funcs import get_cycle_color, get_random_color_rich, gram_schmidt
+from ._util_funcs import HHMMSSMSColumn
 
 __all__ = [
     "load_ops_examples",
@@ -25,4 +26,5 @@ __all__ = [
     "get_random_color",
     "get_cycle_color",
     "get_random_color_rich",
+    "HHMMSSMSColumn",
 ]
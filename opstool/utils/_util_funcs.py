@@ -5,6 +5,8 @@ from pathlib import Path
 from typing import Union
 from itertools import cycle
 from contextlib import contextmanager
+from rich.console import RenderableType
+from rich.progress import ProgressColumn
 from .consts import CONSTANTS
 
 CONSOLE = CONSTANTS.get_console()
@@ -170,4 +172,17 @@ def suppress_ops_print():
     finally:
         # Restore the original stdout and stderr
         sys.stdout = stdout
-        sys.stderr = stderr
\ No newline at end of file
+        sys.stderr = stderr
+
+
+class HHMMSSMSColumn(ProgressColumn):
+    """A column of rich progress bars showing the elapsed time in hours, minutes, seconds and milliseconds."""
+
+    def render(self, task) -> RenderableType:
+        t = task.elapsed or 0.0
+        total_ms = int(t * 1000)
+        hours = total_ms // (3600 * 1000)
+        minutes = (total_ms // (60 * 1000)) % 60
+        seconds = (total_ms // 1000) % 60
+        millis = total_ms % 1000
+        return f"[#037ef3]{hours:02} h : [#f85a40]{minutes:02} m : [#00c16e]{seconds:02} s : [#7552cc]{millis:03} ms"
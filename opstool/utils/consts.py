@@ -13,6 +13,8 @@ class CONSTANTS:
     MODEL_FILE_NAME = "ModelData"
     EIGEN_FILE_NAME = "EigenData"
     RESP_FILE_NAME = "RespStepData"
+    # file format of the output databases, "nc" (netCDF) or "zarr"
+    ODB_FORMAT = "nc"
 
     # shape dict used to subplots
     SHAPE_MAP = {
@@ -92,6 +94,17 @@ class CONSTANTS:
     def get_output_dir(cls):
         return cls.RESULTS_DIR
 
+    @classmethod
+    def set_odb_format(cls, odb_format: str):
+        odb_format = odb_format.lower().lstrip(".")
+        if odb_format not in ["nc", "zarr"]:
+            raise ValueError("odb_format must be one of ['nc', 'zarr']!")
+        cls.ODB_FORMAT = odb_format
+
+    @classmethod
+    def get_odb_format(cls):
+        return cls.ODB_FORMAT
+
     @classmethod
     def get_pkg_prefix(cls):
         return cls.PKG_PREFIX
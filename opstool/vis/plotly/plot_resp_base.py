@@ -30,6 +30,7 @@ class PlotResponseBase:
         self.resp_step = None  # response data
         self.resp_type = None
         self.component = None  # component to be visualized
+        self.envelope = None  # the envelope saved in the ODB, see set_envelope
 
         # ----------------------------------------
         self.FIGURE = go.Figure()
@@ -89,3 +90,59 @@ class PlotResponseBase:
             return da.loc[:, component]
         elif da.ndim == 3:
             return da.loc[:, :, component]
+
+    def set_envelope(self, envelope: xr.Dataset | None):
+        """Read the peaks from the envelope saved by ``CreateODB(..., envelope=...)`` instead of scanning the steps.
+        It is ignored if the steps are the envelope itself, i.e., the histories are not saved.
+        """
+        if "envelopeStats" in self.RespSteps.attrs:
+            envelope = None
+        self.envelope = envelope
+
+    def _get_envelope_stats(self, resp_type, component=None, tags=None, factor=None):
+        """The statistics of the entries of a response, selected as in ``_get_resp_data`` and multiplied by ``factor``,
+        None if there is no envelope of the response.
+        """
+        if self.envelope is None or resp_type not in self.envelope:
+            return None
+        da = self.envelope[resp_type]
+        if tags is not None:
+            da = da.sel({da.dims[1]: np.atleast_1d(tags)})
+        if da.ndim > 2 and component is not None:
+            da = da.sel({da.dims[-1]: component})
+        keys = ("max", "min", "absMax", "maxTime", "minTime", "absMaxTime")
+        stats = {key: da.sel(stats=key).to_numpy() for key in keys}
+        if factor is not None:
+            # a negative factor swaps the maximum and the minimum
+            factor = np.broadcast_to(factor, stats["max"].shape)
+            swap = factor < 0
+            for key, other in (("max", "min"), ("maxTime", "minTime")):
+                stats[key], stats[other] = (
+                    np.where(swap, stats[other], stats[key]),
+                    np.where(swap, stats[key], stats[other]),
+                )
+            stats["max"], stats["min"] = stats["max"] * factor, stats["min"] * factor
+            stats["absMax"] = stats["absMax"] * np.abs(factor)
+        return stats
+
+    def _get_envelope_step(self, stats, idx="absMax"):
+        """The step of the peak ``idx`` of the statistics by ``_get_envelope_stats``,
+        None for "absMin", which is not kept in the envelope.
+        """
+        if not isinstance(idx, str):
+            return int(idx)
+        if idx.lower() == "absmax":
+            key = "absMax"
+            i = np.nanargmax(stats[key])
+        elif idx.lower() == "max":
+            key = "max"
+            i = np.nanargmax(stats[key])
+        elif idx.lower() == "min":
+            key = "min"
+            i = np.nanargmin(stats[key])
+        elif idx.lower() == "absmin":
+            return None
+        else:
+            raise ValueError("Invalid argument, one of [absMax, absMin, Max, Min]")
+        time = stats[f"{key}Time"].flat[i]
+        return int(np.argmin(np.abs(self.time - time)))
@@ -14,7 +14,7 @@ from .plot_utils import (
     _get_unstru_cells,
     _get_plotly_dim_scene
 )
-from ...post import loadODB
+from ...post import loadODB, loadEnvelope
 from ...utils import CONSTANTS
 PKG_NAME = CONSTANTS.get_pkg_name()
 
@@ -26,6 +26,7 @@ class PlotFrameResponse(PlotResponseBase):
         self.resp_factor = 1.0
         self.plot_axis = None
         self.sec_locs = None
+        self.ele_tags = None
 
     def _set_comp_resp_type(self, resp_type, component):
         if resp_type.lower() in ["localforces", "localforce"]:
@@ -220,9 +221,12 @@ class PlotFrameResponse(PlotResponseBase):
 
         self.resp_step = resps
         self.sec_locs = sec_locs
+        self.ele_tags = ele_tags
 
     def _get_resp_scale_factor(self, idx="absMax"):
-        if isinstance(idx, str):
+        stats = self._get_envelope_stats(self.resp_type, self.component, tags=self.ele_tags, factor=self.resp_factor)
+        step = None if stats is None else self._get_envelope_step(stats, idx)
+        if step is None and isinstance(idx, str):
             if idx.lower() == "absmax":
                 resp = [np.max(np.abs(data)) for data in self.resp_step]
                 step = np.argmax(resp)
@@ -237,7 +241,7 @@ class PlotFrameResponse(PlotResponseBase):
                 step = np.argmin(resp)
             else:
                 raise ValueError("Invalid argument, one of [absMax, absMin, Max, Min]")
-        else:
+        elif step is None:
             step = int(idx)
         resp = self.resp_step[step]
         maxv = np.amax(np.abs(resp))
@@ -245,7 +249,10 @@ class PlotFrameResponse(PlotResponseBase):
             alpha_ = 0.0
         else:
             alpha_ = self.max_bound_size * self.pargs.scale_factor / maxv
-        cmin, cmax = self._get_resp_clim()
+        if stats is not None:
+            cmin, cmax = np.nanmin(stats["min"]), np.nanmax(stats["max"])
+        else:
+            cmin, cmax = self._get_resp_clim()
         return float(alpha_), step, (cmin, cmax)
 
     def _get_resp_clim(self):
@@ -691,6 +698,7 @@ def plot_frame_responses(
         odb_tag, resp_type="Frame"
     )
     plotbase = PlotFrameResponse(model_info_steps, beam_resp_steps, model_update)
+    plotbase.set_envelope(loadEnvelope(odb_tag, resp_type="Frame"))
     if slides:
         plotbase.plot_slide(
             ele_tags=ele_tags,
@@ -778,6 +786,7 @@ def plot_frame_responses_animation(
         odb_tag, resp_type="Frame"
     )
     plotbase = PlotFrameResponse(model_info_steps, beam_resp_steps, model_update)
+    plotbase.set_envelope(loadEnvelope(odb_tag, resp_type="Frame"))
     plotbase.plot_anim(
         ele_tags=ele_tags,
         alpha=scale,
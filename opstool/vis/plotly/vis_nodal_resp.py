@@ -15,7 +15,7 @@ from .plot_utils import (
     _get_plotly_dim_scene
 )
 from .vis_model import _plot_bc, _plot_mp_constraint
-from ...post import loadODB
+from ...post import loadODB, loadEnvelope
 from ...utils import CONSTANTS
 PKG_NAME = CONSTANTS.get_pkg_name()
 
@@ -57,6 +57,14 @@ class PlotNodalResponse(PlotResponseBase):
             self.component = list(component)
 
     def _get_resp_clim_peak(self, idx="absMax"):
+        stats = self._get_envelope_stats(self.resp_type, self.component)
+        step = None if stats is None else self._get_envelope_step(stats, idx)
+        if step is not None:
+            if stats["max"].ndim == 1:
+                return np.nanmin(stats["min"]), np.nanmax(stats["max"]), step
+            # the norms of several components are bounded by the norms of their absolute maxima,
+            # and are zero at the initial step
+            return 0.0, np.nanmax(np.linalg.norm(stats["absMax"], axis=-1)), step
         resps = []
         resps_norm = []
         for i in range(self.num_steps):
@@ -93,11 +101,16 @@ class PlotNodalResponse(PlotResponseBase):
         return data
 
     def _get_defo_scale_factor(self):
-        scalars = []
-        for i in range(self.num_steps):
-            defo = self._get_deformation_data(i)
-            scalars.append(np.max(np.linalg.norm(defo, axis=1)))
-        maxv = np.max(scalars)
+        stats = self._get_envelope_stats("disp", ["UX", "UY", "UZ"])
+        if stats is not None:
+            # bounded by the norms of the absolute maxima of the components
+            maxv = np.nanmax(np.linalg.norm(stats["absMax"], axis=-1))
+        else:
+            scalars = []
+            for i in range(self.num_steps):
+                defo = self._get_deformation_data(i)
+                scalars.append(np.max(np.linalg.norm(defo, axis=1)))
+            maxv = np.max(scalars)
         if maxv == 0:
             alpha_ = 0.0
         else:
@@ -609,6 +622,7 @@ def plot_nodal_responses(
         odb_tag, resp_type="Nodal"
     )
     plotbase = PlotNodalResponse(model_info_steps, node_resp_steps, model_update)
+    plotbase.set_envelope(loadEnvelope(odb_tag, resp_type="Nodal"))
     plotbase.set_comp_resp_type(resp_type=resp_type, component=resp_dof)
     if slides:
         plotbase.plot_slide(
@@ -694,6 +708,7 @@ def plot_nodal_responses_animation(
         odb_tag, resp_type="Nodal"
     )
     plotbase = PlotNodalResponse(model_info_steps, node_resp_steps, model_update)
+    plotbase.set_envelope(loadEnvelope(odb_tag, resp_type="Nodal"))
     plotbase.set_comp_resp_type(resp_type=resp_type, component=resp_dof)
     plotbase.plot_anim(
         alpha=scale,
@@ -13,7 +13,7 @@ from .plot_utils import (
     _get_line_cells,
     _get_unstru_cells,
 )
-from ...post import loadODB
+from ...post import loadODB, loadEnvelope
 
 
 class PlotFrameResponse(PlotResponseBase):
@@ -23,6 +23,7 @@ class PlotFrameResponse(PlotResponseBase):
         self.resp_factor = 1.0
         self.plot_axis = None
         self.sec_locs = None
+        self.ele_tags = None
 
     def _set_comp_resp_type(self, resp_type, component):
         if resp_type.lower() in ["localforces", "localforce"]:
@@ -213,9 +214,12 @@ class PlotFrameResponse(PlotResponseBase):
 
         self.resp_step = resps
         self.sec_locs = sec_locs
+        self.ele_tags = ele_tags
 
     def _get_resp_scale_factor(self, idx="absMax"):
-        if isinstance(idx, str):
+        stats = self._get_envelope_stats(self.resp_type, self.component, tags=self.ele_tags, factor=self.resp_factor)
+        step = None if stats is None else self._get_envelope_step(stats, idx)
+        if step is None and isinstance(idx, str):
             if idx.lower() == "absmax":
                 resp = [np.max(np.abs(data)) for data in self.resp_step]
                 step = np.argmax(resp)
@@ -230,7 +234,7 @@ class PlotFrameResponse(PlotResponseBase):
                 step = np.argmin(resp)
             else:
                 raise ValueError("Invalid argument, one of [absMax, absMin, Max, Min]")
-        else:
+        elif step is None:
             step = int(idx)
         resp = self.resp_step[step]
         maxv = np.amax(np.abs(resp))
@@ -238,7 +242,10 @@ class PlotFrameResponse(PlotResponseBase):
             alpha_ = 0.0
         else:
             alpha_ = self.max_bound_size * self.pargs.scale_factor / maxv
-        cmin, cmax = self._get_resp_clim()
+        if stats is not None:
+            cmin, cmax = np.nanmin(stats["min"]), np.nanmax(stats["max"])
+        else:
+            cmin, cmax = self._get_resp_clim()
         return float(alpha_), step, (cmin, cmax)
 
     def _get_resp_clim(self):
@@ -600,6 +607,7 @@ def plot_frame_responses(
         off_screen=PLOT_ARGS.off_screen,
     )
     plotbase = PlotFrameResponse(model_info_steps, beam_resp_steps, model_update)
+    plotbase.set_envelope(loadEnvelope(odb_tag, resp_type="Frame"))
     if slides:
         plotbase.plot_slide(
             plotter,
@@ -712,6 +720,7 @@ def plot_frame_responses_animation(
         off_screen=off_screen,
     )
     plotbase = PlotFrameResponse(model_info_steps, beam_resp_steps, model_update)
+    plotbase.set_envelope(loadEnvelope(odb_tag, resp_type="Frame"))
     plotbase.plot_anim(
         plotter,
         ele_tags=ele_tags,
@@ -13,7 +13,7 @@ from .plot_utils import (
     _get_line_cells,
     _get_unstru_cells,
 )
-from ...post import loadODB
+from ...post import loadODB, loadEnvelope
 from ...utils import gram_schmidt
 
 
@@ -21,6 +21,7 @@ class PlotTrussResponse(PlotResponseBase):
 
     def __init__(self, model_info_steps, truss_resp_step, model_update):
         super().__init__(model_info_steps, truss_resp_step, model_update)
+        self.ele_tags = None
 
     def _get_truss_data(self, step):
         return self._get_model_data("TrussData", step)
@@ -91,9 +92,12 @@ class PlotTrussResponse(PlotResponseBase):
                 da = self._get_resp_data(i, self.resp_type)
                 resps.append(da)
         self.resp_step = resps  # update
+        self.ele_tags = ele_tags
 
     def _get_resp_peak(self, idx="absMax"):
-        if isinstance(idx, str):
+        stats = self._get_envelope_stats(self.resp_type, tags=self.ele_tags)
+        step = None if stats is None else self._get_envelope_step(stats, idx)
+        if step is None and isinstance(idx, str):
             if idx.lower() == "absmax":
                 resp = [np.max(np.abs(data)) for data in self.resp_step]
                 step = np.argmax(resp)
@@ -108,7 +112,7 @@ class PlotTrussResponse(PlotResponseBase):
                 step = np.argmin(resp)
             else:
                 raise ValueError("Invalid argument, one of [absMax, absMin, Max, Min]")
-        else:
+        elif step is None:
             step = int(idx)
         resp = self.resp_step[step]
         maxv = np.amax(np.abs(resp))
@@ -116,7 +120,10 @@ class PlotTrussResponse(PlotResponseBase):
             alpha_ = 0.0
         else:
             alpha_ = self.max_bound_size * self.pargs.scale_factor / maxv
-        cmin, cmax = self._get_truss_resp_clim()
+        if stats is not None:
+            cmin, cmax = np.nanmin(stats["min"]), np.nanmax(stats["max"])
+        else:
+            cmin, cmax = self._get_truss_resp_clim()
         return step, (cmin, cmax), float(alpha_)
 
     def _get_truss_resp_clim(self):
@@ -409,6 +416,7 @@ def plot_truss_responses(
         off_screen=PLOT_ARGS.off_screen
     )
     plotbase = PlotTrussResponse(model_info_steps, truss_resp_step, model_update)
+    plotbase.set_envelope(loadEnvelope(odb_tag, resp_type="Truss"))
     plotbase.refactor_resp_step(resp_type=resp_type, ele_tags=ele_tags)
     if slides:
         plotbase.plot_slide(
@@ -500,6 +508,7 @@ def plot_truss_responses_animation(
         off_screen=off_screen
     )
     plotbase = PlotTrussResponse(model_info_steps, truss_resp_step, model_update)
+    plotbase.set_envelope(loadEnvelope(odb_tag, resp_type="Truss"))
     plotbase.refactor_resp_step(resp_type=resp_type, ele_tags=ele_tags)
     plotbase.plot_anim(
         plotter,
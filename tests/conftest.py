@@ -1,8 +1,25 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 # 将项目根目录添加到 sys.path
 project_root = Path(__file__).parent.parent.resolve()
 sys.path.insert(0, str(project_root))
 
-print(f"Added {project_root} to sys.path") # 添加打印语句方便调试
\ No newline at end of file
+print(f"Added {project_root} to sys.path") # 添加打印语句方便调试
+
+
+@pytest.fixture(autouse=True)
+def odb_path(tmp_path):
+    """Write the output databases of each test to its own temporary directory."""
+    import opstool as opst
+    from opstool.utils import CONSTANTS
+
+    # set the directory directly, since set_odb_path moves the files of the current directory
+    old_dir, old_format = CONSTANTS.get_output_dir(), CONSTANTS.get_odb_format()
+    CONSTANTS.set_output_dir(str(tmp_path / "odb"))
+    yield tmp_path / "odb"
+    opst.post.close_odb()
+    CONSTANTS.RESULTS_DIR = old_dir
+    CONSTANTS.set_odb_format(old_format)
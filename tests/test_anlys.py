@@ -0,0 +1,218 @@
+import os
+from functools import partial
+
+import numpy as np
+import openseespy.opensees as ops
+import pytest
+
+import opstool as opst
+
+
+def _run_truss(case, odb_tag):
+    if case == "raise":
+        raise ValueError("bad case")
+    if case == "crash":
+        os._exit(1)
+    ops.model("basic", "-ndm", 1, "-ndf", 1)
+    ops.node(1, 0.0)
+    ops.node(2, 1.0)
+    ops.fix(1, 1)
+    ops.uniaxialMaterial("Elastic", 1, 100.0)
+    ops.element("Truss", 1, 1, 2, 1.0, 1)
+    ops.timeSeries("Linear", 1)
+    ops.pattern("Plain", 1, 1)
+    ops.load(2, float(case))
+    ops.constraints("Plain")
+    ops.numberer("Plain")
+    ops.system("BandGeneral")
+    ops.algorithm("Linear")
+    ops.integrator("LoadControl", 1.0)
+    ops.analysis("Static")
+    ops.analyze(1)
+    return ops.nodeDisp(2, 1)
+
+
+def test_parallel_runner_isolates_failures():
+    cases = [1.0, "raise", 2.0, "crash", 3.0]
+    runner = opst.anlys.ParallelRunner(_run_truss, max_workers=2, odb_prefix="test-runner")
+    results = runner.run(cases, progress=False)
+    np.testing.assert_allclose([results[i] for i in (0, 2, 4)], [0.01, 0.02, 0.03])
+    assert results[1] is None and results[3] is None
+    assert "bad case" in runner.errors[1]
+    assert "crashed" in runner.errors[3]
+    summary = runner.get_summary()
+    assert summary["ok"].values.tolist() == [True, False, True, False, True]
+    assert summary["odbTag"].values[4] == "test-runner-4"
+
+
+def _get_odb_settings(case, odb_tag):
+    return opst.utils.CONSTANTS.get_output_dir(), opst.utils.CONSTANTS.get_odb_format()
+
+
+def test_parallel_runner_workers_inherit_odb_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(opst.utils.CONSTANTS, "RESULTS_DIR", str(tmp_path))
+    monkeypatch.setattr(opst.utils.CONSTANTS, "ODB_FORMAT", "zarr")
+    runner = opst.anlys.ParallelRunner(_get_odb_settings, max_workers=1)
+    assert runner.run([0], progress=False) == [(str(tmp_path), "zarr")]
+
+
+def _build_rect_section(fy):
+    ops.uniaxialMaterial("Steel01", 1, fy, 2.0e5, 0.01)
+    ops.section("Fiber", 1, "-GJ", 1.0e6)
+    ops.patch("rect", 1, 10, 10, -0.1, -0.1, 0.1, 0.1)
+    return 1
+
+
+def test_batch_moment_curvature_stacks_cases():
+    builders = {"S300": partial(_build_rect_section, 300.0), "S400": partial(_build_rect_section, 400.0)}
+    ds = opst.anlys.batch_moment_curvature(
+        builders,
+        axial_forces=[0.0, -2.0],
+        axes=["y", "z"],
+        max_phi=0.05,
+        incr_phi=1e-3,
+        limit_states={
+            "yield": {"matTag": 1, "threshold": 0.0015},
+            "ultimate": {"matTag": 1, "threshold": 0.02},
+        },
+        bilinear=("yield", "ultimate"),
+        max_workers=2,
+        progress=False,
+    )
+    assert dict(ds["phi"].sizes)["section"] == 2 and ds["limitState"].values.tolist() == ["yield", "ultimate"]
+    assert ds.attrs["errors"] == []
+    moment = ds["limitM"].sel(limitState="ultimate", axialForce=0.0)
+    # the plastic moment of the square section is fy * b^3 / 4
+    np.testing.assert_allclose(moment.sel(section="S300"), 300.0 * 0.2**3 / 4, rtol=0.05)
+    np.testing.assert_allclose(moment.sel(section="S400") / moment.sel(section="S300"), 4 / 3, rtol=0.05)
+    assert np.all(ds["MEq"] > 0) and np.all(ds["phiEq"] < ds["limitPhi"].sel(limitState="ultimate"))
+
+
+def test_moment_curvature_compact_fiber_history():
+    ops.wipe()
+    ops.model("basic", "-ndm", 3, "-ndf", 6)
+    _build_rect_section(300.0)
+    mc = opst.anlys.MomentCurvature(1, axial_force=-1.0)
+    mc.analyze(axis="z", max_phi=0.05, incr_phi=1e-3, smart_analyze=False)
+    num_steps, num_fibers = len(mc.phi), len(mc.FiberProps)
+    assert mc.FiberResp.shape == (num_steps, num_fibers, 2)
+    data = mc.get_fiber_data()
+    assert data.shape == (num_steps, num_fibers, 6)
+    np.testing.assert_array_equal(data.sel(Properties="strain"), mc.FiberResp[..., 1])
+    np.testing.assert_array_equal(data.isel(Steps=-1).sel(Properties="area"), mc.FiberProps[:, 2])
+    # same as the full fiber data saved at each step before, whose initial step is all zeros
+    np.testing.assert_array_equal(data.isel(Steps=0), 0.0)
+    full = np.reshape(ops.eleResponse(1, "section", "fiberData2"), (-1, 6))
+    np.testing.assert_array_equal(data.isel(Steps=-1), full)
+    # the first step where the maximum fiber strain reaches the threshold
+    strain = data.sel(Properties="strain").values
+    step = next(i for i in range(num_steps) if np.max(strain[i]) >= 0.003)
+    assert mc.get_limit_state(matTag=1, threshold=0.003) == (mc.phi[step], mc.M[step])
+    ops.wipe()
+
+
+class _RecordingController(opst.anlys.AdaptiveStepController):
+    def __init__(self):
+        super().__init__()
+        self.failures = 0
+
+    def on_failure(self, step, relaxation):
+        super().on_failure(step, relaxation)
+        self.failures += 1
+
+
+def _run_sdof(analysis_args):
+    ops.wipe()
+    ops.model("basic", "-ndm", 1, "-ndf", 1)
+    ops.node(1, 0.0)
+    ops.node(2, 0.0)
+    ops.fix(1, 1)
+    ops.mass(2, 1.0)
+    ops.uniaxialMaterial("Steel02", 1, 1.0, 100.0, 0.01, 18.0, 0.925, 0.15)
+    ops.element("zeroLength", 1, 1, 2, "-mat", 1, "-dir", 1)
+    dt = 0.02
+    t = np.arange(0, 10, dt)
+    ops.timeSeries("Path", 1, "-dt", dt, "-values", *(3.0 * np.sin(2 * np.pi * 1.2 * t)))
+    ops.pattern("UniformExcitation", 1, 1, "-accel", 1)
+    ops.constraints("Plain")
+    ops.numberer("Plain")
+    ops.system("BandGeneral")
+    ops.integrator("Newmark", 0.5, 0.25)
+    analysis = opst.anlys.SmartAnalyze(
+        "Transient", testType="NormDispIncr", testTol=1e-12, testIterTimes=3, **analysis_args
+    )
+    peak = 0.0
+    for _ in analysis.transient_split(len(t) - 1):
+        assert analysis.TransientAnalyze(dt) == 0
+        peak = max(peak, abs(ops.nodeDisp(2, 1)))
+    analysis.close()
+    ops.wipe()
+    return peak, analysis
+
+
+def test_smart_analyze_step_controller():
+    peak, _ = _run_sdof({})
+    controller = _RecordingController()
+    np.testing.assert_allclose(_run_sdof({"stepController": controller})[0], peak, rtol=1e-3)
+    assert controller.failures > 0
+    # the sub-step is remembered, not found again from the full step at each step
+    assert controller.step is not None and controller.step < 0.02
+
+
+def test_smart_analyze_step_controller_reset():
+    ops.wipe()
+    ops.model("basic", "-ndm", 1, "-ndf", 1)
+    ops.node(1, 0.0)
+    ops.node(2, 1.0)
+    ops.fix(1, 1)
+    ops.uniaxialMaterial("Elastic", 1, 100.0)
+    ops.element("Truss", 1, 1, 2, 1.0, 1)
+    ops.timeSeries("Linear", 1)
+    ops.pattern("Plain", 1, 1)
+    ops.load(2, 1.0)
+    ops.constraints("Plain")
+    ops.numberer("Plain")
+    ops.system("BandGeneral")
+    controller = opst.anlys.StepController()
+    analysis = opst.anlys.SmartAnalyze("Static", stepController=controller, telemetry=True)
+    for targets in ([0.0, 1.0, -1.0], [0.0, 0.5]):
+        for i, seg in enumerate(analysis.static_split(targets, maxStep=0.5)):
+            # a sub-step shrunk in a previous stage or direction is forgotten, but kept in the same direction
+            if i <= 1:
+                controller.step = 0.1
+            assert analysis.StaticAnalyze(2, 1, seg) == 0
+    analysis.close()
+    ops.wipe()
+    num_sub_steps = analysis.get_telemetry()["numSubSteps"].values
+    np.testing.assert_array_equal(num_sub_steps, [1, 5, 1, 1, 1, 1, 1])
+
+
+def test_smart_analyze_algo_cache():
+    args = {"tryAlterAlgoTypes": True, "algoTypes": [30, 31, 10], "algoCooldown": 1, "telemetry": True}
+    peak, analysis = _run_sdof(args)
+    peak_cached, analysis_cached = _run_sdof(dict(args, algoCache=True))
+    np.testing.assert_allclose(peak_cached, peak)
+    ds, ds_cached = analysis.get_telemetry(), analysis_cached.get_telemetry()
+    # the most recently successful algorithm is tried first, so fewer trials fail
+    assert analysis_cached.algo_cache[0] == 10
+    assert ds_cached["numTrials"].sum() < ds["numTrials"].sum()
+    # the first algorithm is set back once the cooldown of one step is over,
+    # without the cooldown the successful algorithm is kept for the direct steps after the failure
+    ds_kept = _run_sdof(dict(args, algoCache=True, algoCooldown=None))[1].get_telemetry()
+    for data, kept in ((ds_cached, False), (ds_kept, True)):
+        stage, algo = data["stage"].values, data["algo"].values
+        after = (stage[:-1] == 2) & (stage[1:] == 0)
+        assert after.any() and np.all((algo[1:][after] != 30) == kept)
+
+
+def test_smart_analyze_telemetry():
+    _, analysis = _run_sdof({"telemetry": True, "stepController": True})
+    ds = analysis.get_telemetry()
+    assert ds.sizes["step"] == 499
+    np.testing.assert_allclose(ds["time"][-1], 9.98)
+    # the steps reduced by the step controller are split into several sub-steps
+    relaxed = ds["stage"] == 3
+    assert relaxed.any() and np.all(ds["numSubSteps"].where(relaxed, 2) >= 2)
+    assert np.all(ds["numTrials"] >= ds["numSubSteps"]) and np.all(ds["numIter"] >= ds["numTrials"])
+    with pytest.raises(ValueError):
+        _run_sdof({})[1].get_telemetry()
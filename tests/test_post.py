@@ -0,0 +1,577 @@
+import numpy as np
+import openseespy.opensees as ops
+import pytest
+
+import opstool as opst
+from opstool.post._get_response._response_base import EleGeometryCache, StepBuffer
+from opstool.post._odb_reader import open_odb_groups
+from opstool.post.responses_data import loadODB
+
+
+def _build_frame():
+    ops.wipe()
+    ops.model("basic", "-ndm", 2, "-ndf", 3)
+    for i in range(4):
+        ops.node(i + 1, 0.0, 3.0 * i)
+    ops.fix(1, 1, 1, 1)
+    ops.geomTransf("Linear", 1)
+    for i in range(3):
+        ops.element("elasticBeamColumn", i + 1, i + 1, i + 2, 0.25, 3.0e7, 5.2e-3, 1)
+    ops.timeSeries("Linear", 1)
+    ops.pattern("Plain", 1, 1)
+    ops.load(4, 10.0, 0.0, 0.0)
+    ops.eleLoad("-ele", 1, 2, 3, "-type", "-beamUniform", -2.0)
+    ops.constraints("Plain")
+    ops.numberer("RCM")
+    ops.system("BandGeneral")
+    ops.test("NormDispIncr", 1.0e-8, 10)
+    ops.algorithm("Linear")
+    ops.integrator("LoadControl", 0.1)
+    ops.analysis("Static")
+
+
+def _run_odb(odb_tag, num_steps=7, **kwargs):
+    _build_frame()
+    odb = opst.post.CreateODB(odb_tag=odb_tag, **kwargs)
+    for _ in range(num_steps):
+        ops.analyze(1)
+        odb.fetch_response_step()
+    odb.save_response()
+
+
+def _count_ops_calls(monkeypatch, names):
+    """Count the calls of the OpenSees commands ``names``, the returned dict is updated at each call."""
+    calls = dict.fromkeys(names, 0)
+
+    def count_calls(name):
+        func = getattr(ops, name)
+
+        def counted(*args):
+            calls[name] += 1
+            return func(*args)
+
+        return counted
+
+    for name in names:
+        monkeypatch.setattr(ops, name, count_calls(name))
+    return calls
+
+
+def test_streaming_odb_matches_in_memory():
+    _run_odb("test-mem")
+    _run_odb("test-stream", save_every=3)
+    mem = opst.post.get_element_responses("test-mem", ele_type="Frame", print_info=False)
+    stream = opst.post.get_element_responses("test-stream", ele_type="Frame", print_info=False)
+    assert mem.sizes == stream.sizes
+    for name in mem.data_vars:
+        np.testing.assert_allclose(mem[name], stream[name])
+    mem = opst.post.get_nodal_responses("test-mem", print_info=False)
+    stream = opst.post.get_nodal_responses("test-stream", print_info=False)
+    np.testing.assert_allclose(mem["disp"], stream["disp"])
+    np.testing.assert_allclose(mem.time, stream.time)
+
+
+def test_streaming_odb_requires_fixed_model():
+    _build_frame()
+    with pytest.raises(ValueError):
+        opst.post.CreateODB(odb_tag="test-stream", model_update=True, save_every=3)
+
+
+def test_nodal_resp_dof_layout():
+    _run_odb("test-dofs", num_steps=2)
+    disp = opst.post.get_nodal_responses("test-dofs", resp_type="disp", node_tags=4, print_info=False)
+    assert disp.sizes["DOFs"] == 6
+    np.testing.assert_allclose(disp.sel(DOFs=["UZ", "RX", "RY"]), 0.0)
+    assert np.all(np.abs(disp.sel(DOFs="RZ").isel(time=-1)) > 0.0)
+    np.testing.assert_allclose(disp.isel(time=-1).values[[0, 1, 5]], ops.nodeDisp(4))
+
+
+def test_step_buffer_grows_past_capacity():
+    buffer = StepBuffer(init_capacity=2)
+    times = [0.1 * i for i in range(5)]
+    for i, time in enumerate(times):
+        buffer.append({"disp": (("nodeTags",), [float(i), -float(i)])}, {"nodeTags": [1, 2]}, time=time)
+    seg = buffer.segments[0]
+    assert len(buffer) == 5
+    assert seg["capacity"] == 8
+    ds = buffer.to_xarray(times)
+    # the unused rows of the buffer are trimmed, the data is a view of the filled rows
+    assert ds.sizes["time"] == 5
+    np.testing.assert_allclose(ds["disp"].sel(nodeTags=1), np.arange(5.0))
+    np.testing.assert_allclose(ds["disp"].sel(nodeTags=2), -np.arange(5.0))
+    assert np.shares_memory(ds["disp"].values, seg["data"]["disp"])
+    # later steps fill the free rows and leave the view alone
+    buffer.append({"disp": (("nodeTags",), [5.0, -5.0])}, {"nodeTags": [1, 2]}, time=0.5)
+    assert ds.sizes["time"] == 5
+    np.testing.assert_allclose(ds["disp"].sel(nodeTags=1), np.arange(5.0))
+    # a step with other coordinates starts a new segment, joined with NaN for the missing entries
+    buffer.append({"disp": (("nodeTags",), [6.0])}, {"nodeTags": [2]}, time=0.6)
+    assert len(buffer.segments) == 2
+    ds = buffer.to_xarray([*times, 0.5, 0.6])
+    assert ds.sizes["time"] == 7
+    np.testing.assert_allclose(ds["disp"].sel(nodeTags=2).values[-2:], [-5.0, 6.0])
+    assert np.isnan(ds["disp"].sel(nodeTags=1).values[-1])
+
+
+def test_model_update_removed_elements():
+    _build_frame()
+    ops.remove("loadPattern", 1)
+    ops.pattern("Plain", 2, 1)
+    ops.load(3, 10.0, 0.0, 0.0)
+    odb = opst.post.CreateODB(odb_tag="test-update", model_update=True, envelope=["frame"])
+    versions = []
+    for i in range(5):
+        if i == 3:
+            ops.remove("ele", 3)
+            ops.remove("node", 4)
+        ops.analyze(1)
+        odb.fetch_response_step()
+        versions.append(odb._ModelInfo.version)
+    odb.save_response()
+    assert versions[0] == versions[2] < versions[3] == versions[4]
+    disp = opst.post.get_nodal_responses("test-update", resp_type="disp", print_info=False)
+    assert np.all(np.isnan(disp.sel(nodeTags=4).isel(time=slice(4, None))))
+    assert not np.any(np.isnan(disp.sel(nodeTags=3)))
+    forces = opst.post.get_element_responses("test-update", ele_type="Frame", print_info=False)
+    assert np.all(np.isnan(forces["localForces"].sel(eleTags=3).isel(time=-1)))
+    env = opst.post.get_element_responses("test-update", ele_type="Frame", envelope=True, print_info=False)
+    np.testing.assert_allclose(env["localForces"].sel(stats="max"), forces["localForces"].max("time"))
+
+
+def test_model_info_versions(odb_path):
+    _build_frame()
+    ops.remove("loadPattern", 1)
+    ops.pattern("Plain", 2, 1)
+    ops.load(3, 10.0, 0.0, 0.0)
+    odb = opst.post.CreateODB(odb_tag="test-versions", model_update=True)
+    for i in range(5):
+        if i == 3:
+            ops.remove("ele", 3)
+        ops.analyze(1)
+        odb.fetch_response_step()
+    odb.save_response()
+    dt = open_odb_groups(f"{odb_path}/RespStepData-test-versions.nc", ["/ModelInfo"])
+    # only the element data changes, the nodes are kept
+    assert dt["ModelInfo/BeamData"]["BeamData"].sizes["version"] == 2
+    assert dt["ModelInfo/NodalData"]["NodalData"].sizes["version"] == 1
+    model_info, model_update, _ = loadODB("test-versions", resp_type="Frame")
+    assert model_update
+    beams = model_info["BeamData"]
+    assert beams.sizes["time"] == 6
+    assert not np.any(np.isnan(beams.sel(eleTags=3).isel(time=3)))
+    assert np.all(np.isnan(beams.sel(eleTags=3).isel(time=4)))
+    assert model_info["NodalData"].sizes["time"] == 6
+
+
+def test_model_info_signature_skips_node_queries(monkeypatch):
+    _build_frame()
+    odb = opst.post.CreateODB(odb_tag="test-signature", model_update=True)
+    calls = _count_ops_calls(monkeypatch, ["nodeCoord", "eleNodes"])
+    ops.analyze(1)
+    odb.fetch_response_step()
+    assert calls == {"nodeCoord": 0, "eleNodes": 0}
+    # moved nodes keep all tags, they are only seen when the caller says so
+    ops.setNodeCoord(4, 1, 0.5)
+    ops.analyze(1)
+    odb.fetch_response_step()
+    ops.analyze(1)
+    odb.fetch_response_step(model_changed=True)
+    odb.save_response()
+    model_info, _, _ = loadODB("test-signature", resp_type="Nodal")
+    coords = model_info["NodalData"].sel(tags=4)
+    np.testing.assert_allclose(coords.isel(time=2)[0], 0.0)
+    np.testing.assert_allclose(coords.isel(time=3)[0], 0.5)
+
+
+def test_elastic_beam_sec_forces_with_element_loads():
+    ops.wipe()
+    ops.model("basic", "-ndm", 2, "-ndf", 3)
+    ops.node(1, 0.0, 0.0)
+    ops.node(2, 4.0, 0.0)
+    ops.node(3, 8.0, 0.0)
+    ops.fix(1, 1, 1, 1)
+    ops.geomTransf("Linear", 1)
+    ops.element("elasticBeamColumn", 1, 1, 2, 0.25, 3.0e7, 5.2e-3, 1)
+    ops.element("elasticBeamColumn", 2, 2, 3, 0.25, 3.0e7, 5.2e-3, 1)
+    ops.timeSeries("Linear", 1)
+    ops.pattern("Plain", 1, 1)
+    ops.eleLoad("-ele", 1, "-type", "-beamPoint", -10.0, 0.5)
+    ops.eleLoad("-ele", 2, "-type", "-beamUniform", -2.0, 0.0, 0.25, 0.75)
+    ops.constraints("Plain")
+    ops.numberer("RCM")
+    ops.system("BandGeneral")
+    ops.test("NormDispIncr", 1.0e-8, 10)
+    ops.algorithm("Linear")
+    ops.integrator("LoadControl", 1.0)
+    ops.analysis("Static")
+    odb = opst.post.CreateODB(odb_tag="test-eleload", model_update=True, elastic_frame_sec_points=9)
+    ops.analyze(1)
+    odb.fetch_response_step()
+    # a new load at the middle of element 2 changes the model info, and so the cached load table
+    ops.timeSeries("Constant", 2)
+    ops.pattern("Plain", 2, 2)
+    ops.eleLoad("-ele", 2, "-type", "-beamPoint", -5.0, 0.5)
+    ops.analyze(1)
+    odb.fetch_response_step()
+    odb.save_response()
+    sec_f = opst.post.get_element_responses(
+        "test-eleload", ele_type="Frame", resp_type="sectionForces", print_info=False
+    )
+    # the free end is unloaded, and the moment at the fixed end balances both loads
+    np.testing.assert_allclose(
+        sec_f.sel(eleTags=2, secDofs=["MZ", "VY"]).isel(secPoints=-1, time=slice(1, None)), 0.0, atol=1e-8
+    )
+    moment = 10.0 * 2.0 + 2.0 * 2.0 * 6.0
+    np.testing.assert_allclose(np.abs(sec_f.sel(eleTags=1, secDofs="MZ").isel(secPoints=0, time=1)), moment)
+    np.testing.assert_allclose(
+        np.abs(sec_f.sel(eleTags=1, secDofs="MZ").isel(secPoints=0, time=2)), 2.0 * moment + 5.0 * 6.0
+    )
+    # shear jumps by the point load at the middle of element 1
+    shear = sec_f.sel(eleTags=1, secDofs="VY").isel(time=1).values
+    np.testing.assert_allclose(np.abs(shear[0] - shear[-1]), 10.0)
+    # and by the new point load at the middle of element 2
+    shear = sec_f.sel(eleTags=2, secDofs="VY").isel(time=2).values
+    np.testing.assert_allclose(np.abs(shear[0] - shear[-1]), 2.0 * 2.0 * 2.0 + 5.0)
+
+
+def test_solid_principal_stresses_match_eigenvalues():
+    from opstool.post._get_response._get_solid_resp import _calculate_stresses_measures_4D
+
+    rng = np.random.default_rng(1)
+    stresses = rng.normal(size=(3, 4, 8, 6))
+    stresses[0, 0, 0] = [2.0, 2.0, 2.0, 0.0, 0.0, 0.0]
+    stresses[1, 2, 5:] = np.nan
+    measures = _calculate_stresses_measures_4D(stresses)
+    s = stresses
+    tensor = np.stack(
+        [s[..., 0], s[..., 3], s[..., 5], s[..., 3], s[..., 1], s[..., 4], s[..., 5], s[..., 4], s[..., 2]], axis=-1
+    ).reshape(s.shape[:-1] + (3, 3))
+    valid = ~np.isnan(s).any(axis=-1)
+    eigvals = np.linalg.eigvalsh(tensor[valid])[:, ::-1]
+    np.testing.assert_allclose(measures[valid][:, :3], eigvals, atol=1e-12)
+    assert np.all(np.isnan(measures[~valid]))
+
+
+def _build_quad():
+    ops.wipe()
+    ops.model("basic", "-ndm", 2, "-ndf", 2)
+    for i, (x, y) in enumerate([(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)]):
+        ops.node(i + 1, x, y)
+    ops.fix(1, 1, 1)
+    ops.fix(2, 0, 1)
+    ops.fix(4, 1, 0)
+    ops.nDMaterial("ElasticIsotropic", 1, 3.0e4, 0.2)
+    ops.element("quad", 1, 1, 2, 3, 4, 0.1, "PlaneStress", 1)
+    ops.timeSeries("Linear", 1)
+    ops.pattern("Plain", 1, 1)
+    ops.load(2, 1.0, 0.0)
+    ops.load(3, 1.0, 0.0)
+    ops.constraints("Plain")
+    ops.numberer("RCM")
+    ops.system("BandGeneral")
+    ops.algorithm("Linear")
+    ops.integrator("LoadControl", 0.5)
+    ops.analysis("Static")
+
+
+def test_plane_integration_points_probed_once():
+    _build_quad()
+    odb = opst.post.CreateODB(odb_tag="test-plane")
+    for _ in range(2):
+        ops.analyze(1)
+        odb.fetch_response_step()
+    odb.save_response()
+    assert odb._geo_cache.num_points == {(1, "material"): 4}
+    stresses = opst.post.get_element_responses(
+        "test-plane", ele_type="Plane", resp_type="Stresses", print_info=False
+    ).isel(time=-1)
+    assert stresses.sizes["GaussPoints"] == 4
+    np.testing.assert_allclose(stresses.sel(stressDOFs="sigma11"), 20.0)
+
+
+def test_ele_geometry_cache_invalidated_by_model_version(monkeypatch):
+    _build_quad()
+    cache = EleGeometryCache()
+    cache.update(1)
+    assert cache.get_class_tag(1) == ops.getEleClassTags(1)[0]
+    assert cache.get_ele_nodes(1) == [1, 2, 3, 4]
+    assert cache.get_node_coord(3) == [1.0, 1.0]
+    assert cache.get_num_points(1, "material") == 4
+    # the cached data is kept as long as the version is unchanged
+    ops.setNodeCoord(3, 2, 2.0)
+    cache.update(1)
+    assert cache.get_node_coord(3) == [1.0, 1.0]
+    # the points count where both stresses and strains respond, here strains stop after the 2nd point
+    eleResponse = ops.eleResponse
+
+    def fake_ele_response(ele_tag, *args):
+        if args[-1] == "strains" and int(args[-2]) > 2:
+            return []
+        return eleResponse(ele_tag, *args)
+
+    monkeypatch.setattr(ops, "eleResponse", fake_ele_response)
+    assert cache.get_num_points(1, "material") == 4
+    cache.update(2)
+    assert cache.num_points == {}
+    assert cache.get_node_coord(3) == [1.0, 2.0]
+    assert cache.get_num_points(1, "material") == 2
+    # and no points if the element responds to stresses only
+    monkeypatch.setattr(ops, "eleResponse", lambda ele_tag, *args: [] if args[-1] == "strains" else [1.0])
+    cache.update(3)
+    assert cache.get_num_points(1, "material") == 0
+
+
+def test_fiber_section_layout_subsampling(monkeypatch):
+    from opstool.post._get_response._get_fiber_sec_resp import _FiberSecLayout
+
+    ops.wipe()
+    ops.model("basic", "-ndm", 2, "-ndf", 3)
+    ops.node(1, 0.0, 0.0)
+    ops.node(2, 0.0, 3.0)
+    ops.fix(1, 1, 1, 1)
+    ops.uniaxialMaterial("Elastic", 1, 3.0e4)
+    ops.uniaxialMaterial("Elastic", 2, 2.0e5)
+    ops.section("Fiber", 1)
+    ops.patch("rect", 1, 6, 1, -0.3, -0.2, 0.3, 0.2)
+    ops.layer("straight", 2, 3, 0.001, -0.25, 0.0, 0.25, 0.0)
+    ops.geomTransf("Linear", 1)
+    ops.beamIntegration("Lobatto", 1, 1, 3)
+    ops.element("forceBeamColumn", 1, 1, 2, 1, 1)
+    ops.timeSeries("Linear", 1)
+    ops.pattern("Plain", 1, 1)
+    ops.load(2, 1.0, -10.0, 0.0)
+    ops.constraints("Plain")
+    ops.numberer("RCM")
+    ops.system("BandGeneral")
+    ops.test("NormDispIncr", 1.0e-8, 10)
+    ops.algorithm("Newton")
+    ops.integrator("LoadControl", 1.0)
+    ops.analysis("Static")
+    ops.analyze(1)
+
+    full = _FiberSecLayout({1: 3})
+    stress, strain, defo, force = full.get_resp()
+    assert stress.shape == (1, 3, 9)
+    fiber_data = np.reshape(ops.eleResponse(1, "section", "2", "fiberData2"), (-1, 6))
+    np.testing.assert_allclose(stress[0, 1], fiber_data[:, 4])
+    np.testing.assert_allclose(strain[0, 1], fiber_data[:, 5])
+    np.testing.assert_allclose(full.geo["ys"][0, 1], fiber_data[:, 0])
+
+    extreme = _FiberSecLayout({1: 3}, fiber_points="extreme")
+    ys = extreme.geo["ys"][0, 0]
+    assert ys.min() == fiber_data[:, 0].min() and ys.max() == fiber_data[:, 0].max()
+    assert len(ys) < len(fiber_data)
+
+    rebars = _FiberSecLayout({1: 3}, fiber_points=[2])
+    assert rebars.fiber_queries[(1, 1)] is None
+    stress, strain, _, _ = rebars.get_resp()
+    assert stress.shape == (1, 3, 3)
+    np.testing.assert_allclose(rebars.geo["matTags"], 2)
+    np.testing.assert_allclose(stress[0, 1], fiber_data[fiber_data[:, 3] == 2, 4])
+
+    # few selected fibers are queried one by one, with the same results
+    monkeypatch.setattr(_FiberSecLayout, "SPARSE_FIBER_RATIO", 0.5)
+    sparse = _FiberSecLayout({1: 3}, fiber_points=[2])
+    assert len(sparse.fiber_queries[(1, 1)]) == 3
+    sparse_stress, sparse_strain, _, _ = sparse.get_resp()
+    np.testing.assert_allclose(sparse_stress, stress)
+    np.testing.assert_allclose(sparse_strain, strain)
+
+
+def test_lazy_load_reads_selected_data():
+    _run_odb("test-lazy", num_steps=3)
+    eager = opst.post.get_nodal_responses("test-lazy", resp_type="disp", node_tags=[3, 4], print_info=False)
+    lazy = opst.post.get_nodal_responses(
+        "test-lazy", resp_type="disp", node_tags=[3, 4], print_info=False, lazy_load=True
+    )
+    assert isinstance(eager.variable._data, np.ndarray)
+    assert not isinstance(lazy.variable._data, np.ndarray)
+    np.testing.assert_allclose(lazy.isel(time=-1).values, eager.isel(time=-1).values)
+    lazy = opst.post.get_element_responses(
+        "test-lazy", ele_type="Frame", resp_type="localForces", print_info=False, lazy_load=True
+    )
+    eager = opst.post.get_element_responses("test-lazy", ele_type="Frame", resp_type="localForces", print_info=False)
+    np.testing.assert_allclose(lazy.sel(eleTags=2).load(), eager.sel(eleTags=2))
+
+
+def test_odb_file_cache_reopens_changed_files():
+    from opstool.post._odb_reader import ODB_FILE_CACHE
+
+    _run_odb("test-cache", num_steps=2)
+    disp = opst.post.get_nodal_responses("test-cache", resp_type="disp", print_info=False)
+    assert disp.sizes["time"] == 3
+    assert len(ODB_FILE_CACHE.files) > 0
+    _run_odb("test-cache", num_steps=4)
+    disp = opst.post.get_nodal_responses("test-cache", resp_type="disp", print_info=False)
+    assert disp.sizes["time"] == 5
+    opst.post.close_odb("test-cache")
+    assert not any("test-cache" in path for path in ODB_FILE_CACHE.files)
+    opst.post.close_odb()
+    assert len(ODB_FILE_CACHE.files) == 0
+
+
+def test_storage_layout_compresses_all_variables(odb_path):
+    import netCDF4
+
+    from opstool.post._odb_writer import check_storage
+
+    _run_odb("test-plain")
+    _run_odb("test-zlib", storage=True)
+    _run_odb("test-zlib-stream", save_every=3, storage={"compressor": "zstd", "dtype": {"disp": "float32"}})
+    plain = opst.post.get_nodal_responses("test-plain", print_info=False)
+    for tag in ["test-zlib", "test-zlib-stream"]:
+        resp = opst.post.get_nodal_responses(tag, print_info=False)
+        np.testing.assert_allclose(resp["disp"], plain["disp"], rtol=1e-6)
+        np.testing.assert_array_equal(resp["reaction"], plain["reaction"])
+    opst.post.close_odb()
+    with netCDF4.Dataset(f"{odb_path}/RespStepData-test-zlib.nc") as nc:
+        grp = nc["NodalResponses"]
+        for name in ["disp", "vel", "accel", "reaction"]:
+            assert grp.variables[name].filters()["zlib"]
+            assert grp.variables[name].filters()["shuffle"]
+            assert grp.variables[name].chunking()[0] == 8
+    with netCDF4.Dataset(f"{odb_path}/RespStepData-test-zlib-stream.nc") as nc:
+        disp = nc["NodalResponses"].variables["disp"]
+        assert disp.dtype == np.float32
+        assert disp.filters()["zstd"]
+        assert disp.chunking()[0] == 3
+    with pytest.raises(ValueError):
+        check_storage({"compressor": "lzma"})
+
+
+def test_zarr_odb_matches_netcdf():
+    pytest.importorskip("zarr")
+    _run_odb("test-nc")
+    opst.post.set_odb_format("zarr")
+    try:
+        _run_odb("test-zarr")
+        _run_odb("test-zarr-stream", save_every=3, storage={"compressor": "blosc_lz4"})
+        opst.post.save_model_data(odb_tag="test-zarr")
+        model_info, _ = opst.post.load_model_data(odb_tag="test-zarr", resave=False)
+    finally:
+        opst.post.set_odb_format("nc")
+    assert "NodalData" in model_info
+    nc = opst.post.get_element_responses("test-nc", ele_type="Frame", print_info=False)
+    for tag in ["test-zarr", "test-zarr-stream"]:
+        resp = opst.post.get_element_responses(tag, ele_type="Frame", print_info=False)
+        assert resp.sizes == nc.sizes
+        for name in nc.data_vars:
+            np.testing.assert_allclose(resp[name], nc[name])
+    # the netCDF file of the same tag replaces the Zarr store
+    _run_odb("test-zarr", num_steps=2)
+    disp = opst.post.get_nodal_responses("test-zarr", resp_type="disp", print_info=False)
+    assert disp.sizes["time"] == 3
+    with pytest.raises(ValueError):
+        opst.post.set_odb_format("hdf5")
+
+
+def test_record_policy_per_response_type():
+    _run_odb("test-policy", num_steps=10, record_policy={"every": 2, "frame": {"every": 5}})
+    disp = opst.post.get_nodal_responses("test-policy", resp_type="disp", print_info=False)
+    frame = opst.post.get_element_responses("test-policy", ele_type="Frame", print_info=False)
+    np.testing.assert_allclose(disp.time, [0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
+    np.testing.assert_allclose(frame.time, [0.0, 0.5, 1.0])
+    # the linear model is loaded in equal increments, so the displacement grows in equal increments too
+    step = float(disp.sel(nodeTags=4, DOFs="UX").isel(time=1))
+    _run_odb("test-trigger", num_steps=10, record_policy={"tol": 1.5 * step / 2})
+    disp = opst.post.get_nodal_responses("test-trigger", resp_type="disp", print_info=False)
+    np.testing.assert_allclose(disp.time, [0.0, 0.2, 0.4, 0.6, 0.8, 1.0])
+    _build_frame()
+    with pytest.raises(ValueError):
+        opst.post.CreateODB(odb_tag="test-policy", model_update=True, record_policy={"frame": {"every": 5}})
+    with pytest.raises(ValueError):
+        opst.post.CreateODB(odb_tag="test-policy", record_policy={"stride": 5})
+
+
+def test_streaming_odb_counts_recorded_steps(monkeypatch):
+    blocks = []
+    flush_steps = opst.post.CreateODB._flush_steps
+
+    def record_block(odb):
+        blocks.append(len(odb._get_resp()[1].times))
+        flush_steps(odb)
+
+    monkeypatch.setattr(opst.post.CreateODB, "_flush_steps", record_block)
+    _run_odb("test-policy-stream", num_steps=12, save_every=3, record_policy={"every": 4})
+    # the initial step and the steps 4, 8 and 12 are recorded, in full blocks of three steps
+    assert blocks == [3, 1]
+    disp = opst.post.get_nodal_responses("test-policy-stream", resp_type="disp", print_info=False)
+    np.testing.assert_allclose(disp.time, [0.0, 0.4, 0.8, 1.2])
+
+
+def test_envelope_matches_history():
+    _run_odb("test-env", envelope=True)
+    _run_odb("test-env-only", save_every=3, envelope=["nodal"], save_history=False)
+    hist = opst.post.get_nodal_responses("test-env", print_info=False)
+    for tag in ["test-env", "test-env-only"]:
+        env = opst.post.get_nodal_responses(tag, envelope=True, print_info=False)
+        np.testing.assert_allclose(env["disp"].sel(stats="max"), hist["disp"].max("time"))
+        np.testing.assert_allclose(env["disp"].sel(stats="min"), hist["disp"].min("time"))
+        np.testing.assert_allclose(env["disp"].sel(stats="rms"), np.sqrt((hist["disp"] ** 2).mean("time")))
+        abs_max_time = hist["time"].values[np.abs(hist["reaction"]).argmax("time").values]
+        np.testing.assert_allclose(env["reaction"].sel(stats="absMaxTime"), abs_max_time)
+    frame = opst.post.get_element_responses("test-env", ele_type="Frame", print_info=False)
+    env = opst.post.get_element_responses("test-env", ele_type="Frame", envelope=True, print_info=False)
+    np.testing.assert_allclose(env["basicForces"].sel(stats="absMax"), np.abs(frame["basicForces"]).max("time"))
+    with pytest.raises(ValueError):
+        opst.post.get_element_responses("test-env-only", ele_type="Frame", envelope=True, print_info=False)
+
+
+def test_step_snapshot_shared_by_extractors(monkeypatch):
+    _build_frame()
+    odb = opst.post.CreateODB(odb_tag="test-snapshot", envelope=["nodal"], record_policy={"tol": 0.0})
+    calls = _count_ops_calls(monkeypatch, ["nodeDisp", "getTime", "getNodeTags"])
+    ops.analyze(1)
+    odb.fetch_response_step()
+    # the trigger of the record policy and the nodal extractor share the displacements
+    assert calls == {"nodeDisp": 4, "getTime": 1, "getNodeTags": 1}
+    snapshot = odb._snapshot
+    assert odb._NodalResp.snapshot is snapshot
+    with pytest.raises(ValueError):
+        snapshot.node_tags[0] = 0
+    snapshot.clear()
+    assert snapshot.time == pytest.approx(0.1)
+
+
+def _peak_disp(ds):
+    return abs(ds["disp"]).max("time")
+
+
+def test_batch_responses_stack_cases():
+    for i, num_steps in enumerate([4, 6]):
+        _run_odb(f"test-batch-{i}", num_steps=num_steps)
+    cases = ["test-batch-0", "test-batch-1"]
+    ds = opst.post.get_batch_responses("test-batch-*", resp_type="disp", tags=[3, 4], print_info=False)
+    assert list(ds.case.values) == cases
+    assert ds.sizes["time"] == 7
+    assert np.all(np.isnan(ds.sel(case="test-batch-0").isel(time=-1)))
+    peaks = opst.post.get_batch_responses(cases, reduce_func=_peak_disp, max_workers=2, print_info=False)
+    for case in cases:
+        disp = opst.post.get_nodal_responses(case, resp_type="disp", print_info=False)
+        np.testing.assert_allclose(peaks.sel(case=case), abs(disp).max("time"))
+    frame = opst.post.get_batch_responses(
+        cases, ele_type="Frame", resp_type="basicForces", executor="thread", max_workers=2, print_info=False
+    )
+    np.testing.assert_allclose(
+        frame.sel(case="test-batch-1"),
+        opst.post.get_element_responses("test-batch-1", "Frame", resp_type="basicForces", print_info=False),
+    )
+    with pytest.raises(ValueError):
+        opst.post.get_batch_responses("test-batch-none-*", print_info=False)
+
+
+def test_solver_telemetry_in_odb():
+    _build_frame()
+    odb = opst.post.CreateODB(odb_tag="test-telemetry", save_every=3)
+    analysis = opst.anlys.SmartAnalyze("Static", telemetry=True)
+    for seg in analysis.static_split([0.05], 0.01):
+        analysis.StaticAnalyze(4, 1, seg)
+        odb.fetch_response_step()
+    telemetry = analysis.get_telemetry()
+    odb.save_response(telemetry=telemetry)
+    ds = opst.post.get_solver_telemetry("test-telemetry")
+    assert ds.equals(telemetry)
+    assert ds.sizes["step"] == 5 and np.all(ds["stage"] == 0)
+    _run_odb("test-telemetry-none", num_steps=1)
+    with pytest.raises(ValueError):
+        opst.post.get_solver_telemetry("test-telemetry-none")
@@ -1,6 +1,8 @@
+import numpy as np
+from pyvista.plotting.plotter import Plotter
+
 import opstool as opst
 import opstool.vis.pyvista as opsvis
-from pyvista.plotting.plotter import Plotter
 
 
 def test_set_plot_props():
@@ -48,3 +50,41 @@ def test_plot_eigen_slides():
     opst.load_ops_examples("ArchBridge-2")
     output = opsvis.plot_eigen(mode_tags=3, subplots=False)
     assert isinstance(output, Plotter)
+
+
+def test_peaks_read_from_envelope():
+    from opstool.vis.pyvista.vis_frame_resp import PlotFrameResponse
+    from opstool.vis.pyvista.vis_nodal_resp import PlotNodalResponse
+
+    from .test_post import _run_odb
+
+    _run_odb("test-vis-env", envelope=True)
+    model_info, model_update, resp = opst.post.loadODB("test-vis-env", resp_type="Nodal")
+    for component in ["UX", ["UX", "UY"]]:
+        for idx in ["absMax", "max", "min"]:
+            plotbase = PlotNodalResponse(model_info, resp, model_update)
+            plotbase.set_comp_resp_type("reaction", component)
+            peak = plotbase._get_resp_clim_peak(idx)
+            plotbase.set_envelope(opst.post.loadEnvelope("test-vis-env", resp_type="Nodal"))
+            assert plotbase._get_resp_clim_peak(idx) == peak
+    model_info, model_update, resp = opst.post.loadODB("test-vis-env", resp_type="Frame")
+    for idx in ["absMax", "max", "min"]:
+        plotbase = PlotFrameResponse(model_info, resp, model_update)
+        plotbase.refactor_resp_data(None, "localForces", "MZ")
+        peak = plotbase._get_resp_scale_factor(idx)
+        plotbase.set_envelope(opst.post.loadEnvelope("test-vis-env", resp_type="Frame"))
+        assert plotbase._get_resp_scale_factor(idx) == peak
+
+
+def test_plot_envelope_without_history():
+    from .test_post import _run_odb
+
+    _run_odb("test-vis-env-only", envelope=True, save_history=False)
+    output = opsvis.plot_nodal_responses("test-vis-env-only", resp_type="disp", step="max")
+    assert isinstance(output, Plotter)
+    output = opsvis.plot_frame_responses("test-vis-env-only", resp_type="sectionForces", resp_dof="MZ")
+    assert isinstance(output, Plotter)
+    # the maximum and the minimum of the envelope are the steps
+    _, _, resp = opst.post.loadODB("test-vis-env-only", resp_type="Nodal")
+    env = opst.post.get_nodal_responses("test-vis-env-only", envelope=True, print_info=False)
+    np.testing.assert_array_equal(resp["disp"], env["disp"].sel(stats=["max", "min"]))